@@ -3,6 +3,10 @@ ASGI config for citystory_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+HTTP requests are served by Django. WebSocket connections to /ws/notifications/
+are handled by core.views.notification_stream.notification_websocket, which
+pushes new notifications to the connected user in real time.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +17,24 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'citystory_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since it loads models
+from core.views.notification_stream import notification_websocket  # noqa: E402
+
+WEBSOCKET_ROUTES = {
+    '/ws/notifications/': notification_websocket,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        path = scope['path'] if scope['path'].endswith('/') else scope['path'] + '/'
+        handler = WEBSOCKET_ROUTES.get(path)
+        if handler is None:
+            await receive()  # websocket.connect
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        await handler(scope, receive, send)
+        return
+    await django_application(scope, receive, send)
@@ -0,0 +1,20 @@
+"""
+Celery application for the background tasks in core/tasks.py.
+
+Start a worker (and beat, for the periodic tasks) next to the web processes:
+
+    celery -A citystory_backend worker -l info
+    celery -A citystory_backend beat -l info
+
+and set BACKGROUND_TASKS_ASYNC=True so run_in_background queues tasks on the
+broker (CELERY_BROKER_URL) instead of running them inline.
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'citystory_backend.settings')
+
+app = Celery('citystory_backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
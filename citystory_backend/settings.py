@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import django
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -86,11 +88,21 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'citystory_backend.wsgi.application'
+ASGI_APPLICATION = 'citystory_backend.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connection reuse (see core/README_database.md):
+# - by default every worker keeps its connection for DB_CONN_MAX_AGE seconds,
+#   checked before reuse, instead of connecting on every request;
+# - DB_POOL uses psycopg 3's connection pool (Django 5.1+, psycopg[pool]);
+# - DB_PGBOUNCER when connecting through PgBouncer in transaction pooling mode.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))  # Seconds; 0 closes the connection after each request
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False') == 'True'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -99,9 +111,25 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', 'password'),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # The pool manages connections itself
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # Server-side cursors do not survive PgBouncer handing the connection
+        # to another client between transactions
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'OPTIONS': {},
     }
 }
 
+if DB_POOL:
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured('DB_POOL needs Django 5.1 or later and psycopg[pool].')
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),  # Connections opened at startup
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),  # Per process
+        'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),  # Seconds to wait for a free connection
+    }
+
 # Old SQLite config (commented out)
 # DATABASES = {
 #     'default': {
@@ -111,6 +139,20 @@ DATABASES = {
 # }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Unread notification counters live in the cache, so deployments with more than
+# one process need a shared backend, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'citystory-cache'),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -165,9 +207,15 @@ CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:3000',
 ]
 
+# Stateless JWT authentication: build request.user from the token claims instead
+# of querying it (see core/authentication.py)
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'True') == 'True'
+TOKEN_REVOCATION_CACHE_TIMEOUT = int(os.getenv('TOKEN_REVOCATION_CACHE_TIMEOUT', '60'))  # Seconds the revoked user set is cached
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.ClaimsJWTAuthentication' if JWT_STATELESS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -219,6 +267,77 @@ SITE_URL = os.getenv('SITE_URL', 'http://localhost:3000')
 GEOCODING_API_KEY = os.getenv('GEOCODING_API_KEY')
 GEOCODING_RATE_LIMIT = float(os.getenv('GEOCODING_RATE_LIMIT', '0.2'))  # Seconds between API calls
 
+# Background tasks (see core/utils/background.py and citystory_backend/celery.py)
+# Tasks are queued for Celery workers when CELERY_BROKER_URL is set in the
+# environment. Otherwise the default is inline: they run in the web process
+# right after the commit (e.g. photo resizing in the upload request).
+# BACKGROUND_TASKS_ASYNC=True/False overrides either default.
+BACKGROUND_TASKS_ASYNC = os.getenv(
+    'BACKGROUND_TASKS_ASYNC', 'True' if os.getenv('CELERY_BROKER_URL') else 'False'
+) == 'True'
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND')
+CELERY_TASK_IGNORE_RESULT = CELERY_RESULT_BACKEND is None
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    # Retries failed outbox events (see core/utils/outbox.py)
+    'process-outbox': {
+        'task': 'core.tasks.process_outbox',
+        'schedule': 60.0,
+    },
+    # Folds helpful vote shards into helpful_count (see core/utils/helpful_votes.py)
+    'rollup-helpful-counts': {
+        'task': 'core.tasks.rollup_helpful_counts',
+        'schedule': 60.0,
+    },
+    'cleanup-old-notifications': {
+        'task': 'core.tasks.cleanup_old_notifications',
+        'schedule': 24 * 60 * 60.0,
+    },
+}
+
+# Notification retention (see core/utils/notification_retention.py)
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', '30'))
+# Per-type overrides in days, e.g. {'new_photo': 14, 'badge_earned': 365}
+NOTIFICATION_RETENTION_RULES = {}
+NOTIFICATION_RETENTION_BATCH_SIZE = int(os.getenv('NOTIFICATION_RETENTION_BATCH_SIZE', '1000'))
+NOTIFICATION_RETENTION_BATCH_PAUSE = float(os.getenv('NOTIFICATION_RETENTION_BATCH_PAUSE', '0.1'))  # Seconds between batches
+NOTIFICATION_ARCHIVE_DIR = os.getenv('NOTIFICATION_ARCHIVE_DIR')  # Archive to .jsonl.gz before deleting when set
+
+# Real-time notification push (see core/utils/notification_broker.py)
+# The in-memory broker only reaches streams served by the same process.
+NOTIFICATION_BROKER = 'core.utils.notification_broker.InMemoryNotificationBroker'
+NOTIFICATION_STREAM_HEARTBEAT = int(os.getenv('NOTIFICATION_STREAM_HEARTBEAT', '15'))  # Seconds between keep-alives
+
+# Cached unread counters (see core/utils/notification_counters.py)
+NOTIFICATION_COUNTER_TIMEOUT = int(os.getenv('NOTIFICATION_COUNTER_TIMEOUT', '3600'))  # Seconds before a rebuild from the database
+
+# Bulk moderation (see core/utils/moderation.py)
+MODERATION_BULK_MAX_IDS = int(os.getenv('MODERATION_BULK_MAX_IDS', '1000'))  # Ids accepted per request
+
+# Search facet counts (see core/utils/place_facets.py)
+PLACE_FACETS_CACHE_TIMEOUT = int(os.getenv('PLACE_FACETS_CACHE_TIMEOUT', '300'))  # Seconds per filter signature
+PLACE_FACETS_TOP_FEATURES = int(os.getenv('PLACE_FACETS_TOP_FEATURES', '20'))  # Features listed in the features facet
+
+# Feature catalog (see core/utils/feature_catalog.py)
+FEATURE_CATALOG_CACHE_TIMEOUT = int(os.getenv('FEATURE_CATALOG_CACHE_TIMEOUT', '600'))  # Seconds a catalog version is cached
+FEATURE_IMPORT_MAX_ROWS = int(os.getenv('FEATURE_IMPORT_MAX_ROWS', '10000'))  # Rows per bulk import/associate request
+
+# Helpful vote counters (see core/utils/helpful_votes.py)
+HELPFUL_VOTE_COUNTER_SHARDS = int(os.getenv('HELPFUL_VOTE_COUNTER_SHARDS', '8'))  # Counter rows per review
+
+# Moderation work queue (see core/utils/moderation_queue.py)
+MODERATION_CLAIM_LEASE = int(os.getenv('MODERATION_CLAIM_LEASE', '600'))  # Seconds a claim is held
+MODERATION_CLAIM_BATCH_SIZE = int(os.getenv('MODERATION_CLAIM_BATCH_SIZE', '20'))  # Items per claim by default
+MODERATION_LEVEL_BOOST_HOURS = int(os.getenv('MODERATION_LEVEL_BOOST_HOURS', '6'))  # Queue head start per contributor level
+
+# Transactional outbox for notifications and points (see core/utils/outbox.py)
+OUTBOX_DRAIN_ON_COMMIT = os.getenv('OUTBOX_DRAIN_ON_COMMIT', 'True') == 'True'  # Off: run drain_outbox instead
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', '200'))  # Events applied per transaction
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))  # Failed batches retried this many times
+
 
 # Google OAuth 2.0 Configuration
 # Get these from your Google Cloud Console (APIs & Services -> Credentials)
@@ -19,20 +19,19 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import (
-    TokenRefreshView,
     TokenVerifyView,
 )
 from core.views.auth import CustomTokenObtainPairView, UserRegistrationView, LogoutView
 from django.urls import path
 from core.views.google_auth import GoogleOAuthCallbackView
-from core.views.auth import CustomTokenVerifyView
+from core.views.auth import CustomTokenRefreshView, CustomTokenVerifyView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     # path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('api/token/verify/', CustomTokenVerifyView.as_view(), name='token_verify'),
     path('api/register/', UserRegistrationView.as_view(), name='register'),
@@ -5,6 +5,8 @@ from django.urls import reverse
 from django.db import models
 from .models import User, Place, Review, PlacePhoto, Feature, Notification, HelpfulVote
 from .choices import PLACE_TYPE_CHOICES, PRICE_LEVEL_CHOICES
+from .utils.moderation import bulk_moderate
+from .utils.token_revocation import set_users_active
 
 # Custom filters for renamed fields
 class PlaceTypeListFilter(admin.SimpleListFilter):
@@ -51,6 +53,19 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('email', 'password1', 'password2', 'first_name', 'last_name'),
         }),
     )
+    actions = ['suspend_users', 'activate_users']
+    
+    def suspend_users(self, request, queryset):
+        """Bulk suspend selected users; their tokens are refused right away"""
+        updated = set_users_active(queryset, False)
+        self.message_user(request, f"{updated} users were suspended.")
+    suspend_users.short_description = 'Suspend selected users'
+    
+    def activate_users(self, request, queryset):
+        """Bulk reactivate selected users"""
+        updated = set_users_active(queryset, True)
+        self.message_user(request, f"{updated} users were activated.")
+    activate_users.short_description = 'Activate selected users'
 
 class ModeratedModelAdmin(admin.ModelAdmin):
     """Base admin class for models with moderation"""
@@ -78,16 +93,14 @@ class ModeratedModelAdmin(admin.ModelAdmin):
     
     def approve_items(self, request, queryset):
         """Bulk approve selected items"""
-        for obj in queryset:
-            obj.update_moderation_status('APPROVED', moderator=request.user)
-        self.message_user(request, f'{len(queryset)} items were successfully approved.')
+        result = bulk_moderate(self.model, queryset.values_list('pk', flat=True), 'APPROVED', moderator=request.user)
+        self.message_user(request, f"{result['updated']} items were successfully approved.")
     approve_items.short_description = 'Approve selected items'
     
     def reject_items(self, request, queryset):
         """Bulk reject selected items"""
-        for obj in queryset:
-            obj.update_moderation_status('REJECTED', moderator=request.user)
-        self.message_user(request, f'{len(queryset)} items were successfully rejected.')
+        result = bulk_moderate(self.model, queryset.values_list('pk', flat=True), 'REJECTED', moderator=request.user)
+        self.message_user(request, f"{result['updated']} items were successfully rejected.")
     reject_items.short_description = 'Reject selected items'
     
     def save_model(self, request, obj, form, change):
@@ -0,0 +1,69 @@
+"""
+JWT authentication without a per-request user lookup.
+
+JWTAuthentication loads the user row on every authenticated request.
+ClaimsJWTAuthentication instead builds the user from the claims that
+CustomTokenObtainPairSerializer puts in every token (USER_CLAIMS): the
+request gets a ClaimsUser, a real User instance whose other fields are
+deferred and loaded with one query on first access. Suspended and
+deactivated users are refused through the cached revocation set
+(core/utils/token_revocation.py).
+
+Claims are refreshed from the database whenever the token is refreshed
+(CustomTokenRefreshSerializer), so a changed name or staff flag shows within
+ACCESS_TOKEN_LIFETIME. Tokens issued without the claims fall back to the
+database lookup.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import ClaimsUser
+from .utils.token_revocation import is_user_revoked
+
+# User field -> token claim
+USER_CLAIMS = {
+    'username': 'username',
+    'email': 'email',
+    'first_name': 'firstName',
+    'last_name': 'lastName',
+    'is_staff': 'isStaff',
+    'is_superuser': 'isSuperuser',
+    'auth_type': 'authType',
+}
+
+
+def get_user_claims(user) -> dict:
+    return {claim: getattr(user, field) for field, claim in USER_CLAIMS.items()}
+
+
+def build_claims_user(user_id, validated_token) -> ClaimsUser:
+    values = {field: validated_token[claim] for field, claim in USER_CLAIMS.items()}
+    values.update({
+        ClaimsUser._meta.pk.attname: ClaimsUser._meta.pk.to_python(user_id),
+        # Inactive users are refused before this
+        'is_active': True,
+    })
+    # from_db() takes the values in field order
+    field_names = [field.attname for field in ClaimsUser._meta.concrete_fields if field.attname in values]
+    return ClaimsUser.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the token's user claims instead of querying the user."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if is_user_revoked(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if any(claim not in validated_token for claim in USER_CLAIMS.values()):
+            # Issued before the claims were added
+            return super().get_user(validated_token)
+        return build_claims_user(user_id, validated_token)
@@ -2,6 +2,7 @@ from django_filters import rest_framework as filters
 from django.db.models import Q
 from .models import Place, Feature, Review, Notification, PlacePhoto
 from .choices import PLACE_TYPE_CHOICES, PRICE_LEVEL_CHOICES
+from .utils.feature_bits import filter_by_features, parse_feature_ids
 
 class PlaceFilter(filters.FilterSet):
     """
@@ -26,17 +27,25 @@ class PlaceFilter(filters.FilterSet):
     min_rating = filters.NumberFilter(field_name='average_rating', lookup_expr='gte')
     max_rating = filters.NumberFilter(field_name='average_rating', lookup_expr='lte')
     features = filters.CharFilter(method='filter_features')
+    all_features = filters.CharFilter(method='filter_features')
+    exclude_features = filters.CharFilter(method='filter_features')
     
     class Meta:
         model = Place
-        fields = ['name', 'type', 'price_level', 'min_rating', 'max_rating', 'features']
+        fields = [
+            'name', 'type', 'price_level', 'min_rating', 'max_rating',
+            'features', 'all_features', 'exclude_features'
+        ]
     
     def filter_features(self, queryset, name, value):
-        """Filter places by comma-separated feature IDs."""
+        """
+        Filter places by comma-separated feature IDs: any of them (features),
+        all of them (all_features) or none of them (exclude_features).
+        """
         if not value:
             return queryset
-        feature_ids = [int(id.strip()) for id in value.split(',') if id.strip().isdigit()]
-        return queryset.filter(features__id__in=feature_ids).distinct()
+        predicate = {'features': 'any_of', 'all_features': 'all_of', 'exclude_features': 'none_of'}[name]
+        return filter_by_features(queryset, **{predicate: parse_feature_ids(value)})
 
 class FeatureFilter(filters.FilterSet):
     name = filters.CharFilter(lookup_expr='icontains')
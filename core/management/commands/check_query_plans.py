@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.query_plans import QUERY_SHAPES, check_query_plans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot read queries and report whether indexes serve them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--shape', action='append', default=[], choices=sorted(QUERY_SHAPES),
+            help='Only check this query shape (repeatable)'
+        )
+        parser.add_argument(
+            '--prefer-indexes', action='store_true',
+            help='Disable sequential scans, bitmap scans and sorts while explaining (PostgreSQL, for small databases)'
+        )
+        parser.add_argument(
+            '--show-plans', action='store_true',
+            help='Print the full plan of every query'
+        )
+
+    def handle(self, *args, **options):
+        results = check_query_plans(
+            prefer_indexes=options['prefer_indexes'],
+            shapes=options['shape'] or None,
+        )
+        if not results:
+            raise CommandError('No places found; seed the database first.')
+
+        missing = 0
+        for result in results:
+            if not result.index_exists:
+                missing += 1
+                self.stdout.write(self.style.WARNING(f"{result.name}: index {result.index} does not exist"))
+            elif result.uses_index:
+                self.stdout.write(self.style.SUCCESS(f"{result.name}: served by an index"))
+            else:
+                missing += 1
+                self.stdout.write(self.style.WARNING(
+                    f"{result.name}: not served by an index in order (expected {result.index})"
+                ))
+            if options['show_plans'] or not (result.index_exists and result.uses_index):
+                self.stdout.write(result.plan)
+
+        if missing:
+            self.stdout.write(self.style.WARNING(f"{missing} of {len(results)} queries are not served by an index"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"All {len(results)} queries are served by an index"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.photo_hashing import compute_missing_hashes, dedupe_photos
+
+
+class Command(BaseCommand):
+    help = 'Flag (or reject) near-duplicate photos of each place, keeping the oldest copy'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--place', action='append', default=None, dest='places', metavar='PLACE_ID',
+            help='Only deduplicate this place (repeatable)'
+        )
+        parser.add_argument(
+            '--reject', action='store_true',
+            help='Also reject pending duplicates (approved duplicates are only flagged)'
+        )
+        parser.add_argument(
+            '--skip-hashing', action='store_true',
+            help='Do not hash uploaded photos that have no hashes yet'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Count duplicates without flagging or rejecting them (missing hashes are still computed)'
+        )
+
+    def handle(self, *args, **options):
+        if not options['skip_hashing']:
+            hashed = compute_missing_hashes()
+            self.stdout.write(f'Hashed {hashed} photos')
+
+        summary = dedupe_photos(
+            place_ids=options['places'],
+            reject=options['reject'],
+            dry_run=options['dry_run'],
+        )
+
+        verb = 'Found' if options['dry_run'] else 'Flagged'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {summary['flagged']} duplicates in {summary['places']} places"
+            f" ({summary['rejected']} rejected)"
+        ))
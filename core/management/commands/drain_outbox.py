@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.utils.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Apply pending outbox events (notifications and points)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Events applied per transaction (default OUTBOX_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep draining until interrupted'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to wait between drains with --loop'
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            processed = process_outbox(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} outbox events"))
+            return
+
+        try:
+            while True:
+                processed = process_outbox(batch_size=options['batch_size'])
+                if processed:
+                    self.stdout.write(f"Processed {processed} outbox events")
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Stopped draining the outbox"))
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.feature_import import associate_features, import_features
+
+
+def load_rows(path):
+    """Rows from a JSON list or a JSON Lines file."""
+    with open(path, encoding='utf-8') as handle:
+        content = handle.read()
+    try:
+        rows = json.loads(content)
+    except json.JSONDecodeError:
+        try:
+            rows = [json.loads(line) for line in content.splitlines() if line.strip()]
+        except json.JSONDecodeError as e:
+            raise CommandError(f'{path} is neither JSON nor JSON Lines: {e}')
+    if not isinstance(rows, list):
+        raise CommandError(f'{path} must contain a list of rows')
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import features and/or place-feature links from JSON or JSON Lines files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--features', metavar='PATH',
+            help='Features to create: {"name", "featureType", "icon"} per row'
+        )
+        parser.add_argument(
+            '--links', metavar='PATH',
+            help='Links to add: {"place_id", "feature_ids": [...]} per row (imported after --features)'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        if not options['features'] and not options['links']:
+            raise CommandError('Pass --features and/or --links.')
+
+        errors = []
+        if options['features']:
+            result = import_features(load_rows(options['features']), batch_size=options['batch_size'])
+            self.stdout.write(f"Features: {result['created']} created, {result['skipped']} skipped")
+            errors += [('features', error) for error in result['errors']]
+        if options['links']:
+            result = associate_features(load_rows(options['links']), batch_size=options['batch_size'])
+            self.stdout.write(f"Links: {result['linked']} added to {result['places']} places")
+            errors += [('links', error) for error in result['errors']]
+
+        for kind, error in errors:
+            self.stderr.write(f"{kind} row {error['index']}: {json.dumps(error['errors'])}")
+        style = self.style.WARNING if errors else self.style.SUCCESS
+        self.stdout.write(style(f'Import finished with {len(errors)} invalid rows'))
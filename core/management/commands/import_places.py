@@ -0,0 +1,71 @@
+import json
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.place_import import IMPORT_FORMATS, detect_format, import_places, open_rows
+
+
+def write_checkpoint(path, summary):
+    """Replace the checkpoint file atomically, so a crash never leaves half of one."""
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as handle:
+        json.dump({'processed': summary['processed'], 'created': summary['created']}, handle)
+    os.replace(temp_path, path)
+
+
+class Command(BaseCommand):
+    help = 'Bulk import places from a CSV or JSON Lines file, resuming from a checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON Lines file')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='File format (default: from the extension)')
+        parser.add_argument('--user', help='Username recorded as creator and moderator')
+        parser.add_argument('--pending', action='store_true', help='Leave the places pending moderation')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per transaction')
+        parser.add_argument(
+            '--checkpoint', metavar='PATH',
+            help='Progress file, updated after every batch (default: <path>.checkpoint)'
+        )
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or detect_format(path)
+        if file_format is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format.')
+
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist.")
+
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        start = 0
+        if os.path.exists(checkpoint) and not options['restart']:
+            with open(checkpoint, encoding='utf-8') as handle:
+                start = json.load(handle)['processed']
+            self.stdout.write(f'Resuming after row {start}')
+
+        with open(path, 'rb') as handle:
+            summary = import_places(
+                open_rows(handle, file_format),
+                user=user,
+                approve=not options['pending'],
+                batch_size=options['batch_size'],
+                start=start,
+                on_batch=lambda progress: write_checkpoint(checkpoint, progress),
+            )
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        for error in summary['errors']:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        style = self.style.WARNING if summary['errors'] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Imported {summary['created']} places ({summary['geocoding']} queued for geocoding, "
+            f"{len(summary['errors'])} rows with errors)"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.photo_layout import migrate_photo_layout
+
+
+class Command(BaseCommand):
+    help = 'Move place photo files from the per-place layout into fan-out directories'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Photos loaded from the database per query'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='List the files that would be moved without moving them'
+        )
+
+    def handle(self, *args, **options):
+        summary = migrate_photo_layout(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            stdout=self.stdout,
+        )
+
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        message = f"{verb} {summary['files']} files of {summary['photos']} photos"
+        if summary['failed']:
+            self.stdout.write(self.style.WARNING(f"{message}; {summary['failed']} photos failed (see log)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
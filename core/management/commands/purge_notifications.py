@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.notification_retention import purge_notifications
+
+
+class Command(BaseCommand):
+    help = 'Delete expired notifications in batches, optionally archiving them first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Default retention in days (defaults to NOTIFICATION_RETENTION_DAYS)'
+        )
+        parser.add_argument(
+            '--rule', action='append', default=[], metavar='TYPE=DAYS',
+            help='Per-type retention override, e.g. --rule new_photo=14 (repeatable)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Rows deleted per batch (defaults to NOTIFICATION_RETENTION_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=None,
+            help='Seconds to sleep between batches (defaults to NOTIFICATION_RETENTION_BATCH_PAUSE)'
+        )
+        parser.add_argument(
+            '--archive-dir', default=None,
+            help='Write deleted rows to a gzip-compressed JSON lines file in this directory'
+        )
+
+    def handle(self, *args, **options):
+        rules = dict(getattr(settings, 'NOTIFICATION_RETENTION_RULES', {}))
+        for rule in options['rule']:
+            notification_type, _, days = rule.partition('=')
+            if not notification_type or not days.isdigit():
+                raise CommandError(f"Invalid rule '{rule}'. Expected TYPE=DAYS.")
+            rules[notification_type] = int(days)
+
+        summary = purge_notifications(
+            days=options['days'],
+            rules=rules,
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            archive_dir=options['archive_dir'],
+        )
+
+        for notification_type, deleted in summary.items():
+            self.stdout.write(f'{notification_type}: {deleted} deleted')
+        self.stdout.write(self.style.SUCCESS(f'Deleted {sum(summary.values())} notifications'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.feature_bits import rebuild_feature_bits
+
+
+class Command(BaseCommand):
+    help = 'Recompute Place.feature_bits from the place-feature links'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Places recomputed per batch'
+        )
+
+    def handle(self, *args, **options):
+        processed = rebuild_feature_bits(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt feature bits of {processed} places"))
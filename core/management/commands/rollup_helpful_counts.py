@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.helpful_votes import rollup_helpful_counts
+
+
+class Command(BaseCommand):
+    help = 'Fold the sharded helpful vote counters into Review.helpful_count'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Reviews rolled up per transaction'
+        )
+
+    def handle(self, *args, **options):
+        updated = rollup_helpful_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rolled up helpful vote counts of {updated} reviews"))
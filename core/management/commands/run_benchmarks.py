@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.benchmarks import CONNECTION_SCENARIOS, SCENARIOS, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Measure p50/p95 latency and query counts of the core endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', default=[], choices=sorted([*SCENARIOS, *CONNECTION_SCENARIOS]),
+            help='Only run this scenario (repeatable)'
+        )
+        parser.add_argument('--iterations', type=int, default=20, help='Measured iterations per scenario')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured iterations per scenario')
+        parser.add_argument('--label', default='', help='Label stored with the results, e.g. a commit hash')
+        parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+
+        try:
+            report = run_benchmarks(
+                scenarios=options['scenario'] or None,
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                label=options['label'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for name, result in report['results'].items():
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"{name}: {result['error']}"))
+            else:
+                self.stdout.write(
+                    f"{name}: p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+                    f"{result['queries']} queries"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
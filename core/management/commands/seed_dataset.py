@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.seed_data import SEED_PASSWORD, seed_dataset
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, realistic dataset for benchmarking (do not run against production)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Users to create')
+        parser.add_argument('--places', type=int, default=1000, help='Places to create')
+        parser.add_argument('--reviews', type=int, default=10000, help='Reviews to create (at most one per user and place)')
+        parser.add_argument('--photos', type=int, default=3000, help='Photos to create')
+        parser.add_argument('--features', type=int, default=30, help='Total features to have in the catalog')
+        parser.add_argument('--helpful-votes', type=int, default=20000, help='Helpful votes to create')
+        parser.add_argument('--notifications', type=int, default=20000, help='Notifications to create')
+        parser.add_argument('--points', type=int, default=10000, help='Points history entries to create')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('At least one user is required.')
+
+        summary = seed_dataset(
+            users=options['users'],
+            places=options['places'],
+            reviews=options['reviews'],
+            photos=options['photos'],
+            features=options['features'],
+            helpful_votes=options['helpful_votes'],
+            notifications=options['notifications'],
+            points=options['points'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+
+        for kind, count in summary.items():
+            self.stdout.write(f'{kind}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {sum(summary.values())} rows. Seeded users log in with password '{SEED_PASSWORD}'."
+        ))
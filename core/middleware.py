@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from rest_framework import status
+from rest_framework.permissions import AllowAny
 import re
 import logging
 
@@ -11,7 +13,7 @@ class UserStatusMiddleware(MiddlewareMixin):
     Middleware to check user status on protected routes.
     If a user is suspended or deleted, they should not be able to access protected resources.
     """
-    
+
     # Routes that don't require user status check
     PUBLIC_ROUTES = [
         r'^/api/token/?$',  # Login endpoint
@@ -22,22 +24,53 @@ class UserStatusMiddleware(MiddlewareMixin):
         r'^/api/places/?$',  # Public places listing (GET method only)
         # Add other public routes here
     ]
-    
+    # All of the above as one pattern, compiled once
+    PUBLIC_ROUTES_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in PUBLIC_ROUTES))
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        # view function -> whether it is open to anyone, classified on first use
+        self._public_views = {}
+
+    def is_public_view(self, view_func):
+        """
+        Whether a DRF view only uses AllowAny, so there is nothing to protect.
+        """
+        try:
+            return self._public_views[view_func]
+        except KeyError:
+            pass
+        view_class = getattr(view_func, 'cls', None)
+        public = False
+        if view_class is not None:
+            initkwargs = getattr(view_func, 'initkwargs', None) or {}
+            permission_classes = initkwargs.get('permission_classes', view_class.permission_classes)
+            public = bool(permission_classes) and all(
+                permission is AllowAny for permission in permission_classes
+            )
+        self._public_views[view_func] = public
+        return public
+
     def process_view(self, request, view_func, view_args, view_kwargs):
         # Skip check if route is public
         path = request.path_info
         if request.method == 'GET' and path.startswith('/api/places'):
             return None
-            
-        for pattern in self.PUBLIC_ROUTES:
-            if re.match(pattern, path):
-                return None
-                
+
+        if self.PUBLIC_ROUTES_RE.match(path) or self.is_public_view(view_func):
+            return None
+
+        # Only session users are known at this point (token users are
+        # authenticated, and refused if inactive, by the view). Without a
+        # session cookie there is no user, so don't evaluate request.user.
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            return None
+
         # Skip check if user is not authenticated
         user = getattr(request, 'user', None)
         if not user or not user.is_authenticated:
             return None
-            
+
         # Check if user is active
         if not user.is_active:
             logger.warning(f"Inactive user {user.id} attempted to access {path}")
@@ -45,5 +78,5 @@ class UserStatusMiddleware(MiddlewareMixin):
                 {"detail": "Your account is suspended or inactive. Please contact support."},
                 status=status.HTTP_403_FORBIDDEN
             )
-            
-        return None 
\ No newline at end of file
+
+        return None
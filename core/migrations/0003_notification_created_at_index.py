@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0002_enable_pg_trgm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at'], name='core_notifi_created_d0c445_idx'),
+        ),
+    ]
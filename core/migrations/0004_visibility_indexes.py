@@ -0,0 +1,49 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_notification_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['created_by', '-created_at'], name='place_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('draft', False), ('moderation_status', 'APPROVED')), fields=['-created_at'], name='place_visible_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('draft', False), ('moderation_status', 'APPROVED')), fields=['-avg_rating'], name='place_visible_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('draft', False), ('moderation_status', 'APPROVED')), fields=['place_type', '-created_at'], name='place_visible_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(condition=models.Q(('draft', False), ('moderation_status', 'APPROVED')), fields=['district', '-created_at'], name='place_visible_district_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placephoto',
+            index=models.Index(condition=models.Q(('moderation_status', 'APPROVED')), fields=['place', '-uploaded_at'], name='photo_place_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placephoto',
+            index=models.Index(fields=['user', 'moderation_status'], name='photo_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('moderation_status', 'APPROVED')), fields=['place', '-created_at'], name='review_place_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['user', 'moderation_status'], name='review_user_status_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:29
+
+import core.utils.photo_storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placephoto',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='image',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=core.utils.photo_storage.get_place_photo_storage, upload_to=core.utils.photo_storage.get_photo_path),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
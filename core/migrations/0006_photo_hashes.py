@@ -0,0 +1,65 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_photo_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placephoto',
+            name='dhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='core.placephoto'),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='phash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='phash_band_0',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='phash_band_1',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='phash_band_2',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='placephoto',
+            name='phash_band_3',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='placephoto',
+            index=models.Index(fields=['place', 'phash_band_0'], name='photo_phash_band_0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placephoto',
+            index=models.Index(fields=['place', 'phash_band_1'], name='photo_phash_band_1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placephoto',
+            index=models.Index(fields=['place', 'phash_band_2'], name='photo_phash_band_2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='placephoto',
+            index=models.Index(fields=['place', 'phash_band_3'], name='photo_phash_band_3_idx'),
+        ),
+    ]
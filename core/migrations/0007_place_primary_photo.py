@@ -0,0 +1,57 @@
+# Generated by Django 5.0.2 on 2026-10-18 23:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+THUMBNAIL_SIZES = ['thumb', 'card', 'full']
+
+
+def backfill_primary_photos(apps, schema_editor):
+    """Point each place at its newest approved primary photo."""
+    Place = apps.get_model('core', 'Place')
+    PlacePhoto = apps.get_model('core', 'PlacePhoto')
+
+    seen = set()
+    photos = (
+        PlacePhoto.objects
+        .filter(is_primary=True, moderation_status='APPROVED')
+        .only('id', 'place_id', 'url', 'derivatives')
+        .order_by('place_id', '-uploaded_at')
+    )
+    for photo in photos.iterator():
+        if photo.place_id in seen:
+            continue
+        seen.add(photo.place_id)
+        # Same fallback as PlacePhoto.get_display_url('thumb')
+        thumbnail_url = next(
+            (
+                photo.derivatives.get(size, {}).get('jpeg')
+                for size in THUMBNAIL_SIZES
+                if photo.derivatives.get(size, {}).get('jpeg')
+            ),
+            photo.url
+        )
+        Place.objects.filter(pk=photo.place_id).update(
+            primary_photo_id=photo.id, primary_photo_thumbnail_url=thumbnail_url
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_photo_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='primary_photo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.placephoto'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='primary_photo_thumbnail_url',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.RunPython(backfill_primary_photos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.2 on 2026-10-19 00:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_moderation_claims'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewHelpfulCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('delta', models.IntegerField(default=0)),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='helpful_counter_shards', to='core.review')),
+            ],
+            options={
+                'unique_together': {('review', 'shard')},
+            },
+        ),
+    ]
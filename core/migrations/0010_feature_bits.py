@@ -0,0 +1,53 @@
+# Generated by Django 5.0.2 on 2026-10-19 00:23
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def backfill_feature_bits(apps, schema_editor):
+    """Number the existing features and store each place's feature bits."""
+    Feature = apps.get_model('core', 'Feature')
+    Place = apps.get_model('core', 'Place')
+    PlaceFeature = apps.get_model('core', 'PlaceFeature')
+
+    bits = {}
+    for bit, feature_id in enumerate(Feature.objects.order_by('name', 'pk').values_list('pk', flat=True), start=1):
+        Feature.objects.filter(pk=feature_id).update(bit=bit)
+        bits[feature_id] = bit
+
+    place_bits = defaultdict(list)
+    for place_id, feature_id in PlaceFeature.objects.values_list('place_id', 'feature_id').iterator():
+        place_bits[place_id].append(bits[feature_id])
+    places_by_bits = defaultdict(list)
+    for place_id, feature_bits in place_bits.items():
+        places_by_bits[tuple(sorted(feature_bits))].append(place_id)
+    for feature_bits, place_ids in places_by_bits.items():
+        Place.objects.filter(pk__in=place_ids).update(feature_bits=list(feature_bits))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_review_helpful_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feature',
+            name='bit',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='feature_bits',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['feature_bits'], name='place_feature_bits_gin'),
+        ),
+        migrations.RunPython(backfill_feature_bits, migrations.RunPython.noop),
+    ]
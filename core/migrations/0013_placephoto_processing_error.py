@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-19 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_claims_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placephoto',
+            name='processing_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
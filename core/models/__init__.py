@@ -1,4 +1,4 @@
-from .user import User
+from .user import User, ClaimsUser
 from .place import Place
 from .review import Review
 from .photo import PlacePhoto
@@ -7,13 +7,15 @@ from .badge import Badge
 from .user_badge import UserBadge
 from .user_points import UserPoints, UserLevel
 from .notification import Notification
-from .helpful_vote import HelpfulVote
+from .helpful_vote import HelpfulVote, ReviewHelpfulCounter
 from .mixins import TimestampMixin, ModerationMixin
 from .saved_place import SavedPlace
+from .outbox import OutboxEvent
 
 # Make models available at the package level
 __all__ = [
     'User',
+    'ClaimsUser',
     'Place',
     'Review',
     'PlacePhoto',
@@ -25,7 +27,9 @@ __all__ = [
     'UserLevel',
     'Notification',
     'HelpfulVote',
+    'ReviewHelpfulCounter',
     'SavedPlace',
+    'OutboxEvent',
     'TimestampMixin',
     'ModerationMixin',
 ] 
\ No newline at end of file
@@ -1,6 +1,6 @@
 from django.db import models
 from .mixins import TimestampMixin
-from django.db.models import Count, Sum
+from django.db.models import Count
 from django.utils import timezone
 import uuid
 
@@ -143,57 +143,45 @@ class Badge(TimestampMixin):
         @staticmethod
         def check_first_photo(user):
             """Check if user has uploaded at least one approved photo."""
-            return user.photo_uploads.filter(moderation_status='APPROVED').exists()
+            return user.photos.filter(moderation_status='APPROVED').exists()
         
         @staticmethod
         def check_photographer(user):
             """Check if user has uploaded at least 10 approved photos."""
-            return user.photo_uploads.filter(moderation_status='APPROVED').count() >= 10
+            return user.photos.filter(moderation_status='APPROVED').count() >= 10
         
         @staticmethod
         def check_photo_journalist(user):
             """Check if user has uploaded at least 30 approved photos."""
-            return user.photo_uploads.filter(moderation_status='APPROVED').count() >= 30
+            return user.photos.filter(moderation_status='APPROVED').count() >= 30
         
         @staticmethod
         def check_helpful_reviewer_bronze(user):
             """Check if user has received at least 5 helpful votes on their reviews."""
-            from .review import Review
+            from ..utils.helpful_votes import get_received_helpful_count
             
-            # Sum helpful_count across all user's reviews
-            total_helpful = Review.objects.filter(
-                user=user
-            ).aggregate(
-                total_helpful=Sum('helpful_count')
-            )['total_helpful'] or 0
+            # Sum helpful votes across all user's reviews, rolled up or not
+            total_helpful = get_received_helpful_count(user.pk)
             
             return total_helpful >= 5
         
         @staticmethod
         def check_helpful_reviewer_silver(user):
             """Check if user has received at least 25 helpful votes on their reviews."""
-            from .review import Review
+            from ..utils.helpful_votes import get_received_helpful_count
             
-            # Sum helpful_count across all user's reviews
-            total_helpful = Review.objects.filter(
-                user=user
-            ).aggregate(
-                total_helpful=Sum('helpful_count')
-            )['total_helpful'] or 0
+            # Sum helpful votes across all user's reviews, rolled up or not
+            total_helpful = get_received_helpful_count(user.pk)
             
             return total_helpful >= 25
         
         @staticmethod
         def check_helpful_reviewer_gold(user):
             """Check if user has received at least 100 helpful votes on their reviews."""
-            from .review import Review
-            
-            # Sum helpful_count across all user's reviews
-            total_helpful = Review.objects.filter(
-                user=user
-            ).aggregate(
-                total_helpful=Sum('helpful_count')
-            )['total_helpful'] or 0
+            from ..utils.helpful_votes import get_received_helpful_count
+            
+            # Sum helpful votes across all user's reviews, rolled up or not
+            total_helpful = get_received_helpful_count(user.pk)
             
             return total_helpful >= 100
         
@@ -11,6 +11,8 @@ class Feature(models.Model):
     name = models.CharField(max_length=255)
     icon = models.CharField(max_length=255, null=True, blank=True)
     feature_type = models.CharField(max_length=50, help_text="Category type: amenity, cuisine, etc.")
+    # Small integer standing for the feature in Place.feature_bits
+    bit = models.PositiveIntegerField(unique=True, null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['name']
@@ -22,6 +24,16 @@ class Feature(models.Model):
     def __str__(self):
         return f"{self.name} ({self.feature_type})"
 
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            self.bit = self.next_bit()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def next_bit(cls):
+        """The next unused bit (features are created rarely; the unique index guards races)."""
+        return (cls.objects.aggregate(models.Max('bit'))['bit__max'] or 0) + 1
+
     @classmethod
     def get_by_type(cls, feature_type):
         """
@@ -36,26 +36,35 @@ class HelpfulVote(TimestampMixin):
         Returns a tuple of (vote_added, helpful_count) where vote_added is a boolean
         indicating if a vote was added (True) or removed (False), and helpful_count
         is the new total number of helpful votes.
+        
+        The vote is inserted or deleted with a single statement and the count is
+        kept in sharded counter rows (see core/utils/helpful_votes.py), so the
+        review row is not locked. Points and the notification for the review
+        author are handled in the background.
         """
-        try:
-            # Try to delete an existing vote
-            vote = cls.objects.get(review=review, user=user)
-            vote.delete()
-            
-            # Update the review's helpful_count
-            review.helpful_count = models.F('helpful_count') - 1
-            review.save(update_fields=['helpful_count'])
-            review.refresh_from_db()
-            
-            return False, review.helpful_count
-            
-        except cls.DoesNotExist:
-            # Create a new vote
-            cls.objects.create(review=review, user=user, is_helpful=True)
-            
-            # Update the review's helpful_count
-            review.helpful_count = models.F('helpful_count') + 1
-            review.save(update_fields=['helpful_count'])
-            review.refresh_from_db()
-            
-            return True, review.helpful_count 
\ No newline at end of file
+        from ..utils.helpful_votes import toggle_helpful_vote
+        return toggle_helpful_vote(review.id, user.id)
+
+
+class ReviewHelpfulCounter(models.Model):
+    """
+    Pending change to a review's helpful_count.
+    
+    Votes add +1/-1 to one of HELPFUL_VOTE_COUNTER_SHARDS rows per review, picked
+    at random, so concurrent votes on a popular review rarely wait on the same
+    row. rollup_helpful_counts() periodically folds the rows into
+    Review.helpful_count and deletes them.
+    """
+    review = models.ForeignKey(
+        'core.Review',
+        on_delete=models.CASCADE,
+        related_name='helpful_counter_shards'
+    )
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['review', 'shard']
+        
+    def __str__(self):
+        return f"Review {self.review_id} shard {self.shard}: {self.delta:+d}"
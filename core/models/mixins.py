@@ -35,15 +35,30 @@ class ModerationMixin(models.Model):
         related_name='%(class)s_moderations'
     )
     moderation_comment = models.TextField(blank=True, default='')
+    # Moderation queue lease (see core/utils/moderation_queue.py)
+    claimed_by = models.ForeignKey(
+        'core.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='%(class)s_claims'
+    )
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         abstract = True
 
+    def clear_claim(self):
+        """Release the moderation queue lease once the content is moderated"""
+        self.claimed_by = None
+        self.claim_expires_at = None
+
     def approve(self, moderator):
         """Approve the content"""
         self.moderation_status = 'APPROVED'
         self.moderated_at = timezone.now()
         self.moderator = moderator
+        self.clear_claim()
         self.save()
 
     def reject(self, moderator):
@@ -51,6 +66,7 @@ class ModerationMixin(models.Model):
         self.moderation_status = 'REJECTED'
         self.moderated_at = timezone.now()
         self.moderator = moderator
+        self.clear_claim()
         self.save()
 
     @property
@@ -81,5 +97,9 @@ class ModerationMixin(models.Model):
             
         if comment:
             self.moderation_comment = comment
-            
-        self.save(update_fields=['moderation_status', 'moderated_at', 'moderator', 'moderation_comment']) 
\ No newline at end of file
+        
+        self.clear_claim()
+        self.save(update_fields=[
+            'moderation_status', 'moderated_at', 'moderator', 'moderation_comment',
+            'claimed_by', 'claim_expires_at'
+        ]) 
\ No newline at end of file
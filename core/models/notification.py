@@ -40,15 +40,37 @@ class Notification(models.Model):
             models.Index(fields=['user', '-created_at']),
             models.Index(fields=['notification_type']),
             models.Index(fields=['is_read']),
+            # Lets the retention job find the newest expired row without a scan
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
         return f"{self.notification_type} for {self.user.email}"
 
     def mark_as_read(self):
-        if not self.is_read:
-            self.is_read = True
-            self.save(update_fields=['is_read', 'updated_at'])
+        """
+        Mark the notification as read and update the user's unread counters.
+
+        Uses a conditional UPDATE so concurrent requests decrement the counters
+        only once.
+
+        Returns:
+            True if the notification was unread
+        """
+        from django.utils import timezone
+        from ..utils.notification_counters import notification_read
+
+        if self.is_read:
+            return False
+        now = timezone.now()
+        updated = Notification.objects.filter(pk=self.pk, is_read=False).update(
+            is_read=True, updated_at=now
+        )
+        self.is_read = True
+        self.updated_at = now
+        if updated:
+            notification_read(self.user_id, self.notification_type)
+        return bool(updated)
             
     @classmethod
     def create_content_notification(cls, content_obj, notification_type):
@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    A side effect (notification, points, badge rewards) waiting to be applied.
+
+    Signals write one compact event row in the transaction of the change that
+    caused it, instead of doing the work inline; core.utils.outbox drains the
+    rows in batches. idempotency_key is unique, so recording the same event
+    twice keeps one row.
+    """
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    idempotency_key = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The drainer only reads unprocessed rows, oldest first
+            models.Index(
+                fields=['id'],
+                name='outbox_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} {self.idempotency_key}"
@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from model_utils import FieldTracker
 from .mixins import TimestampMixin, ModerationMixin
+from ..utils.photo_storage import get_photo_path, get_place_photo_storage
 import uuid
 
 class PlacePhoto(TimestampMixin, ModerationMixin):
@@ -18,8 +19,42 @@ class PlacePhoto(TimestampMixin, ModerationMixin):
     is_approved = models.BooleanField(default=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
-    # Track changes to moderation_status
-    tracker = FieldTracker(['moderation_status'])
+    # Uploaded original; photos added by URL have no file
+    image = models.FileField(
+        upload_to=get_photo_path,
+        storage=get_place_photo_storage,
+        max_length=255,
+        null=True,
+        blank=True
+    )
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # Resized copies written by the processing pipeline:
+    # {"thumb": {"width": 200, "height": 150, "webp": <url>, "jpeg": <url>}, "card": {...}, "full": {...}}
+    derivatives = models.JSONField(default=dict, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    # Why the last processing attempt failed; cleared when processing succeeds
+    processing_error = models.TextField(blank=True, default='')
+
+    # Perceptual hashes (signed 64-bit) for near-duplicate detection; the pHash
+    # is also split into 16-bit bands for indexed lookups (see core/utils/photo_hashing.py)
+    phash = models.BigIntegerField(null=True, blank=True)
+    dhash = models.BigIntegerField(null=True, blank=True)
+    phash_band_0 = models.PositiveIntegerField(null=True, blank=True)
+    phash_band_1 = models.PositiveIntegerField(null=True, blank=True)
+    phash_band_2 = models.PositiveIntegerField(null=True, blank=True)
+    phash_band_3 = models.PositiveIntegerField(null=True, blank=True)
+    # Earlier photo of the same place that this one nearly duplicates
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='duplicates'
+    )
+
+    # Track changes to moderation_status, and to is_primary for Place.primary_photo
+    tracker = FieldTracker(['moderation_status', 'is_primary'])
 
     class Meta:
         ordering = ['-uploaded_at']
@@ -27,7 +62,35 @@ class PlacePhoto(TimestampMixin, ModerationMixin):
             models.Index(fields=['is_primary']),
             models.Index(fields=['place']),
             models.Index(fields=['user']),
+            # Approved photos of a place, newest first
+            models.Index(
+                fields=['place', '-uploaded_at'],
+                name='photo_place_approved_idx',
+                condition=models.Q(moderation_status='APPROVED'),
+            ),
+            # Contribution counts for badges
+            models.Index(fields=['user', 'moderation_status'], name='photo_user_status_idx'),
+            # Multi-index hashing buckets for duplicate lookups
+            models.Index(fields=['place', 'phash_band_0'], name='photo_phash_band_0_idx'),
+            models.Index(fields=['place', 'phash_band_1'], name='photo_phash_band_1_idx'),
+            models.Index(fields=['place', 'phash_band_2'], name='photo_phash_band_2_idx'),
+            models.Index(fields=['place', 'phash_band_3'], name='photo_phash_band_3_idx'),
         ]
 
     def __str__(self):
-        return f'Photo by {self.user.email} for {self.place.name}' 
\ No newline at end of file
+        return f'Photo by {self.user.email} for {self.place.name}'
+
+    def get_display_url(self, size='full', image_format='jpeg'):
+        """
+        Return the URL of the smallest derivative that fits the requested size,
+        falling back to larger derivatives and finally the original.
+        """
+        from django.conf import settings
+
+        sizes = list(settings.PHOTO_DERIVATIVE_SIZES)
+        start = sizes.index(size) if size in sizes else len(sizes) - 1
+        for name in sizes[start:]:
+            url = self.derivatives.get(name, {}).get(image_format)
+            if url:
+                return url
+        return self.url
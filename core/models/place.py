@@ -1,6 +1,11 @@
-from django.db import models
+import re
+from collections import defaultdict
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
-from django.db.models import Avg
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models import Avg, Q
+from django.db.models.functions import Coalesce
 from django.core.validators import URLValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
@@ -11,6 +16,9 @@ from .mixins import TimestampMixin, ModerationMixin
 from ..choices import PLACE_TYPE_CHOICES, PRICE_LEVEL_CHOICES, DISTRICT_CHOICES
 import uuid
 
+# Predicate of every public read path (lists, search, near me, facets)
+VISIBLE_PLACE_CONDITION = models.Q(moderation_status='APPROVED', draft=False)
+
 class Place(TimestampMixin, ModerationMixin):
     """
     A place that can be reviewed and rated.
@@ -51,9 +59,33 @@ class Place(TimestampMixin, ModerationMixin):
     website = models.URLField(max_length=255, validators=[URLValidator()], null=True, blank=True)
     phone = models.CharField(max_length=20, null=True, blank=True)
 
+    # Denormalized primary photo so lists can show card images without
+    # querying photos; maintained by refresh_primary_photo
+    primary_photo = models.ForeignKey(
+        'core.PlacePhoto',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    primary_photo_thumbnail_url = models.CharField(max_length=255, blank=True, default='')
+
+    # Feature.bit of every feature of the place, so feature predicates are
+    # array operators on one GIN-indexed column instead of joins through
+    # PlaceFeature; maintained by refresh_feature_bits
+    feature_bits = ArrayField(models.IntegerField(), default=list, blank=True)
+
     # Track changes to moderation_status
     tracker = FieldTracker(['moderation_status'])
 
+    DENORMALIZED_FIELDS = ('primary_photo', 'primary_photo_thumbnail_url', 'feature_bits')
+
+    # Saves tried when concurrent saves keep taking the generated slug
+    SLUG_ATTEMPTS = 3
+
+    # Fields checked by clean(); partial saves of other fields skip it
+    CLEAN_FIELDS = ('website', 'latitude', 'longitude')
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -64,27 +96,69 @@ class Place(TimestampMixin, ModerationMixin):
             models.Index(fields=['district']),
             models.Index(fields=['created_at']),
             models.Index(fields=['latitude', 'longitude']),
+            # Owner listings ("my places") ordered by newest first
+            models.Index(fields=['created_by', '-created_at'], name='place_owner_created_idx'),
+            # Partial indexes over publicly visible places only; the public read
+            # paths all filter on VISIBLE_PLACE_CONDITION, so pending, rejected
+            # and draft rows never bloat these indexes
+            models.Index(
+                fields=['-created_at'],
+                name='place_visible_created_idx',
+                condition=VISIBLE_PLACE_CONDITION,
+            ),
+            models.Index(
+                fields=['-avg_rating'],
+                name='place_visible_rating_idx',
+                condition=VISIBLE_PLACE_CONDITION,
+            ),
+            models.Index(
+                fields=['place_type', '-created_at'],
+                name='place_visible_type_idx',
+                condition=VISIBLE_PLACE_CONDITION,
+            ),
+            models.Index(
+                fields=['district', '-created_at'],
+                name='place_visible_district_idx',
+                condition=VISIBLE_PLACE_CONDITION,
+            ),
+            # Feature predicates (@> for all, && for any/none)
+            GinIndex(fields=['feature_bits'], name='place_feature_bits_gin'),
         ]
 
     def __str__(self):
         return self.name
         
-    def generate_unique_slug(self):
-        """Generate a unique slug for this place"""
-        original_slug = slugify(self.name)
-        if not original_slug:
-            original_slug = 'place'
-        
-        slug = original_slug
+    @staticmethod
+    def slug_base(name):
+        """The slug a place named name gets if it is free (room is left for a suffix)"""
+        return slugify(name)[:240] or 'place'
+
+    @staticmethod
+    def allocate_slug(base, taken):
+        """The first of base, base-1, base-2, ... not in taken; adds it to taken"""
+        slug = base
         counter = 1
-        
-        # Keep checking until we have a unique slug
-        while Place.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-            slug = f"{original_slug}-{counter}"
+        while slug in taken:
+            slug = f"{base}-{counter}"
             counter += 1
-            
+        taken.add(slug)
         return slug
 
+    def generate_unique_slug(self):
+        """
+        Generate a unique slug for this place with a single query: the base
+        and its numbered variants (base-1, base-2, ...) are fetched and the
+        first free suffix is picked. Longer slugs that merely start with the
+        base ("cafe" -> "cafe-luna") are not fetched. save() retries if a
+        concurrent save takes it first.
+        """
+        base = self.slug_base(self.name)
+        numbered = Q(slug__startswith=f'{base}-', slug__regex=rf'^{re.escape(base)}-[0-9]+$')
+        taken = set(
+            Place.objects.filter(Q(slug=base) | numbered).exclude(pk=self.pk).values_list('slug', flat=True)
+        )
+        return self.allocate_slug(base, taken)
+
     def clean(self):
         """Validate the place data"""
         if self.website:
@@ -100,17 +174,48 @@ class Place(TimestampMixin, ModerationMixin):
             raise ValidationError({'longitude': 'Longitude must be between -180 and 180.'})
 
     def save(self, *args, **kwargs):
-        """Custom save method"""
-        if self.created_by and not self.contributor_id:
-            self.contributor_id = self.created_by.id
+        """
+        Custom save method. A partial save (update_fields) only validates and
+        fills in what it writes, so internal updates of counters and statuses
+        skip clean() and slug generation; full saves from user edits do both.
+        """
+        update_fields = kwargs.get('update_fields')
+        written = set(update_fields) if update_fields is not None else None
+
+        if written is None and self.created_by_id and not self.contributor_id:
+            self.contributor_id = self.created_by_id
         
-        self.clean()
+        if written is None or written & set(self.CLEAN_FIELDS):
+            self.clean()
         
         # Generate slug if it doesn't exist
-        if not self.slug:
+        slug_generated = not self.slug and (written is None or 'slug' in written)
+        if slug_generated:
             self.slug = self.generate_unique_slug()
         
-        super().save(*args, **kwargs)
+        # Denormalized fields are written only by their refresh methods; a
+        # full save from an instance loaded earlier must not overwrite them
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        
+        if not slug_generated:
+            super().save(*args, **kwargs)
+            return
+        for attempt in range(self.SLUG_ATTEMPTS):
+            try:
+                # Savepoint, so a conflict does not break the caller's transaction
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                # Retry only if the slug was taken between allocation and insert
+                slug_taken = Place.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not slug_taken or attempt == self.SLUG_ATTEMPTS - 1:
+                    raise
+                self.slug = self.generate_unique_slug()
 
     def calculate_average_rating(self):
         """Calculate the average rating for this place."""
@@ -120,14 +225,35 @@ class Place(TimestampMixin, ModerationMixin):
         return reviews.aggregate(Avg('overall_rating'))['overall_rating__avg']
 
     def update_average_ratings(self):
-        """Update average rating based on approved reviews"""
-        approved_reviews = self.reviews.filter(moderation_status='APPROVED')
-        if not approved_reviews.exists():
-            self.avg_rating = 0
-        else:
-            aggregates = approved_reviews.aggregate(avg_overall=Avg('overall_rating'))
-            self.avg_rating = aggregates['avg_overall'] or 0
-        self.save()
+        """
+        Update average rating based on approved reviews. Only avg_rating is
+        written, with a QuerySet.update, so no other column is rewritten and
+        no post_save signals fire.
+        """
+        aggregates = self.reviews.filter(moderation_status='APPROVED').aggregate(avg_overall=Avg('overall_rating'))
+        self.avg_rating = aggregates['avg_overall'] or 0
+        Place.objects.filter(pk=self.pk).update(avg_rating=self.avg_rating)
+
+    @classmethod
+    def bulk_update_average_ratings(cls, place_ids):
+        """
+        Recompute avg_rating of many places with a single UPDATE
+        (same result as update_average_ratings on each).
+        """
+        from .review import Review
+
+        if not place_ids:
+            return 0
+        average = (
+            Review.objects
+            .filter(place=models.OuterRef('pk'), moderation_status='APPROVED')
+            .values('place')
+            .annotate(average=Avg('overall_rating'))
+            .values('average')
+        )
+        return cls.objects.filter(pk__in=list(place_ids)).update(
+            avg_rating=Coalesce(models.Subquery(average), models.Value(0.0))
+        )
 
     def get_features_by_type(self, feature_type):
         """Get all features of a specific type"""
@@ -135,7 +261,7 @@ class Place(TimestampMixin, ModerationMixin):
 
     def get_primary_photo(self):
         """Get the primary photo for this place"""
-        return self.photos.filter(is_primary=True, moderation_status='APPROVED').first()
+        return self.primary_photo
 
     def get_approved_photos(self):
         """Get all approved photos for this place"""
@@ -162,7 +288,55 @@ class Place(TimestampMixin, ModerationMixin):
     @property
     def has_primary_photo(self):
         """Check if the place has a primary photo"""
-        return self.photos.filter(is_primary=True, moderation_status='APPROVED').exists()
+        return self.primary_photo_id is not None
+
+    @classmethod
+    def refresh_primary_photo(cls, place_id):
+        """
+        Recompute the denormalized primary photo of a place: its newest
+        approved photo flagged as primary, if any.
+        """
+        from .photo import PlacePhoto
+
+        photo = (
+            PlacePhoto.objects
+            .filter(place_id=place_id, is_primary=True, moderation_status='APPROVED')
+            .only('id', 'url', 'derivatives')
+            .order_by('-uploaded_at')
+            .first()
+        )
+        cls.objects.filter(pk=place_id).update(
+            primary_photo=photo,
+            primary_photo_thumbnail_url=photo.get_display_url('thumb') if photo else ''
+        )
+        return photo
+
+    @classmethod
+    def refresh_feature_bits(cls, place_ids):
+        """
+        Recompute feature_bits of the given places from PlaceFeature, with one
+        UPDATE per distinct feature set.
+        """
+        from .feature import PlaceFeature
+
+        place_ids = set(place_ids)
+        if not place_ids:
+            return
+        bits = defaultdict(list)
+        rows = (
+            PlaceFeature.objects
+            .filter(place_id__in=place_ids, feature__bit__isnull=False)
+            .order_by('feature__bit')
+            .values_list('place_id', 'feature__bit')
+        )
+        for place_id, bit in rows:
+            bits[str(place_id)].append(bit)
+        places_by_bits = defaultdict(list)
+        for place_id in place_ids:
+            # Ids may be given as UUIDs or strings
+            places_by_bits[tuple(bits.get(str(place_id), ()))].append(place_id)
+        for feature_bits, ids in places_by_bits.items():
+            cls.objects.filter(pk__in=ids).update(feature_bits=list(feature_bits))
 
     @property
     def rating_summary(self):
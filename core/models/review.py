@@ -36,10 +36,26 @@ class Review(TimestampMixin, ModerationMixin):
         indexes = [
             models.Index(fields=['helpful_count']),
             models.Index(fields=['created_at']),
+            # Approved reviews of a place, newest first
+            models.Index(
+                fields=['place', '-created_at'],
+                name='review_place_approved_idx',
+                condition=models.Q(moderation_status='APPROVED'),
+            ),
+            # Contribution counts for badges
+            models.Index(fields=['user', 'moderation_status'], name='review_user_status_idx'),
         ]
 
     def __str__(self):
         return f'Review by {self.user.email} for {self.place.name}'
+    
+    @property
+    def current_helpful_count(self):
+        """
+        helpful_count plus the votes not rolled up yet, when the queryset was
+        annotated by core.utils.helpful_votes.with_pending_helpful_counts
+        """
+        return max(self.helpful_count + (getattr(self, 'pending_helpful_count', 0) or 0), 0)
         
     def save(self, *args, **kwargs):
         """
@@ -44,4 +44,28 @@ class User(AbstractUser):
         db_table = 'auth_user'
         
     def __str__(self):
-        return self.username or self.email 
\ No newline at end of file
+        return self.username or self.email 
+
+class ClaimsUser(User):
+    """
+    A user built from access token claims (core.authentication) without a
+    query. Fields not carried by the token are deferred; the first access to
+    any of them loads all of them with one query.
+    """
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        # The token's is_staff / is_superuser may be stale and is_active is
+        # assumed, so a full save could write them over the real row
+        if kwargs.get('update_fields') is None:
+            raise ValueError(
+                "A ClaimsUser must be saved with update_fields; load a User to save all fields."
+            )
+        super().save(*args, **kwargs)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
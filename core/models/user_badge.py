@@ -38,8 +38,7 @@ class UserBadge(TimestampMixin):
         Returns:
             Tuple of (UserBadge instance, whether it was created)
         """
-        from .notification import Notification
-        from .user_points import UserPoints
+        from ..utils.outbox import record_badge_awarded
         
         # Check if the user already has this badge
         user_badge, created = cls.objects.get_or_create(
@@ -47,27 +46,8 @@ class UserBadge(TimestampMixin):
             badge=badge
         )
         
-        # If the badge was just created, create a notification and award points
+        # The notification and the points follow through the outbox
         if created:
-            # Create a notification without using content_type and object_id
-            # since badge IDs are UUIDs which don't work with PositiveIntegerField
-            Notification.objects.create(
-                user=user,
-                notification_type='badge_earned',
-                title=f'New Badge Earned: {badge.name}!',
-                message=(
-                    f'Congratulations! You\'ve earned the badge: '
-                    f'{badge.name}. {badge.description}'
-                )
-            )
-            
-            # Award points for the badge (fixed value since badge.points no longer exists)
-            UserPoints.add_points(
-                user=user,
-                points=10,  # Default points value for badges
-                source_type='badge',
-                source_id=badge.id,
-                description=f"Earned the {badge.name} badge"
-            )
+            record_badge_awarded(user_badge)
                 
         return user_badge, created 
\ No newline at end of file
@@ -3,6 +3,7 @@ from django.conf import settings
 from django.db.models import Sum
 from .mixins import TimestampMixin
 import uuid
+from collections import defaultdict
 
 class UserPoints(TimestampMixin):
     """
@@ -61,27 +62,17 @@ class UserPoints(TimestampMixin):
         return total
     
     @classmethod
-    def add_points(cls, user, points, source_type, source_id=None, description=None):
+    def build_record(cls, user_id, points, source_type, source_id=None, description=None):
         """
-        Add points to a user's account.
+        Build an unsaved points record.
         
-        Args:
-            user: User to add points to
-            points: Number of points to add (positive integer)
-            source_type: Type of action that generated points
-            source_id: Optional ID of the object that generated points (if UUID, will be included in description)
-            description: Optional description of the points
-        
-        Returns:
-            UserPoints instance
+        UUID source ids don't fit source_id and are added to the description instead.
         """
         if not description:
             # Generate a generic description based on source_type
             source_desc = dict(cls.POINT_SOURCES).get(source_type, source_type)
             description = f"Points for {source_desc}"
         
-        print(f"[DEBUG UserPoints.add_points] Received source_id: {source_id}, type: {type(source_id)}") # DEBUG PRINT
-
         numeric_source_id = None
         if source_id:
             if isinstance(source_id, uuid.UUID): # Explicit check for UUID
@@ -94,14 +85,33 @@ class UserPoints(TimestampMixin):
                     # If source_id is not an integer (e.g., other string), include it in the description
                     description = f"{description} (ID: {source_id})"
         
-        # Create the points record
-        points_record = cls.objects.create(
-            user=user,
+        return cls(
+            user_id=user_id,
             points=points,
             source_type=source_type,
             source_id=numeric_source_id,  # Only use source_id if it's numeric
             description=description
         )
+    
+    @classmethod
+    def add_points(cls, user, points, source_type, source_id=None, description=None):
+        """
+        Add points to a user's account.
+        
+        Args:
+            user: User to add points to
+            points: Number of points to add (positive integer)
+            source_type: Type of action that generated points
+            source_id: Optional ID of the object that generated points (if UUID, will be included in description)
+            description: Optional description of the points
+        
+        Returns:
+            UserPoints instance
+        """
+
+        # Create the points record
+        points_record = cls.build_record(user.id, points, source_type, source_id, description)
+        points_record.save()
         
         # Update User.guide_points
         user.guide_points = cls.get_total_points(user)
@@ -112,6 +122,42 @@ class UserPoints(TimestampMixin):
         
         return points_record
     
+    @classmethod
+    def bulk_add_points(cls, records):
+        """
+        Save many points records (see build_record) at once.
+        
+        guide_points is incremented with one UPDATE per distinct delta instead
+        of being recomputed per record; level checks run only for users whose
+        new total reaches a higher level.
+        
+        Returns:
+            The saved records
+        """
+        from django.contrib.auth import get_user_model
+        from django.db.models import F
+        
+        if not records:
+            return []
+        created = cls.objects.bulk_create(records, batch_size=500)
+        
+        deltas = defaultdict(int)
+        for record in records:
+            deltas[record.user_id] += record.points
+        users_by_delta = defaultdict(list)
+        for user_id, delta in deltas.items():
+            users_by_delta[delta].append(user_id)
+        
+        User = get_user_model()
+        for delta, user_ids in users_by_delta.items():
+            User.objects.filter(pk__in=user_ids).update(guide_points=F('guide_points') + delta)
+        
+        for user in User.objects.filter(pk__in=list(deltas)):
+            if UserLevel.calculate_level(user.guide_points) > user.guide_level:
+                UserLevel.check_level_progress(user)
+        
+        return created
+    
     @classmethod
     def deduct_points(cls, user, points, source_type, source_id=None, description=None):
         """
@@ -1,12 +1,17 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from .models import Place, Review, PlacePhoto, Feature, Notification, HelpfulVote, SavedPlace
 from .models import Badge, UserBadge, UserPoints, UserLevel
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.core.validators import URLValidator
-from .choices import PLACE_TYPE_CHOICES
+from .choices import DISTRICT_CHOICES, PLACE_TYPE_CHOICES
+from .utils.photo_storage import validate_photo_file
+from .authentication import get_user_claims
 from django.contrib.contenttypes.models import ContentType
 import logging
 
@@ -28,12 +33,9 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     def get_token(cls, user):
         token = super().get_token(user)
 
-        # Add custom claims
-        token['email'] = user.email
-        token['firstName'] = user.first_name
-        token['lastName'] = user.last_name
-        token['isStaff'] = user.is_staff
-        token['authType'] = user.auth_type
+        # Add custom claims (what ClaimsJWTAuthentication builds the user from)
+        for claim, value in get_user_claims(user).items():
+            token[claim] = value
 
         return token
 
@@ -43,6 +45,35 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         data['user'] = UserSerializer(self.user).data
         return data
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuse inactive users and refresh the user claims from the database, so
+    claims in access tokens are at most ACCESS_TOKEN_LIFETIME old.
+    """
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{jwt_settings.USER_ID_FIELD: refresh[jwt_settings.USER_ID_CLAIM]}
+        ).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed('User is inactive or suspended', code='user_inactive')
+        for claim, value in get_user_claims(user).items():
+            refresh[claim] = value
+
+        data = {'access': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    # Blacklist app not installed
+                    pass
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False, style={'input_type': 'password'})
     passwordConfirm = serializers.CharField(write_only=True, required=False, style={'input_type': 'password'}, source='password_confirm')
@@ -130,11 +161,13 @@ class FeatureSerializer(serializers.ModelSerializer):
     """Serializer for features."""
     typeDisplay = serializers.CharField(source='get_type_display', read_only=True)
     featureType = serializers.CharField(source='feature_type')
+    # Only present when the queryset is annotated (core.utils.feature_catalog.with_places_count)
+    placesCount = serializers.IntegerField(source='places_count', read_only=True)
     
     class Meta:
         model = Feature
         fields = [
-            'id', 'name', 'featureType', 'typeDisplay', 'icon'
+            'id', 'name', 'featureType', 'typeDisplay', 'icon', 'placesCount'
         ]
         
     def validate_name(self, value):
@@ -180,6 +213,8 @@ class PlaceSerializer(serializers.ModelSerializer):
     isContributor = serializers.SerializerMethodField(source='get_is_contributor')
     statusDisplay = serializers.SerializerMethodField(source='get_status_display')
     placeTypeDisplay = serializers.CharField(source='place_type', read_only=True)
+    # Denormalized on Place, so lists need no photo queries
+    primaryPhoto = serializers.SerializerMethodField()
     
     # Map snake_case model fields to camelCase API fields
     googleMapsLink = serializers.URLField(source='google_maps_link', required=False, allow_null=True)
@@ -200,12 +235,12 @@ class PlaceSerializer(serializers.ModelSerializer):
             'featureIds', 'averageRating', 'totalReviews',
             'created_at', 'updated_at', 'moderation_status',
             'isContributor', 'statusDisplay', 'googleMapsLink',
-            'createdBy'
+            'createdBy', 'primaryPhoto'
         ]
         read_only_fields = [
             'contributor', 'averageRating', 'totalReviews',
             'created_at', 'updated_at', 'moderation_status', 'slug',
-            'isContributor', 'statusDisplay', 'placeTypeDisplay'
+            'isContributor', 'statusDisplay', 'placeTypeDisplay', 'primaryPhoto'
         ]
 
     def get_totalReviews(self, obj):
@@ -217,6 +252,15 @@ class PlaceSerializer(serializers.ModelSerializer):
         # Just use avg_rating, the field was renamed
         return obj.avg_rating if hasattr(obj, 'avg_rating') else None
         
+    def get_primaryPhoto(self, obj):
+        """Id and thumbnail URL of the place's primary photo"""
+        if obj.primary_photo_id is None:
+            return None
+        return {
+            'id': str(obj.primary_photo_id),
+            'thumbnailUrl': obj.primary_photo_thumbnail_url
+        }
+        
     def get_isContributor(self, obj):
         """Determine if the current user is the creator of this place"""
         request = self.context.get('request')
@@ -275,7 +319,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     value = serializers.FloatField(required=False, allow_null=True)
     cleanliness = serializers.FloatField(required=False, allow_null=True)
     overallRating = serializers.FloatField(source='overall_rating', required=False, allow_null=True) # Changed here
-    helpfulCount = serializers.IntegerField(source='helpful_count', read_only=True)
+    helpfulCount = serializers.IntegerField(source='current_helpful_count', read_only=True)
     
     class Meta:
         model = Review
@@ -422,19 +466,32 @@ class PhotoSerializer(serializers.ModelSerializer):
     isPrimary = serializers.BooleanField(source='is_primary', required=False)
     isApproved = serializers.BooleanField(source='is_approved', required=False, read_only=True)
     uploadedAt = serializers.DateTimeField(source='uploaded_at', read_only=True)
+    url = serializers.CharField(max_length=255, required=False)
+    
+    # Uploaded file; resized derivatives are generated in the background
+    image = serializers.FileField(write_only=True, required=False)
+    displayUrl = serializers.SerializerMethodField()
+    displayUrlWebp = serializers.SerializerMethodField()
+    # Earlier photo of the place that this one nearly duplicates (set during processing)
+    duplicateOf = serializers.UUIDField(source='duplicate_of_id', read_only=True)
+    # Set when generating the derivatives failed
+    processingError = serializers.CharField(source='processing_error', read_only=True)
     
     class Meta:
         model = PlacePhoto
         fields = [
-            'id', 'user', 'place', 'url',
+            'id', 'user', 'place', 'url', 'image',
             'caption', 'isPrimary', 'isApproved', 'uploadedAt',
             'created_at', 'updated_at', 'moderation_status',
-            'isOwner', 'statusDisplay'
+            'isOwner', 'statusDisplay',
+            'width', 'height', 'derivatives', 'displayUrl', 'displayUrlWebp',
+            'duplicateOf', 'processingError'
         ]
         read_only_fields = [
             'user', 'place', 'created_at', 
             'updated_at', 'moderation_status', 'isOwner',
-            'statusDisplay', 'uploadedAt', 'isApproved'
+            'statusDisplay', 'uploadedAt', 'isApproved',
+            'width', 'height', 'derivatives'
         ]
     
     def get_isOwner(self, obj):
@@ -453,19 +510,42 @@ class PhotoSerializer(serializers.ModelSerializer):
         }
         return status_map.get(obj.moderation_status, obj.moderation_status)
 
+    def get_displayUrl(self, obj):
+        """Smallest JPEG adequate for the view (the 'photo_size' context, default full)"""
+        return obj.get_display_url(self.context.get('photo_size', 'full'), 'jpeg')
+
+    def get_displayUrlWebp(self, obj):
+        """WebP variant of displayUrl"""
+        return obj.get_display_url(self.context.get('photo_size', 'full'), 'webp')
+
     # No order field to validate in PlacePhoto
 
+    def validate_image(self, value):
+        """Check size, type and dimensions of an uploaded file"""
+        try:
+            validate_photo_file(value)
+        except ValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return value
+
     def validate(self, data):
         """
         Additional validation:
-        - Ensure URL is provided on creation
+        - Ensure an image URL or file is provided on creation
         """
-        if not self.instance and not data.get('url'):
+        if not self.instance and not data.get('url') and not data.get('image'):
             raise serializers.ValidationError({
-                'url': 'An image URL is required'
+                'url': 'An image URL or file is required'
             })
         return data
 
+    def create(self, validated_data):
+        photo = super().create(validated_data)
+        if photo.image and not photo.url:
+            photo.url = photo.image.url
+            photo.save(update_fields=['url'])
+        return photo
+
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for notifications."""
     notificationType = serializers.CharField(source='notification_type')
@@ -506,6 +586,54 @@ class ModerationStatusSerializer(serializers.Serializer):
             })
         return data 
 
+class BulkModerationSerializer(ModerationStatusSerializer):
+    """Serializer for moderating many objects of one model at once."""
+    ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+
+    def validate_ids(self, value):
+        max_ids = getattr(settings, 'MODERATION_BULK_MAX_IDS', 1000)
+        if len(value) > max_ids:
+            raise serializers.ValidationError(f'At most {max_ids} ids can be moderated per request.')
+        return value
+
+class NameListField(serializers.Field):
+    """A list of names, given as a list or as a "|"-separated string (e.g. a CSV cell)."""
+    default_error_messages = {'invalid': 'Expected a list or a "|"-separated string.'}
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            data = data.split('|')
+        elif not isinstance(data, list):
+            self.fail('invalid')
+        return [str(name).strip() for name in data if str(name).strip()]
+
+    def to_representation(self, value):
+        return value
+
+class PlaceImportRowSerializer(serializers.Serializer):
+    """
+    One row of a place bulk import (core.utils.place_import). Validation
+    runs in memory only; slugs, features and coordinates are resolved by
+    the importer.
+    """
+    name = serializers.CharField(max_length=255)
+    address = serializers.CharField(max_length=255)
+    placeType = serializers.ChoiceField(source='place_type', choices=PLACE_TYPE_CHOICES)
+    district = serializers.ChoiceField(choices=DISTRICT_CHOICES, required=False, allow_null=True)
+    latitude = serializers.FloatField(min_value=-90, max_value=90, required=False, allow_null=True)
+    longitude = serializers.FloatField(min_value=-180, max_value=180, required=False, allow_null=True)
+    priceLevel = serializers.IntegerField(source='price_level', min_value=0, required=False, allow_null=True)
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    website = serializers.URLField(max_length=255, required=False, allow_null=True)
+    phone = serializers.CharField(max_length=20, required=False, allow_null=True)
+    googleMapsLink = serializers.URLField(source='google_maps_link', max_length=255, required=False, allow_null=True)
+    features = NameListField(required=False)
+
+    def validate(self, data):
+        if (data.get('latitude') is None) != (data.get('longitude') is None):
+            raise serializers.ValidationError('Give both latitude and longitude, or neither.')
+        return data
+
 class SavedPlaceSerializer(serializers.ModelSerializer):
     """Serializer for saved/bookmarked places."""
     placeDetails = serializers.SerializerMethodField()
@@ -19,6 +19,9 @@ PLACE_PHOTOS_ROOT = os.path.join(MEDIA_ROOT, 'places')
 # Maximum upload size (5MB)
 MAX_UPLOAD_SIZE = 5 * 1024 * 1024
 
+# Uploads are streamed to temporary files here (system temp dir when unset)
+FILE_UPLOAD_TEMP_DIR = os.environ.get('FILE_UPLOAD_TEMP_DIR')
+
 # Image dimensions limits
 MIN_IMAGE_DIMENSION = 300
 MAX_IMAGE_DIMENSION = 4000
@@ -27,6 +30,18 @@ MAX_IMAGE_DIMENSION = 4000
 THUMBNAIL_SIZE = (200, 200)
 THUMBNAIL_QUALITY = 85
 
+# Photo derivatives generated by background workers (core/utils/photo_processing.py)
+# Each size is a bounding box; images are scaled down preserving aspect ratio
+PHOTO_DERIVATIVE_SIZES = {
+    'thumb': (200, 200),   # grid and list thumbnails
+    'card': (640, 640),    # place cards and galleries
+    'full': (1600, 1600),  # detail / lightbox view
+}
+PHOTO_DERIVATIVE_QUALITY = {
+    'webp': 80,
+    'jpeg': 85,
+}
+
 # Allowed image formats
 ALLOWED_IMAGE_FORMATS = ['JPEG', 'PNG', 'WEBP']
 
@@ -43,4 +58,20 @@ AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
 
 # Use S3 for media storage
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-""" 
\ No newline at end of file
+""" 
+# Direct-to-storage uploads (see core/utils/upload_tickets.py)
+PHOTO_UPLOAD_BACKEND = os.environ.get(
+    'PHOTO_UPLOAD_BACKEND', 'core.utils.upload_tickets.FilesystemUploadBackend'
+)
+PHOTO_UPLOAD_TICKET_MAX_AGE = int(os.environ.get('PHOTO_UPLOAD_TICKET_MAX_AGE', 900))  # seconds
+# S3UploadBackend only; set the endpoint URL for S3-compatible servers such as MinIO
+PHOTO_UPLOAD_S3_BUCKET = os.environ.get('PHOTO_UPLOAD_S3_BUCKET')
+PHOTO_UPLOAD_S3_PREFIX = os.environ.get('PHOTO_UPLOAD_S3_PREFIX', 'places/')
+PHOTO_UPLOAD_S3_ENDPOINT_URL = os.environ.get('PHOTO_UPLOAD_S3_ENDPOINT_URL')
+PHOTO_UPLOAD_S3_REGION = os.environ.get('PHOTO_UPLOAD_S3_REGION')
+
+# Near-duplicate photo detection (see core/utils/photo_hashing.py)
+PHOTO_DUPLICATE_MAX_DISTANCE = 6  # pHash bits; lookups find every match up to 7
+PHOTO_DUPLICATE_MAX_DHASH_DISTANCE = 10
+# 'flag' sets duplicate_of for moderators; 'reject' also rejects pending duplicates
+PHOTO_DUPLICATE_ACTION = os.environ.get('PHOTO_DUPLICATE_ACTION', 'flag')
@@ -1,13 +1,18 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from core.models.review import Review
 from core.models.photo import PlacePhoto
 from core.models.place import Place
+from core.models.user import ClaimsUser, User
+from core.models.feature import Feature, PlaceFeature
 from core.models.notification import Notification
-from core.models.helpful_vote import HelpfulVote
-from core.models.user_points import UserPoints
 from core.models.badge import Badge
+from core.utils.notification_broker import publish_notification
+from core.utils.notification_counters import notification_created
+from core.utils.feature_catalog import invalidate_feature_catalog
+from core.utils.outbox import record_content_created, record_moderation_change
+from core.utils.token_revocation import sync_user_revocation
 # from .tasks import send_notification_email # Commented out task import as it's not used now
 
 @receiver(post_save, sender=Review)
@@ -16,50 +21,7 @@ def handle_review_moderation(sender, instance, created, **kwargs):
     Handle notifications for review moderation status changes
     """
     if not created and instance.tracker.has_changed('moderation_status'):
-        notification_type = None
-        title = None
-        message = None
-        
-        if instance.moderation_status == 'APPROVED':
-            notification_type = 'review_approved'
-            title = 'Your Review Has Been Approved!'
-            message = f'Your review for "{instance.place.name}" has been approved and is now visible to all users.'
-            
-            # Award points for approved review
-            UserPoints.add_points(
-                user=instance.user,
-                points=10,
-                source_type='review',
-                source_id=instance.id,
-                description=f"Review for {instance.place.name} approved"
-            )
-            
-        elif instance.moderation_status == 'REJECTED':
-            notification_type = 'review_rejected'
-            title = 'Your Review Needs Attention'
-            
-            # Construct a more helpful message with the rejection reason and guidance
-            base_message = f'Your review for "{instance.place.name}" requires changes before it can be approved.'
-            
-            if instance.moderation_comment:
-                reason = f"Reason: {instance.moderation_comment}"
-            else:
-                reason = "Please check our content guidelines for more information."
-                
-            guidance = "You can edit your review and resubmit it for approval."
-            
-            message = f"{base_message}\n\n{reason}\n\n{guidance}"
-        
-        if notification_type:
-            notification = Notification.objects.create(
-                user=instance.user,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                content_type=ContentType.objects.get_for_model(instance),
-                object_id=instance.id
-            )
-            # send_notification_email.delay(notification.id) # MVP: Disabled email sending
+        record_moderation_change(instance)
 
 @receiver(post_save, sender=PlacePhoto)
 def handle_photo_moderation(sender, instance, created, **kwargs):
@@ -67,50 +29,63 @@ def handle_photo_moderation(sender, instance, created, **kwargs):
     Handle notifications for photo moderation status changes
     """
     if not created and instance.tracker.has_changed('moderation_status'):
-        notification_type = None
-        title = None
-        message = None
-        
-        if instance.moderation_status == 'APPROVED':
-            notification_type = 'photo_approved'
-            title = 'Your Photo Has Been Approved!'
-            message = f'Your photo for "{instance.place.name}" has been approved and is now visible to all users.'
-            
-            # Award points for approved photo
-            UserPoints.add_points(
-                user=instance.user,
-                points=5,
-                source_type='photo',
-                source_id=instance.id,
-                description=f"Photo for {instance.place.name} approved"
-            )
-            
-        elif instance.moderation_status == 'REJECTED':
-            notification_type = 'photo_rejected'
-            title = 'Your Photo Needs Attention'
-            
-            # Construct a more helpful message with the rejection reason and guidance
-            base_message = f'Your photo for "{instance.place.name}" requires changes before it can be approved.'
-            
-            if instance.moderation_comment:
-                reason = f"Reason: {instance.moderation_comment}"
-            else:
-                reason = "Please check our content guidelines for more information."
-                
-            guidance = "You can upload a new photo or remove this one from your uploads."
-            
-            message = f"{base_message}\n\n{reason}\n\n{guidance}"
-        
-        if notification_type:
-            notification = Notification.objects.create(
-                user=instance.user,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                content_type=ContentType.objects.get_for_model(instance),
-                object_id=instance.id
-            )
-            # send_notification_email.delay(notification.id) # MVP: Disabled email sending
+        record_moderation_change(instance)
+
+@receiver(post_save, sender=PlacePhoto)
+def refresh_place_primary_photo(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep Place.primary_photo in sync when a photo is approved, rejected,
+    (un)flagged as primary, or gets its thumbnail
+    """
+    if created:
+        changed = instance.is_primary and instance.moderation_status == 'APPROVED'
+    else:
+        changed = (
+            instance.tracker.has_changed('moderation_status')
+            or instance.tracker.has_changed('is_primary')
+            # Derivatives are generated after upload; the thumbnail URL changes
+            or (instance.is_primary and update_fields is not None and 'derivatives' in update_fields)
+        )
+    if changed:
+        Place.refresh_primary_photo(instance.place_id)
+
+@receiver(post_delete, sender=PlacePhoto)
+def refresh_place_primary_photo_on_delete(sender, instance, **kwargs):
+    """Pick another primary photo (if any) when the primary photo is deleted"""
+    if instance.is_primary and instance.moderation_status == 'APPROVED':
+        Place.refresh_primary_photo(instance.place_id)
+
+@receiver(m2m_changed, sender=PlaceFeature)
+def refresh_place_feature_bits(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Place.feature_bits in step with place.features / feature.places changes"""
+    if action == 'pre_clear' and reverse:
+        # feature.places.clear(): remember the places before the links are gone
+        instance._feature_bits_place_ids = list(instance.place_features.values_list('place_id', flat=True))
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        place_ids = [instance.pk]
+    elif action == 'post_clear':
+        place_ids = getattr(instance, '_feature_bits_place_ids', [])
+    else:
+        place_ids = pk_set or []
+    Place.refresh_feature_bits(place_ids)
+
+@receiver(post_save, sender=PlaceFeature)
+@receiver(post_delete, sender=PlaceFeature)
+def refresh_place_feature_bits_for_link(sender, instance, **kwargs):
+    """PlaceFeature rows created or deleted directly (including feature deletion)"""
+    Place.refresh_feature_bits([instance.place_id])
+
+@receiver(post_save, sender=Feature)
+@receiver(post_delete, sender=Feature)
+def invalidate_feature_catalog_on_change(sender, instance, **kwargs):
+    """
+    Drop the cached feature catalog now, and again on commit in case another
+    request rebuilt it from the pre-commit data in between
+    """
+    invalidate_feature_catalog()
+    transaction.on_commit(invalidate_feature_catalog)
 
 @receiver(post_save, sender=Place)
 def handle_place_moderation(sender, instance, created, **kwargs):
@@ -118,100 +93,46 @@ def handle_place_moderation(sender, instance, created, **kwargs):
     Handle notifications and points for place moderation status changes
     """
     if not created and instance.tracker.has_changed('moderation_status'):
-        notification_type = None
-        title = None
-        message = None
-        
-        if instance.moderation_status == 'APPROVED':
-            notification_type = 'place_approved'
-            title = 'Your Place Has Been Approved!'
-            message = f'Your place "{instance.name}" has been approved and is now visible to all users.'
-            
-            # Award points for approved place
-            UserPoints.add_points(
-                user=instance.created_by,
-                points=20,
-                source_type='place',
-                source_id=instance.id,
-                description=f"Place {instance.name} approved"
-            )
-            
-        elif instance.moderation_status == 'REJECTED':
-            notification_type = 'place_rejected'
-            title = 'Your Place Needs Attention'
-            
-            # Construct a more helpful message with the rejection reason and guidance
-            base_message = f'Your place "{instance.name}" requires changes before it can be approved.'
-            
-            if instance.moderation_comment:
-                reason = f"Reason: {instance.moderation_comment}"
-            else:
-                reason = "Please check our content guidelines for more information."
-                
-            guidance = "You can edit the place details and resubmit for approval."
-            
-            message = f"{base_message}\n\n{reason}\n\n{guidance}"
-        
-        if notification_type:
-            notification = Notification.objects.create(
-                user=instance.created_by,
-                notification_type=notification_type,
-                title=title,
-                message=message,
-                content_type=ContentType.objects.get_for_model(instance),
-                object_id=instance.id
-            )
-            # send_notification_email.delay(notification.id) # MVP: Disabled email sending
+        record_moderation_change(instance)
 
 @receiver(post_save, sender=Review)
 def notify_place_owner_new_review(sender, instance, created, **kwargs):
     """
     Notify place owner when a new review is posted
     """
-    if created and instance.place.created_by:
-        notification = Notification.objects.create(
-            user=instance.place.created_by,
-            actor=instance.user,
-            notification_type='new_review',
-            title='New Review for Your Place',
-            message=f'A new review has been posted for "{instance.place.name}"',
-            content_type=ContentType.objects.get_for_model(instance),
-            object_id=instance.id
-        )
-        # Send email asynchronously
-        # send_notification_email.delay(notification.id) # MVP: Disabled email sending
+    if created and instance.place.created_by_id:
+        record_content_created(instance)
 
 @receiver(post_save, sender=PlacePhoto)
 def notify_place_owner_new_photo(sender, instance, created, **kwargs):
     """
     Notify place owner when a new photo is uploaded
     """
-    if created and instance.place.created_by:
-        notification = Notification.objects.create(
-            user=instance.place.created_by,
-            actor=instance.user,
-            notification_type='new_photo',
-            title='New Photo for Your Place',
-            message=f'A new photo has been uploaded for "{instance.place.name}"',
-            content_type=ContentType.objects.get_for_model(instance),
-            object_id=instance.id
-        )
-        # Send email asynchronously
-        # send_notification_email.delay(notification.id) # MVP: Disabled email sending
+    if created and instance.place.created_by_id:
+        record_content_created(instance)
 
-@receiver(post_save, sender=HelpfulVote)
-def handle_helpful_vote(sender, instance, created, **kwargs):
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
     """
-    Award points when a user receives a helpful vote on their review
+    Push new notifications to the user's open streams once the transaction commits
     """
     if created:
-        # Award 2 points to the review author for getting a helpful vote
-        review = instance.review
-        
-        UserPoints.add_points(
-            user=review.user,
-            points=2,
-            source_type='helpful_vote',
-            source_id=instance.id,
-            description=f"Helpful vote on review for {review.place.name}"
-        ) 
\ No newline at end of file
+        transaction.on_commit(lambda: publish_notification(instance))
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    """
+    Increment the user's cached unread counters once the transaction commits
+    """
+    if created and not instance.is_read:
+        transaction.on_commit(lambda: notification_created(instance))
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=ClaimsUser)
+def sync_token_revocation(sender, instance, update_fields=None, **kwargs):
+    """
+    Drop the cached token revocation set when a user is suspended,
+    deactivated or reactivated
+    """
+    if update_fields is None or 'is_active' in update_fields:
+        sync_user_revocation(instance)
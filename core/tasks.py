@@ -7,8 +7,15 @@ from core.models.user import User
 from core.models.place import Place
 from core.models.review import Review
 from core.models.photo import PlacePhoto
+from core.models.helpful_vote import HelpfulVote
+from core.models.user_points import UserPoints
 from core.models.badge import Badge
 from core.models.user_badge import UserBadge
+from core.utils.notification_retention import purge_notifications
+from core.utils.photo_processing import process_photo
+from core.utils.helpful_votes import rollup_helpful_counts as rollup_counts
+from core.utils.geocoding import batch_geocode_places
+from core.utils.outbox import process_outbox as drain_outbox
 from django.utils.html import strip_tags
 from datetime import timedelta
 from django.utils import timezone
@@ -88,12 +95,92 @@ def send_bulk_notifications(user_ids, title, message, notification_type, actor_i
     return [n.id for n in notifications]
 
 @shared_task
-def cleanup_old_notifications(days=30):
+def cleanup_old_notifications(days=None, rules=None, archive_dir=None):
     """
-    Delete notifications older than specified days
+    Delete notifications older than the retention period.
+
+    Deletes in primary-key ranged batches (see core.utils.notification_retention)
+    so the job keeps lock time and memory flat as the table grows.
+    Per-type rules default to settings.NOTIFICATION_RETENTION_RULES.
+    """
+    return purge_notifications(days=days, rules=rules, archive_dir=archive_dir)
+
+@shared_task
+def process_photo_derivatives(photo_id):
+    """
+    Generate the resized WebP/JPEG derivatives of an uploaded photo
+    """
+    try:
+        photo = PlacePhoto.objects.get(id=photo_id)
+    except PlacePhoto.DoesNotExist:
+        return f"Photo {photo_id} no longer exists"
+    try:
+        derivatives = process_photo(photo)
+    except Exception as e:
+        # Leave the photo marked so it can be found and reprocessed
+        PlacePhoto.objects.filter(id=photo_id).update(processing_error=f"{type(e).__name__}: {e}")
+        raise
+    return f"Generated {len(derivatives)} derivative sizes for photo {photo_id}"
+
+@shared_task
+def award_helpful_vote(vote_id):
+    """
+    Award points to a review's author for a helpful vote and notify them
+    """
+    try:
+        vote = HelpfulVote.objects.select_related('review__user', 'review__place').get(id=vote_id)
+    except HelpfulVote.DoesNotExist:
+        return f"Helpful vote {vote_id} was removed"
+    review = vote.review
+    
+    # Award 2 points to the review author for getting a helpful vote
+    UserPoints.add_points(
+        user=review.user,
+        points=2,
+        source_type='helpful_vote',
+        source_id=vote.id,
+        description=f"Helpful vote on review for {review.place.name}"
+    )
+    Notification.objects.create(
+        user=review.user,
+        notification_type='review_helpful',
+        title='Someone found your review helpful!',
+        message=f'Your review of {review.place.name} was marked as helpful.',
+        content_object=review
+    )
+    return f"Awarded helpful vote {vote_id}"
+
+@shared_task
+def rollup_helpful_counts():
+    """
+    Fold the sharded helpful vote counters into Review.helpful_count.
+    Schedule this every minute or so; counts shown in review listings lag by
+    at most the interval.
+    """
+    return rollup_counts()
+
+@shared_task
+def geocode_places(place_ids):
+    """
+    Geocode places that have an address but no coordinates (queued by the
+    place bulk import for rows without latitude/longitude)
     """
-    cutoff_date = timezone.now() - timedelta(days=days)
-    Notification.objects.filter(created_at__lt=cutoff_date).delete()
+    places = Place.objects.filter(id__in=place_ids)
+    if not places.exists():
+        return "No places to geocode"
+    success_count, failure_count = batch_geocode_places(places)
+    return f"Geocoded {success_count} places ({failure_count} failed)"
+
+@shared_task
+def process_outbox(batch_size=None, keys=None):
+    """
+    Apply pending outbox events (notifications and points of moderation,
+    new content and badges). Queued after every commit that records events,
+    for those events (keys); scheduled every minute for everything pending,
+    which retries failed batches.
+    """
+    processed = drain_outbox(batch_size=batch_size, keys=keys)
+    return f"Processed {processed} outbox events"
 
 @shared_task
 def check_badge_eligibility():
@@ -107,8 +194,8 @@ def check_badge_eligibility():
     # Get users with recent activity (reviews, places, photos, votes)
     active_users = User.objects.filter(
         models.Q(reviews__created_at__gte=recent_activity_cutoff) |
-        models.Q(owned_places__created_at__gte=recent_activity_cutoff) |
-        models.Q(photo_uploads__created_at__gte=recent_activity_cutoff) |
+        models.Q(places__created_at__gte=recent_activity_cutoff) |
+        models.Q(photos__created_at__gte=recent_activity_cutoff) |
         models.Q(helpful_votes__created_at__gte=recent_activity_cutoff) |
         models.Q(saved_places__created_at__gte=recent_activity_cutoff) |
         models.Q(last_login__gte=recent_activity_cutoff)
@@ -127,29 +214,18 @@ def check_badge_eligibility():
             if created:
                 badge_count += 1
     
-    # Also check for longevity badges for all users (less frequently in production)
-    longevity_badges = Badge.objects.filter(
-        requirement_code__in=['one_month_active', 'six_months_active', 'one_year_active']
-    )
-    
-    for badge in longevity_badges:
-        # Get users who don't have this badge yet
-        users_without_badge = User.objects.exclude(
-            badges__badge=badge
-        ).filter(is_active=True)
-        
-        # Apply criteria specific to each longevity badge
-        if badge.requirement_code == 'one_month_active':
-            eligible_date = timezone.now() - timedelta(days=30)
-            eligible_users = users_without_badge.filter(date_joined__lte=eligible_date)
-        elif badge.requirement_code == 'six_months_active':
-            eligible_date = timezone.now() - timedelta(days=182)
-            eligible_users = users_without_badge.filter(date_joined__lte=eligible_date)
-        elif badge.requirement_code == 'one_year_active':
-            eligible_date = timezone.now() - timedelta(days=365)
-            eligible_users = users_without_badge.filter(date_joined__lte=eligible_date)
-        else:
-            eligible_users = User.objects.none()
+    # Also check for longevity badges for all users (less frequently in production).
+    # Badges have no requirement field; their code is derived from the name as in
+    # Badge.check_eligibility, e.g. "One Month Active" -> one_month_active
+    longevity_days = {'one_month_active': 30, 'six_months_active': 182, 'one_year_active': 365}
+    for badge in Badge.objects.all():
+        days = longevity_days.get(badge.name.lower().replace(' ', '_'))
+        if days is None:
+            continue
+        # Users who don't have this badge yet
+        eligible_users = User.objects.exclude(
+            user_badges__badge=badge
+        ).filter(is_active=True, date_joined__lte=timezone.now() - timedelta(days=days))
         
         # Award badges to eligible users
         for user in eligible_users:
@@ -1,9 +1,16 @@
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from rest_framework import status
 
+from core.authentication import ClaimsJWTAuthentication
+from core.models import ClaimsUser
+from core.utils.token_revocation import set_users_active
+
 User = get_user_model()
 
 class JWTAuthenticationTest(TestCase):
@@ -72,4 +79,123 @@ class JWTAuthenticationTest(TestCase):
         response = self.client.post(self.token_verify_url, {
             'token': 'invalid.token.here'
         })
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED) 
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED) 
+
+
+class ClaimsJWTAuthenticationTest(TestCase):
+    """Test authentication from token claims with the cached revocation set."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='claimsuser',
+            email='claims@example.com',
+            password='testpass123',
+            first_name='Claire',
+            bio='Eats everywhere'
+        )
+        self.admin = User.objects.create_user(
+            username='claimsadmin',
+            email='claimsadmin@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+
+    def _token(self, username='claimsuser'):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'testpass123'})
+        return response.data
+
+    def _authenticate(self, access):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+
+    def test_builds_user_from_claims_without_query(self):
+        access = self._token()['access']
+        self._authenticate(access)  # Loads the revocation set
+
+        with self.assertNumQueries(0):
+            user = self._authenticate(access)
+            self.assertIsInstance(user, User)
+            self.assertEqual((user.pk, user.email, user.first_name), (self.user.pk, 'claims@example.com', 'Claire'))
+            self.assertFalse(user.is_staff)
+
+        # The other fields load together on first access
+        with self.assertNumQueries(1):
+            self.assertEqual(user.bio, 'Eats everywhere')
+            self.assertEqual(user.guide_level, 1)
+
+    def test_claims_user_can_be_saved_and_assigned(self):
+        user = self._authenticate(self._token()['access'])
+        self.assertIsInstance(user, ClaimsUser)
+
+        user.location = 'Taipei'
+        user.save(update_fields=['location'])
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.location, self.user.bio), ('Taipei', 'Eats everywhere'))
+
+    def test_claims_user_full_save_is_refused(self):
+        user = self._authenticate(self._token()['access'])
+
+        user.location = 'Taipei'
+        with self.assertRaises(ValueError):
+            user.save()
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.location)
+
+    def test_bulk_suspension_revokes_tokens(self):
+        access = self._token()['access']
+        self._authenticate(access)  # Caches the revocation set
+
+        self.assertEqual(set_users_active(User.objects.filter(pk=self.user.pk), False), 1)
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(access)
+
+        self.assertEqual(set_users_active(User.objects.filter(pk=self.user.pk), True), 1)
+        self.assertEqual(self._authenticate(access).pk, self.user.pk)
+
+    def test_suspended_user_is_refused(self):
+        access = self._token()['access']
+        self._authenticate(access)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.patch(
+            reverse('admin-user-status', args=[self.user.pk]), {'is_active': False}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(access)
+
+        self.user.is_active = True
+        self.user.save()
+        self.assertEqual(self._authenticate(access).pk, self.user.pk)
+
+    def test_self_deactivation_revokes_token(self):
+        access = self._token()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        response = self.client.post(reverse('self-deactivate'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_reissues_claims_and_refuses_inactive_users(self):
+        refresh = self._token()['refresh']
+        User.objects.filter(pk=self.user.pk).update(first_name='Clara')
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._authenticate(response.data['access']).first_name, 'Clara')
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_claims_falls_back_to_lookup(self):
+        access = str(RefreshToken.for_user(self.user).access_token)
+
+        user = self._authenticate(access)
+        self.assertNotIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
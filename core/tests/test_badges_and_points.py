@@ -155,6 +155,24 @@ class BadgeModelTest(TestCase):
         self.assertEqual(len(eligible_badges), 1)
         self.assertEqual(eligible_badges[0].name, "First Review")
 
+    def test_check_badge_eligibility_task(self):
+        """The scheduled task awards activity and longevity badges."""
+        from core.tasks import check_badge_eligibility
+
+        one_month_badge = Badge.objects.create(
+            name="One Month Active", description="A month on CityStory", category="longevity", icon="badge-month"
+        )
+        User.objects.filter(pk=self.user.pk).update(date_joined=timezone.now() - timedelta(days=40))
+        Place.objects.create(
+            name="Task Place", place_type="restaurant", created_by=self.user, moderation_status="APPROVED"
+        )
+
+        self.assertEqual(check_badge_eligibility(), "Awarded 2 badges to users")
+        self.assertEqual(
+            set(UserBadge.objects.filter(user=self.user).values_list('badge__name', flat=True)),
+            {"First Place", one_month_badge.name}
+        )
+
 
 class UserBadgeTest(TestCase):
     """Test case for the UserBadge model."""
@@ -186,8 +204,9 @@ class UserBadgeTest(TestCase):
     
     def test_award_badge(self):
         """Test awarding a badge to a user."""
-        # Award the badge
-        user_badge, created = UserBadge.award_badge(self.user, self.badge)
+        # Award the badge (the notification and points follow on commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            user_badge, created = UserBadge.award_badge(self.user, self.badge)
         
         # The badge should have been created
         self.assertTrue(created)
@@ -569,7 +588,8 @@ class BadgeAPITest(APITestCase):
         
         url = reverse('user-badge-check-eligibility')
         try:
-            response = self.client.post(url)
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(url)
             
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             self.assertEqual(response.data['new_badges_count'], 1)
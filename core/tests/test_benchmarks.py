@@ -0,0 +1,120 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+
+from core.models import HelpfulVote, Notification, Place, PlacePhoto, Review
+from core.utils.benchmarks import percentile, run_benchmarks
+from core.utils.seed_data import seed_dataset
+
+User = get_user_model()
+
+
+class SeedDatasetTest(TestCase):
+    """Tests for the benchmark dataset generator."""
+
+    def test_seed_dataset_creates_requested_volumes(self):
+        summary = seed_dataset(
+            users=20, places=50, reviews=200, photos=60, features=10,
+            helpful_votes=150, notifications=100, points=80, batch_size=25
+        )
+
+        self.assertEqual(summary['users'], 20)
+        self.assertEqual(Place.objects.count(), 50)
+        self.assertEqual(Review.objects.count(), summary['reviews'])
+        self.assertLessEqual(summary['reviews'], 200)
+        self.assertEqual(PlacePhoto.objects.count(), 60)
+        self.assertEqual(HelpfulVote.objects.count(), summary['helpful_votes'])
+        self.assertEqual(Notification.objects.count(), 100)
+        # Every place has a district and coordinates
+        self.assertFalse(Place.objects.filter(latitude__isnull=True).exists())
+        self.assertFalse(Place.objects.filter(district__isnull=True).exists())
+
+    def test_reviews_are_skewed_towards_popular_places(self):
+        seed_dataset(users=50, places=100, reviews=1000, photos=0, helpful_votes=0,
+                     notifications=0, points=0)
+
+        counts = sorted(
+            (place.reviews.count() for place in Place.objects.all()),
+            reverse=True
+        )
+        self.assertGreater(counts[0], counts[len(counts) // 2] * 3)
+
+    def test_seeding_twice_adds_new_users(self):
+        seed_dataset(users=5, places=5, reviews=5, photos=0, helpful_votes=0, notifications=0, points=0)
+        seed_dataset(users=5, places=5, reviews=5, photos=0, helpful_votes=0, notifications=0, points=0)
+        self.assertEqual(User.objects.count(), 10)
+
+
+class BenchmarkRunnerTest(TestCase):
+    """Tests for the benchmark runner."""
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(users=10, places=30, reviews=60, photos=20, features=5,
+                     helpful_votes=40, notifications=30, points=30)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_run_benchmarks_reports_latency_and_queries(self):
+        report = run_benchmarks(scenarios=['place_list', 'place_reviews'], iterations=3, warmup=1)
+
+        self.assertEqual(report['meta']['dataset']['places'], 30)
+        for name in ['place_list', 'place_reviews']:
+            result = report['results'][name]
+            self.assertNotIn('error', result)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['queries'], 0)
+
+    def test_status_middleware_scenario_runs_without_queries(self):
+        report = run_benchmarks(scenarios=['status_middleware'], iterations=3, warmup=1)
+
+        result = report['results']['status_middleware']
+        self.assertNotIn('error', result)
+        self.assertEqual(result['queries'], 0)
+
+    def test_badge_task_scenario_runs(self):
+        report = run_benchmarks(scenarios=['badge_task'], iterations=2, warmup=1)
+
+        self.assertNotIn('error', report['results']['badge_task'])
+
+    def test_command_writes_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.json')
+            call_command(
+                'run_benchmarks', '--scenario', 'profile', '--iterations', '2',
+                '--label', 'abc123', '--output', path, stdout=StringIO()
+            )
+            with open(path) as f:
+                report = json.load(f)
+
+        self.assertEqual(report['meta']['label'], 'abc123')
+        self.assertIn('p95_ms', report['results']['profile'])
+
+    def test_connection_scenarios_need_autocommit(self):
+        report = run_benchmarks(scenarios=['request_new_connection'], iterations=1, warmup=0)
+        self.assertIn('error', report['results']['request_new_connection'])
+
+
+class ConnectionBenchmarkTest(TransactionTestCase):
+    """Tests for the connection reuse benchmarks, which run outside transactions."""
+
+    def test_connection_scenarios_report_latency(self):
+        seed_dataset(users=3, places=5, reviews=5, photos=0, helpful_votes=0, notifications=0, points=0)
+
+        report = run_benchmarks(
+            scenarios=['request_new_connection', 'request_persistent_connection'], iterations=3, warmup=1
+        )
+
+        for name in ['request_new_connection', 'request_persistent_connection']:
+            result = report['results'][name]
+            self.assertNotIn('error', result)
+            self.assertGreater(result['queries'], 0)
@@ -323,4 +323,90 @@ class CombinedSearchTestCase(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['count'], 0)
-        self.assertEqual(len(response.data['results']), 0) 
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 0) 
+
+class PlaceFacetsTestCase(APITestCase):
+    """Test the facet counts for the search filters"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user(username='facetuser', email='facet@example.com', password='testpassword')
+        self.wifi = Feature.objects.create(name='Wi-Fi', feature_type='amenity')
+        self.parking = Feature.objects.create(name='Parking', feature_type='amenity')
+        places = [
+            ('Cafe A', 'xinyi', 'cafe', 200, [self.wifi]),
+            ('Cafe B', 'xinyi', 'cafe', 400, [self.wifi, self.parking]),
+            ('Bar C', 'daan', 'bar', 600, [self.parking]),
+            ('Shop D', 'daan', 'shop', 2500, []),
+        ]
+        for name, district, place_type, price_level, features in places:
+            place = Place.objects.create(
+                name=name, address=f'{name} Street', district=district, place_type=place_type,
+                price_level=price_level, moderation_status='APPROVED', draft=False, created_by=self.user
+            )
+            place.features.add(*features)
+        Place.objects.create(
+            name='Pending E', address='E Street', district='xinyi', place_type='cafe',
+            moderation_status='PENDING', draft=False, created_by=self.user
+        )
+        self.url = '/api/search/facets/'
+
+    @staticmethod
+    def counts(facet):
+        return {item['value']: item['count'] for item in facet if item['count']}
+
+    def test_counts_each_dimension_without_its_own_filter(self):
+        response = self.client.get(self.url, {'district': 'xinyi', 'type': 'cafe'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data
+
+        self.assertEqual(data['count'], 2)
+        # Other districts are counted with the type filter only
+        self.assertEqual(self.counts(data['district']), {'xinyi': 2})
+        # Other types are counted with the district filter only
+        self.assertEqual(self.counts(data['placeType']), {'cafe': 2})
+        self.assertEqual(self.counts(data['priceLevel']), {200: 1, 400: 1})
+        self.assertEqual(
+            [(feature['name'], feature['count']) for feature in data['features']],
+            [('Wi-Fi', 2), ('Parking', 1)]
+        )
+
+        response = self.client.get(self.url, {'district': 'xinyi'})
+        self.assertEqual(self.counts(response.data['district']), {'xinyi': 2, 'daan': 2})
+        self.assertEqual(self.counts(response.data['priceLevel']), {200: 1, 400: 1})
+
+        response = self.client.get(self.url, {'features': self.parking.id})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(self.counts(response.data['district']), {'xinyi': 1, 'daan': 1})
+        # Prices above the last bucket fall into it
+        self.assertEqual(self.counts(self.client.get(self.url).data['priceLevel']), {200: 1, 400: 1, 600: 1, 3000: 1})
+
+    def test_one_query_per_dimension_and_cached(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        params = {'district': 'daan', 'minPrice': '100'}
+        with CaptureQueriesContext(connection) as queries:
+            first = self.client.get(self.url, params)
+        self.assertEqual(len(queries), 5)
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url, {'minPrice': '100', 'district': 'daan,unknown'})
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(first.data, second.data)
+
+    def test_districts_and_categories_use_grouped_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/places/districts/')
+        self.assertEqual(len(queries), 1)
+        counts = {item['value']: item['count'] for item in response.data}
+        self.assertEqual((counts['xinyi'], counts['daan'], counts['beitou']), (2, 2, 0))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/features/categories/')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual({item['type']: item['count'] for item in response.data}['amenity'], 2)
@@ -385,4 +385,237 @@ class FeatureAPITest(APITestCase):
         test_place.refresh_from_db()
         self.assertEqual(test_place.features.count(), 3)
     
-    # End of class, no test_feature_applicability_validation method 
\ No newline at end of file
+    # End of class, no test_feature_applicability_validation method 
+
+class FeatureBitsTest(TestCase):
+    """Test the precomputed feature bits and the feature filters built on them."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="bitsuser",
+            email="bits@example.com",
+            password="testpassword"
+        )
+        self.wifi = Feature.objects.create(name="Wi-Fi", feature_type="amenity")
+        self.parking = Feature.objects.create(name="Parking", feature_type="amenity")
+        self.quiet = Feature.objects.create(name="Quiet", feature_type="atmosphere")
+
+        self.cafe = self._create_place("Cafe")
+        self.diner = self._create_place("Diner")
+        self.bar = self._create_place("Bar")
+        self.cafe.features.add(self.wifi, self.quiet)
+        self.diner.features.add(self.wifi, self.parking)
+
+    def _create_place(self, name):
+        return Place.objects.create(
+            name=name,
+            place_type="restaurant",
+            created_by=self.user,
+            moderation_status="APPROVED"
+        )
+
+    def _bits(self, place):
+        place.refresh_from_db(fields=['feature_bits'])
+        return sorted(place.feature_bits)
+
+    def _names(self, **predicates):
+        from core.utils.feature_bits import filter_by_features
+        return sorted(filter_by_features(Place.objects.all(), **predicates).values_list('name', flat=True))
+
+    def test_features_get_distinct_bits(self):
+        bits = {self.wifi.bit, self.parking.bit, self.quiet.bit}
+        self.assertEqual(len(bits), 3)
+        self.assertNotIn(None, bits)
+
+    def test_bits_follow_feature_changes(self):
+        self.assertEqual(self._bits(self.cafe), sorted([self.wifi.bit, self.quiet.bit]))
+
+        self.cafe.features.remove(self.quiet)
+        self.assertEqual(self._bits(self.cafe), [self.wifi.bit])
+
+        self.wifi.places.add(self.bar)
+        self.assertEqual(self._bits(self.bar), [self.wifi.bit])
+
+        self.cafe.features.clear()
+        self.assertEqual(self._bits(self.cafe), [])
+
+    def test_rebuild_feature_bits(self):
+        from core.utils.feature_bits import rebuild_feature_bits
+        Place.objects.update(feature_bits=[])
+
+        self.assertEqual(rebuild_feature_bits(batch_size=2), 3)
+        self.assertEqual(self._bits(self.diner), sorted([self.wifi.bit, self.parking.bit]))
+        self.assertEqual(self._bits(self.bar), [])
+
+    def test_filter_by_features(self):
+        wifi, parking, quiet = str(self.wifi.id), str(self.parking.id), str(self.quiet.id)
+        self.assertEqual(self._names(any_of=[parking, quiet]), ["Cafe", "Diner"])
+        self.assertEqual(self._names(all_of=[wifi, quiet]), ["Cafe"])
+        self.assertEqual(self._names(none_of=[wifi]), ["Bar"])
+        self.assertEqual(self._names(any_of=[wifi], none_of=[parking]), ["Cafe"])
+        # A feature that does not exist matches nothing
+        self.assertEqual(self._names(all_of=[wifi, "missing"]), [])
+
+
+class FeatureCatalogTest(APITestCase):
+    """Test the cached feature catalog behind the category endpoints."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="cataloguser",
+            email="catalog@example.com",
+            password="testpassword"
+        )
+        self.wifi = Feature.objects.create(name="Wi-Fi", feature_type="amenity")
+        self.italian = Feature.objects.create(name="Italian", feature_type="cuisine")
+        for name, moderation_status in [("Approved", "APPROVED"), ("Pending", "PENDING")]:
+            place = Place.objects.create(
+                name=name,
+                place_type="restaurant",
+                created_by=self.user,
+                moderation_status=moderation_status
+            )
+            place.features.add(self.wifi)
+
+    def test_by_category_counts_approved_places(self):
+        response = self.client.get(reverse('feature-by-category'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        amenities = response.data['amenity']['features']
+        self.assertEqual([f['name'] for f in amenities], ["Wi-Fi"])
+        self.assertEqual(amenities[0]['placesCount'], 1)
+        self.assertEqual(response.data['cuisine']['features'][0]['placesCount'], 0)
+
+    def test_catalog_is_built_once(self):
+        self.client.get(reverse('feature-categories'))
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('feature-by-category'))
+            self.client.get(reverse('feature-by-place-type'), {'type': 'cafe'})
+
+    def test_not_modified_with_matching_etag(self):
+        url = reverse('feature-by-category')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_feature_changes_invalidate_catalog(self):
+        url = reverse('feature-categories')
+        etag = self.client.get(url)['ETag']
+
+        Feature.objects.create(name="Vegan", feature_type="cuisine")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts = {item['type']: item['count'] for item in response.data}
+        self.assertEqual(counts['cuisine'], 2)
+
+        self.italian.delete()
+        response = self.client.get(url)
+        counts = {item['type']: item['count'] for item in response.data}
+        self.assertEqual(counts['cuisine'], 1)
+
+    def test_list_orders_by_places_count(self):
+        response = self.client.get(reverse('feature-list'), {'ordering': '-places_count'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([f['name'] for f in results], ["Wi-Fi", "Italian"])
+        self.assertEqual(results[0]['placesCount'], 1)
+
+
+class BulkFeatureImportTest(APITestCase):
+    """Test the bulk feature import and association endpoints."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="importadmin",
+            email="importadmin@example.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username="importuser",
+            email="importuser@example.com",
+            password="testpassword"
+        )
+        self.wifi = Feature.objects.create(name="Wi-Fi", feature_type="amenity")
+        self.place = Place.objects.create(
+            name="Import Cafe",
+            place_type="cafe",
+            created_by=self.user,
+            moderation_status="APPROVED"
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('feature-bulk-import'), [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_import_skips_duplicates_and_reports_errors(self):
+        rows = [
+            {'name': 'wi-fi', 'featureType': 'amenity'},    # existing
+            {'name': 'Parking', 'featureType': 'amenity'},
+            {'name': 'parking', 'featureType': 'amenity'},  # repeated row
+            {'name': 'Parking', 'featureType': 'service'},
+            {'name': '   ', 'featureType': 'amenity'},
+            {'featureType': 'cuisine'},
+        ]
+        response = self.client.post(reverse('feature-bulk-import'), rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['skipped'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [4, 5])
+
+        bits = list(Feature.objects.values_list('bit', flat=True))
+        self.assertEqual(len(bits), 3)
+        self.assertEqual(len(set(bits)), 3)
+
+    def test_bulk_import_rejects_non_list(self):
+        response = self.client.post(reverse('feature-bulk-import'), {'name': 'Wi-Fi'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_associate(self):
+        parking = Feature.objects.create(name="Parking", feature_type="amenity")
+        self.place.features.add(self.wifi)
+        rows = [
+            {'place_id': str(self.place.id), 'feature_ids': [self.wifi.id, parking.id, 'missing']},
+            {'place_id': str(uuid.uuid4()), 'feature_ids': [self.wifi.id]},
+            {'place_id': str(self.place.id)},
+        ]
+        with self.assertNumQueries(8):
+            response = self.client.post(reverse('feature-bulk-associate'), rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['linked'], 1)
+        self.assertEqual(response.data['places'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1, 2])
+        self.assertEqual(set(self.place.features.values_list('id', flat=True)), {str(self.wifi.id), str(parking.id)})
+        self.place.refresh_from_db(fields=['feature_bits'])
+        self.assertEqual(sorted(self.place.feature_bits), sorted([self.wifi.bit, parking.bit]))
+
+    def test_import_features_command(self):
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as features_file:
+            features_file.write('{"name": "Rooftop", "featureType": "atmosphere"}\n{"name": ""}\n')
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as links_file:
+            json.dump([{'place_id': str(self.place.id), 'feature_ids': [str(self.wifi.id)]}], links_file)
+
+        out, err = StringIO(), StringIO()
+        call_command('import_features', features=features_file.name, links=links_file.name, stdout=out, stderr=err)
+
+        self.assertTrue(Feature.objects.filter(name="Rooftop").exists())
+        self.assertTrue(self.place.features.filter(pk=self.wifi.pk).exists())
+        self.assertIn('1 created', out.getvalue())
+        self.assertIn('features row 1', err.getvalue())
@@ -72,6 +72,86 @@ class PlaceModelTest(TestCase):
         place.features.remove(feature)
         self.assertEqual(place.features.count(), 0)
 
+    def test_unique_slug_takes_one_query(self):
+        """Slug allocation is one query however many places share the name"""
+        for slug in ['test-cafe-1', 'test-cafe-2', 'test-cafe-4', 'test-cafeteria']:
+            Place.objects.create(name='Other', slug=slug, address='1 St', place_type='cafe')
+
+        place = Place(name='Test Cafe', address='2 St', place_type='cafe')
+        with self.assertNumQueries(1):
+            self.assertEqual(place.generate_unique_slug(), 'test-cafe-3')
+
+    def test_unique_slug_only_fetches_numbered_variants(self):
+        """Slugs that merely start with the base are not loaded"""
+        from unittest.mock import patch
+
+        for slug in ['test-cafe-1', 'test-cafe-luna', 'test-cafeteria', 'test-cafe-1-annex']:
+            Place.objects.create(name='Other', slug=slug, address='1 St', place_type='cafe')
+
+        place = Place(name='Test Cafe', address='2 St', place_type='cafe')
+        with patch.object(Place, 'allocate_slug', wraps=Place.allocate_slug) as allocate_slug:
+            self.assertEqual(place.generate_unique_slug(), 'test-cafe-2')
+
+        # The fetched slugs, plus the one allocated
+        self.assertEqual(allocate_slug.call_args.args[1], {'test-cafe', 'test-cafe-1', 'test-cafe-2'})
+
+    def test_slug_conflict_is_retried(self):
+        """A slug taken between allocation and insert is allocated again"""
+        from unittest.mock import patch
+
+        place = Place(name='Test Cafe', address='2 St', place_type='cafe', created_by=self.user)
+        with patch.object(Place, 'generate_unique_slug', side_effect=['test-cafe', 'test-cafe-1']):
+            place.save()
+
+        place.refresh_from_db()
+        self.assertEqual(place.slug, 'test-cafe-1')
+
+    def test_other_integrity_errors_are_not_retried(self):
+        """Conflicts unrelated to the generated slug are raised"""
+        place = Place(id=self.place.id, name='Copy', address='2 St', place_type='cafe')
+        place._state.adding = True
+        with self.assertRaises(IntegrityError):
+            place.save(force_insert=True)
+
+    def test_partial_save_skips_validation_and_slug(self):
+        """Partial saves of other fields neither run clean() nor allocate a slug"""
+        from unittest.mock import patch
+
+        Place.objects.filter(pk=self.place.pk).update(slug=None)
+        self.place.slug = None
+        self.place.price_level = 400
+        with patch.object(Place, 'clean') as clean, self.assertNumQueries(1):
+            self.place.save(update_fields=['price_level'])
+        clean.assert_not_called()
+
+        self.place.latitude = 100
+        with self.assertRaises(ValidationError):
+            self.place.save(update_fields=['latitude'])
+
+    def test_update_average_ratings_writes_only_the_rating(self):
+        """The rating update is one UPDATE of avg_rating and fires no post_save"""
+        from django.db.models.signals import post_save
+        from core.models import Review
+
+        Review.objects.create(
+            place=self.place, user=self.user, overall_rating=4, comment='Good',
+            moderation_status='APPROVED'
+        )
+        Place.objects.filter(pk=self.place.pk).update(name='Renamed elsewhere')
+        saves = []
+        receiver = lambda sender, **kwargs: saves.append(sender)
+        post_save.connect(receiver, sender=Place)
+        try:
+            with self.assertNumQueries(2):
+                self.place.update_average_ratings()
+        finally:
+            post_save.disconnect(receiver, sender=Place)
+
+        self.assertEqual(saves, [])
+        self.place.refresh_from_db()
+        self.assertEqual(self.place.avg_rating, 4)
+        self.assertEqual(self.place.name, 'Renamed elsewhere')
+
 class FeatureModelTest(TestCase):
     def setUp(self):
         self.feature = Feature.objects.create(
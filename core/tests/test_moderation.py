@@ -1,9 +1,15 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from core.models import Place, Review, PlacePhoto, Notification
+from core.models import Place, Review, PlacePhoto, Notification, OutboxEvent
 
 User = get_user_model()
 
@@ -50,4 +56,247 @@ class ModerationPermissionsTestCase(APITestCase):
         
         self.client.force_authenticate(user=self.moderator)
         response = self.client.get('/api/moderation/photos/')
-        self.assertEqual(response.status_code, status.HTTP_200_OK) 
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_200_OK) 
+
+class BulkModerationTestCase(APITestCase):
+    """Tests for moderating many objects in one request."""
+
+    def setUp(self):
+        self.moderator = User.objects.create_user(
+            username='bulkmod', email='bulkmod@test.com', password='modpass123', is_staff=True
+        )
+        self.moderator.groups.create(name='moderators')
+        self.authors = [
+            User.objects.create_user(username=f'author{i}', email=f'author{i}@test.com', password='pass12345')
+            for i in range(3)
+        ]
+        self.place = Place.objects.create(
+            name='Bulk Place', address='1 Bulk Road', place_type='cafe', created_by=self.authors[0],
+            moderation_status='APPROVED', draft=False
+        )
+        self.other_place = Place.objects.create(
+            name='Other Place', address='2 Bulk Road', place_type='bar', created_by=self.authors[1],
+            moderation_status='APPROVED', draft=False
+        )
+        # Committed (and their outbox events drained) before the tests moderate them
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviews = [
+                Review.objects.create(place=place, user=self.authors[author], overall_rating=rating, comment='Nice')
+                for place, author, rating in [
+                    (self.place, 0, 2), (self.place, 1, 4), (self.place, 2, 3), (self.other_place, 0, 5)
+                ]
+            ]
+        self.client.force_authenticate(user=self.moderator)
+        self.url = '/api/moderation/reviews/bulk_update_status/'
+
+    def test_approves_with_batched_side_effects(self):
+        ids = [str(review.id) for review in self.reviews]
+        Notification.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {'ids': ids, 'status': 'approved'}, format='json')
+            # Like single-object moderation: one outbox event per object, drained on commit
+            self.assertEqual(OutboxEvent.objects.filter(event_type='moderation_changed').count(), 4)
+            self.assertFalse(Notification.objects.filter(notification_type='review_approved').exists())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(response.data['updated'], 4)
+        self.assertEqual(Review.objects.filter(moderation_status='APPROVED').count(), 4)
+        self.assertEqual(Notification.objects.filter(notification_type='review_approved').count(), 4)
+        self.assertEqual(
+            Notification.objects.filter(notification_type='review_approved').first().message,
+            'Your review for "Bulk Place" has been approved and is now visible to all users.'
+        )
+
+        self.place.refresh_from_db()
+        self.other_place.refresh_from_db()
+        self.assertEqual((self.place.avg_rating, self.other_place.avg_rating), (3.0, 5.0))
+        # author0 wrote two of the reviews
+        guide_points = {user.username: user.guide_points for user in User.objects.filter(username__startswith='author')}
+        self.assertEqual(guide_points, {'author0': 20, 'author1': 10, 'author2': 10})
+
+        # Already approved objects are left alone
+        response = self.client.post(self.url, {'ids': ids, 'status': 'approved'}, format='json')
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(response.data['unchanged'], 4)
+        self.assertEqual(Notification.objects.filter(notification_type='review_approved').count(), 4)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        small = [str(review.id) for review in self.reviews[:1]]
+        large = [str(review.id) for review in self.reviews[1:]]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as one:
+                self.client.post(self.url, {'ids': small, 'status': 'rejected', 'comment': 'Off topic'}, format='json')
+            with CaptureQueriesContext(connection) as three:
+                self.client.post(self.url, {'ids': large, 'status': 'rejected', 'comment': 'Off topic'}, format='json')
+
+        self.assertEqual(len(three), len(one))
+        rejection = Notification.objects.filter(notification_type='review_rejected').first()
+        self.assertIn('Reason: Off topic', rejection.message)
+
+    def test_rejecting_approved_reviews_updates_rating(self):
+        for review in self.reviews:
+            review.approve(self.moderator)
+        self.place.refresh_from_db()
+        self.assertEqual(self.place.avg_rating, 3.0)
+
+        self.client.post(
+            self.url, {'ids': [str(self.reviews[0].id)], 'status': 'rejected', 'comment': 'Spam'}, format='json'
+        )
+
+        self.place.refresh_from_db()
+        self.assertEqual(self.place.avg_rating, 3.5)
+        self.assertEqual(Review.objects.get(pk=self.reviews[0].pk).moderation_comment, 'Spam')
+
+    def test_rejects_too_many_ids(self):
+        with self.settings(MODERATION_BULK_MAX_IDS=2):
+            response = self.client.post(
+                self.url, {'ids': [str(review.id) for review in self.reviews], 'status': 'approved'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ModerationQueueTestCase(APITestCase):
+    """Tests for claiming pending items from the moderation queue."""
+
+    def setUp(self):
+        group = Group.objects.create(name='moderators')
+        self.moderators = []
+        for i in range(2):
+            moderator = User.objects.create_user(
+                username=f'queuemod{i}', email=f'queuemod{i}@test.com', password='modpass123', is_staff=True
+            )
+            moderator.groups.add(group)
+            self.moderators.append(moderator)
+        owner = User.objects.create_user(username='queueowner', email='queueowner@test.com', password='pass12345')
+        self.place = Place.objects.create(
+            name='Queue Place', address='1 Queue Road', place_type='cafe', created_by=owner,
+            moderation_status='APPROVED', draft=False
+        )
+        self.authors = [
+            User.objects.create_user(username=f'queueauthor{i}', email=f'queueauthor{i}@test.com', password='pass12345')
+            for i in range(4)
+        ]
+        now = timezone.now()
+        self.reviews = []
+        for hours_ago, author in zip([40, 30, 20, 10], self.authors):
+            review = Review.objects.create(place=self.place, user=author, overall_rating=4, comment='Queued')
+            Review.objects.filter(pk=review.pk).update(created_at=now - timedelta(hours=hours_ago))
+            self.reviews.append(review)
+        self.url = '/api/moderation/reviews/'
+
+    def claim(self, moderator, limit):
+        self.client.force_authenticate(user=moderator)
+        response = self.client.post(f'{self.url}claim/', {'limit': limit}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['id'] for item in response.data['results']]
+
+    def test_moderators_claim_disjoint_batches_in_priority_order(self):
+        # A level 3 contributor's review gets an 18 hour head start
+        User.objects.filter(pk=self.authors[3].pk).update(guide_level=3)
+
+        first = self.claim(self.moderators[0], 2)
+        second = self.claim(self.moderators[1], 2)
+
+        expected = [str(self.reviews[i].id) for i in (0, 1, 3, 2)]
+        self.assertEqual(first + second, expected)
+        # Claiming again renews the moderator's own items instead of taking more
+        self.assertEqual(self.claim(self.moderators[0], 2), first)
+
+    def test_expired_claims_return_to_the_queue(self):
+        with self.settings(MODERATION_CLAIM_LEASE=60):
+            first = self.claim(self.moderators[0], 4)
+        self.assertEqual(len(first), 4)
+        self.assertEqual(self.claim(self.moderators[1], 4), [])
+
+        Review.objects.update(claim_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.claim(self.moderators[1], 4), first)
+
+        self.client.force_authenticate(user=self.moderators[0])
+        response = self.client.get(f'{self.url}claimed/')
+        self.assertEqual(response.data['count'], 0)
+
+    def test_release_and_moderation_clear_claims(self):
+        claimed = self.claim(self.moderators[0], 3)
+        response = self.client.post(f'{self.url}release/', {'ids': [claimed[0]]}, format='json')
+        self.assertEqual(response.data['released'], 1)
+
+        self.reviews[1].approve(self.moderators[0])
+        self.assertIsNone(Review.objects.get(pk=self.reviews[1].pk).claimed_by_id)
+        self.client.post(
+            f'{self.url}bulk_update_status/', {'ids': [claimed[2]], 'status': 'approved'}, format='json'
+        )
+
+        response = self.client.get(f'{self.url}claimed/')
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(self.claim(self.moderators[1], 4), [claimed[0], str(self.reviews[3].id)])
+
+    def test_bulk_moderation_skips_items_claimed_by_others(self):
+        claimed = self.claim(self.moderators[0], 2)
+
+        self.client.force_authenticate(user=self.moderators[1])
+        response = self.client.post(
+            f'{self.url}bulk_update_status/', {'ids': [str(review.id) for review in self.reviews], 'status': 'approved'},
+            format='json'
+        )
+
+        self.assertEqual((response.data['updated'], response.data['unchanged']), (2, 2))
+        self.assertEqual(
+            set(Review.objects.filter(moderation_status='PENDING').values_list('id', flat=True)),
+            {review.id for review in self.reviews if str(review.id) in claimed}
+        )
+
+    def test_claims_are_enforced_for_other_moderators(self):
+        claimed = self.claim(self.moderators[0], 2)
+
+        # Out of the other moderator's queue...
+        self.client.force_authenticate(user=self.moderators[1])
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [item['id'] for item in response.data['results']], [str(self.reviews[i].id) for i in (2, 3)]
+        )
+        # ...and not theirs to moderate while the lease runs
+        response = self.client.patch(f'{self.url}{claimed[0]}/update_status/', {'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Review.objects.get(pk=claimed[0]).moderation_status, 'PENDING')
+
+        # The holder sees and moderates them
+        self.client.force_authenticate(user=self.moderators[0])
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 4)
+        response = self.client.patch(f'{self.url}{claimed[0]}/update_status/', {'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+        # An expired claim no longer blocks anyone
+        Review.objects.filter(pk=claimed[1]).update(claim_expires_at=timezone.now() - timedelta(seconds=1))
+        self.client.force_authenticate(user=self.moderators[1])
+        response = self.client.patch(
+            f'{self.url}{claimed[1]}/update_status/', {'status': 'rejected', 'comment': 'Off topic'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+    def test_rejecting_one_item_requires_a_comment(self):
+        self.client.force_authenticate(user=self.moderators[0])
+        url = f'{self.url}{self.reviews[0].id}/update_status/'
+
+        response = self.client.patch(url, {'status': 'rejected'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('comment', response.data)
+        self.assertEqual(Review.objects.get(pk=self.reviews[0].pk).moderation_status, 'PENDING')
+
+        response = self.client.patch(url, {'status': 'rejected', 'comment': 'Spam'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+
+    def test_queue_is_cursor_paged_with_places_preloaded(self):
+        self.client.force_authenticate(user=self.moderators[0])
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(self.url, {'page_size': 1})
+        with CaptureQueriesContext(connection) as three:
+            response = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(len(three), len(one))
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.reviews[3].id)])
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Notification
+from core.utils.notification_counters import (
+    get_unread_count, get_unread_counts, total_key
+)
+from core.utils.notification_retention import purge_notifications
+
+User = get_user_model()
+
+
+class UnreadCounterTest(TestCase):
+    """Tests for the cached per-user unread notification counters."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='counted',
+            email='counted@example.com',
+            password='testpassword'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_notification(self, notification_type='new_review'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notification.objects.create(
+                user=self.user,
+                notification_type=notification_type,
+                title='Notification',
+                message='Something happened'
+            )
+
+    def test_missing_counters_are_rebuilt_from_database(self):
+        Notification.objects.create(
+            user=self.user, notification_type='new_review', title='t', message='m'
+        )
+        cache.clear()
+
+        self.assertEqual(get_unread_count(self.user.id), 1)
+        self.assertEqual(cache.get(total_key(self.user.id)), 1)
+
+    def test_create_increments_counters(self):
+        get_unread_count(self.user.id)  # Warm the counters
+        self.create_notification('new_review')
+        self.create_notification('new_photo')
+        self.create_notification('new_photo')
+
+        with self.assertNumQueries(0):
+            counts = get_unread_counts(self.user.id)
+
+        self.assertEqual(counts, {
+            'unread_count': 3,
+            'notification_types': {'new_review': 1, 'new_photo': 2},
+        })
+
+    def test_mark_read_decrements_once(self):
+        notification = self.create_notification()
+        get_unread_count(self.user.id)
+        url = reverse('notification-mark-read', args=[notification.id])
+
+        self.client.post(url)
+        self.client.post(url)
+
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        notification.refresh_from_db()
+        self.assertTrue(notification.is_read)
+
+    def test_mark_all_read_resets_counters(self):
+        self.create_notification('new_review')
+        self.create_notification('badge_earned')
+        get_unread_count(self.user.id)
+
+        response = self.client.post(reverse('notification-mark-all-read'))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(get_unread_counts(self.user.id), {'unread_count': 0, 'notification_types': {}})
+
+    def test_unread_count_endpoint_reads_from_cache(self):
+        self.create_notification()
+        get_unread_counts(self.user.id)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.data, {'unread_count': 1})
+
+    def test_cleanup_decrements_deleted_unread_notifications(self):
+        old = self.create_notification('new_photo')
+        self.create_notification('new_review')
+        Notification.objects.filter(id=old.id).update(created_at=timezone.now() - timedelta(days=60))
+        get_unread_count(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purge_notifications(days=30, pause=0)
+
+        self.assertEqual(get_unread_counts(self.user.id), {
+            'unread_count': 1,
+            'notification_types': {'new_review': 1},
+        })
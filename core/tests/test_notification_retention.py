@@ -0,0 +1,101 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Notification
+from core.utils.notification_retention import purge_notifications
+
+User = get_user_model()
+
+
+class NotificationRetentionTest(TestCase):
+    """Tests for the batched notification retention job."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='retention',
+            email='retention@example.com',
+            password='testpassword'
+        )
+        self.now = timezone.now()
+
+    def create_notification(self, notification_type='new_review', age_days=0):
+        notification = Notification.objects.create(
+            user=self.user,
+            notification_type=notification_type,
+            title='Test',
+            message='Test notification'
+        )
+        # auto_now_add ignores explicit values, so backdate with an update
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=self.now - timedelta(days=age_days)
+        )
+        return notification
+
+    def test_deletes_only_expired_notifications_in_batches(self):
+        expired = [self.create_notification(age_days=40) for _ in range(5)]
+        recent = [self.create_notification(age_days=5) for _ in range(3)]
+
+        summary = purge_notifications(days=30, rules={}, batch_size=2, pause=0, now=self.now)
+
+        self.assertEqual(summary, {'default': 5})
+        self.assertFalse(Notification.objects.filter(pk__in=[n.pk for n in expired]).exists())
+        self.assertEqual(Notification.objects.filter(pk__in=[n.pk for n in recent]).count(), 3)
+
+    def test_per_type_rules(self):
+        short_lived = self.create_notification('new_photo', age_days=10)
+        long_lived = self.create_notification('badge_earned', age_days=100)
+        default_expired = self.create_notification('new_review', age_days=40)
+
+        summary = purge_notifications(
+            days=30,
+            rules={'new_photo': 7, 'badge_earned': 365},
+            batch_size=10,
+            pause=0,
+            now=self.now
+        )
+
+        self.assertEqual(summary, {'default': 1, 'new_photo': 1, 'badge_earned': 0})
+        self.assertFalse(Notification.objects.filter(pk=short_lived.pk).exists())
+        self.assertTrue(Notification.objects.filter(pk=long_lived.pk).exists())
+        self.assertFalse(Notification.objects.filter(pk=default_expired.pk).exists())
+
+    def test_unknown_type_rules_are_ignored(self):
+        self.create_notification('new_review', age_days=40)
+
+        summary = purge_notifications(days=30, rules={'not_a_type': 1}, pause=0, now=self.now)
+
+        self.assertEqual(summary, {'default': 1})
+
+    def test_archives_before_deleting(self):
+        expired = self.create_notification(age_days=40)
+        self.create_notification(age_days=1)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            purge_notifications(days=30, rules={}, pause=0, archive_dir=archive_dir, now=self.now)
+
+            archive_path = f"{archive_dir}/notifications-{self.now.strftime('%Y%m%d%H%M%S')}.jsonl.gz"
+            with gzip.open(archive_path, 'rt', encoding='utf-8') as archive_file:
+                rows = [json.loads(line) for line in archive_file]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], expired.pk)
+        self.assertEqual(rows[0]['notification_type'], 'new_review')
+
+    def test_management_command(self):
+        self.create_notification('new_photo', age_days=10)
+        self.create_notification('new_review', age_days=10)
+
+        call_command('purge_notifications', '--days', '30', '--rule', 'new_photo=7', '--pause', '0', stdout=StringIO())
+
+        self.assertEqual(
+            list(Notification.objects.values_list('notification_type', flat=True)),
+            ['new_review']
+        )
@@ -0,0 +1,142 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Notification
+from core.utils.notification_broker import InMemoryNotificationBroker, get_broker
+from core.views.notification_stream import _run_db, format_sse, notification_websocket
+
+User = get_user_model()
+
+
+class InMemoryBrokerTest(TestCase):
+    """Tests for the in-memory per-user notification broker."""
+
+    def test_publish_reaches_only_the_users_subscribers(self):
+        broker = InMemoryNotificationBroker()
+
+        async def scenario():
+            mine = broker.subscribe(1)
+            other = broker.subscribe(2)
+            delivered = broker.publish(1, {'event': 'notification', 'data': {'id': 1}})
+            received = await mine.get(timeout=1)
+            nothing = await other.get(timeout=0.01)
+            broker.unsubscribe(mine)
+            broker.unsubscribe(other)
+            return delivered, received, nothing
+
+        delivered, received, nothing = asyncio.run(scenario())
+
+        self.assertEqual(delivered, 1)
+        self.assertEqual(received['data'], {'id': 1})
+        self.assertIsNone(nothing)
+        self.assertEqual(broker.subscriber_count(1), 0)
+
+    def test_format_sse(self):
+        message = format_sse({'event': 'unread_count', 'data': {'unread_count': 3}})
+        self.assertEqual(message, 'event: unread_count\ndata: {"unread_count": 3}\n\n')
+
+
+class NotificationPushTest(TestCase):
+    """Tests for publishing notifications and the streaming endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='streamer',
+            email='streamer@example.com',
+            password='testpassword'
+        )
+
+    def create_notification(self):
+        return Notification.objects.create(
+            user=self.user,
+            notification_type='new_review',
+            title='New Review for Your Place',
+            message='A new review has been posted'
+        )
+
+    def test_new_notification_is_published_on_commit(self):
+        broker = get_broker()
+        loop = asyncio.new_event_loop()
+
+        async def subscribe():
+            return broker.subscribe(self.user.id)
+
+        subscription = loop.run_until_complete(subscribe())
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = self.create_notification()
+            event = loop.run_until_complete(subscription.get(timeout=1))
+        finally:
+            broker.unsubscribe(subscription)
+            loop.close()
+
+        self.assertEqual(event['event'], 'notification')
+        self.assertEqual(event['data']['id'], notification.id)
+        self.assertEqual(event['data']['notificationType'], 'new_review')
+
+    def test_notification_without_subscribers_is_not_serialized(self):
+        with mock.patch('core.utils.notification_broker.notification_event') as notification_event:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.create_notification()
+
+        notification_event.assert_not_called()
+
+    async def test_db_calls_keep_the_connection_of_an_open_transaction(self):
+        # The test case's transaction would otherwise be closed under the other tests
+        with mock.patch('core.views.notification_stream.close_old_connections') as close_old_connections:
+            count = await _run_db(Notification.objects.count)
+
+        self.assertEqual(count, 0)
+        close_old_connections.assert_not_called()
+
+    def test_sse_stream_requires_asgi(self):
+        response = self.client.get(reverse('notification-stream'))
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    async def run_websocket(self, query_string, after_accept=None):
+        """Drive the WebSocket app with an in-memory connection and collect sent messages."""
+        sent = []
+        incoming = asyncio.Queue()
+        await incoming.put({'type': 'websocket.connect'})
+
+        async def receive():
+            return await incoming.get()
+
+        async def send(message):
+            sent.append(message)
+            if message['type'] == 'websocket.accept' and after_accept:
+                asyncio.get_running_loop().call_later(0.05, after_accept)
+            if message['type'] == 'websocket.send' and len(sent) >= 3:
+                await incoming.put({'type': 'websocket.disconnect'})
+
+        scope = {'type': 'websocket', 'path': '/ws/notifications/', 'query_string': query_string}
+        await asyncio.wait_for(notification_websocket(scope, receive, send), timeout=5)
+        return sent
+
+    async def test_websocket_rejects_invalid_token(self):
+        sent = await self.run_websocket(b'token=not-a-token')
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': 4401}])
+
+    async def test_websocket_pushes_unread_count_and_new_notifications(self):
+        await sync_to_async(self.create_notification)()
+        token = str(AccessToken.for_user(self.user))
+
+        def publish():
+            get_broker().publish(self.user.id, {'event': 'notification', 'data': {'id': 42}})
+
+        sent = await self.run_websocket(f'token={token}'.encode(), after_accept=publish)
+
+        self.assertEqual(sent[0], {'type': 'websocket.accept'})
+        self.assertEqual(json.loads(sent[1]['text']), {'event': 'unread_count', 'data': {'unread_count': 1}})
+        self.assertEqual(json.loads(sent[2]['text']), {'event': 'notification', 'data': {'id': 42}})
@@ -0,0 +1,182 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from core.models import Badge, Notification, OutboxEvent, Place, Review, UserBadge, UserPoints
+from core.utils.outbox import _drain_after_commit, process_outbox, record_event
+
+User = get_user_model()
+
+
+def drains(callbacks):
+    return [callback for callback in callbacks if getattr(callback, 'func', None) is _drain_after_commit]
+
+
+class OutboxTest(TestCase):
+    """Test the transactional outbox behind the moderation, content and badge signals."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", email="owner@example.com", password="testpassword")
+        self.reviewer = User.objects.create_user(
+            username="reviewer", email="reviewer@example.com", password="testpassword"
+        )
+        self.place = Place.objects.create(
+            name="Outbox Cafe", address="1 Queue Rd", place_type="cafe", created_by=self.owner,
+            moderation_status="APPROVED"
+        )
+
+    def _review(self, user=None):
+        return Review.objects.create(
+            place=self.place, user=user or self.reviewer, overall_rating=4, comment="Nice",
+            moderation_status="PENDING"
+        )
+
+    def test_signals_record_events_instead_of_side_effects(self):
+        review = self._review()
+        review.update_moderation_status('APPROVED')
+
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('event_type', flat=True)),
+            ['content_created', 'moderation_changed']
+        )
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(UserPoints.objects.exists())
+
+    def test_drain_applies_events_once(self):
+        review = self._review()
+        review.update_moderation_status('APPROVED')
+
+        self.assertEqual(process_outbox(), 2)
+        self.assertEqual(process_outbox(), 0)
+
+        self.assertEqual(
+            Notification.objects.get(user=self.owner).notification_type, 'new_review'
+        )
+        self.assertEqual(
+            Notification.objects.get(user=self.reviewer).notification_type, 'review_approved'
+        )
+        self.assertEqual(UserPoints.objects.get(user=self.reviewer).points, 10)
+        self.assertFalse(OutboxEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_drains_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self._review()
+            self._review(User.objects.create_user(username="second", email="second@example.com", password="x"))
+
+        # One drain for the transaction, covering every event it recorded
+        self.assertEqual(len(drains(callbacks)), 1)
+        self.assertEqual(len(drains(callbacks)[0].args[0]), 2)
+        self.assertEqual(Notification.objects.filter(notification_type='new_review').count(), 2)
+
+    def test_each_transaction_gets_its_own_drain(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._review()
+        second = User.objects.create_user(username="second", email="second@example.com", password="x")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            review = self._review(second)
+
+        self.assertEqual([drain.args[0] for drain in drains(callbacks)], [[f'created:review:{review.pk}']])
+        self.assertEqual(Notification.objects.filter(notification_type='new_review').count(), 2)
+
+    def test_rolled_back_drain_is_not_reused(self):
+        second = User.objects.create_user(username="second", email="second@example.com", password="x")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    self._review()
+                    raise RuntimeError
+            review = self._review(second)
+
+        self.assertEqual([drain.args[0] for drain in drains(callbacks)], [[f'created:review:{review.pk}']])
+        self.assertEqual(Notification.objects.get().object_id, str(review.id))
+
+    def test_drain_after_commit_only_applies_the_transaction_events(self):
+        # Backlog left by an earlier transaction
+        with override_settings(OUTBOX_DRAIN_ON_COMMIT=False):
+            self._review()
+
+        second = User.objects.create_user(username="second", email="second@example.com", password="x")
+        with self.captureOnCommitCallbacks(execute=True):
+            review = self._review(second)
+
+        self.assertEqual(Notification.objects.get().object_id, str(review.id))
+        self.assertEqual(OutboxEvent.objects.filter(processed_at__isnull=True).count(), 1)
+
+    @override_settings(BACKGROUND_TASKS_ASYNC=True)
+    def test_async_drain_stays_in_process_with_process_local_notifications(self):
+        # The default in-memory broker only reaches this process's streams
+        with patch('core.tasks.process_outbox.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self._review()
+
+        delay.assert_not_called()
+        self.assertTrue(Notification.objects.filter(notification_type='new_review').exists())
+
+    @override_settings(BACKGROUND_TASKS_ASYNC=True)
+    def test_async_drain_is_queued_with_shared_notifications(self):
+        with patch('core.utils.outbox.notifications_are_process_local', return_value=False), \
+                patch('core.tasks.process_outbox.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                review = self._review()
+
+        delay.assert_called_once_with(keys=[f'created:review:{review.pk}'])
+        self.assertFalse(Notification.objects.exists())
+
+    def test_rolled_back_change_records_nothing(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self._review()
+                raise RuntimeError
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_repeated_key_is_recorded_once(self):
+        record_event('content_created', {'kind': 'review', 'id': 'x'}, 'created:review:x')
+        record_event('content_created', {'kind': 'review', 'id': 'x'}, 'created:review:x')
+
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_events_are_retried_then_left(self):
+        record_event('unknown', {}, 'unknown:1')
+
+        self.assertEqual(process_outbox(), 0)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('No handler', event.last_error)
+
+        process_outbox()
+        process_outbox()
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 2)
+        self.assertIsNone(event.processed_at)
+
+    def test_failing_handler_does_not_block_other_events(self):
+        self._review()
+        badge = Badge.objects.create(name="Regular", icon="badge-regular", description="Comes often", category="reviews")
+        UserBadge.award_badge(self.reviewer, badge)
+
+        with patch.dict('core.utils.outbox.EVENT_HANDLERS', content_created=lambda events: 1 / 0):
+            self.assertEqual(process_outbox(), 1)
+
+        self.assertEqual(Notification.objects.get().notification_type, 'badge_earned')
+        self.assertEqual(UserPoints.objects.get().points, 10)
+        failed = OutboxEvent.objects.get(event_type='content_created')
+        self.assertIn('ZeroDivisionError', failed.last_error)
+
+    @override_settings(OUTBOX_DRAIN_ON_COMMIT=False)
+    def test_command_drains_when_not_draining_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self._review()
+        self.assertFalse(drains(callbacks))
+        self.assertFalse(Notification.objects.exists())
+
+        out = StringIO()
+        call_command('drain_outbox', batch_size=1, stdout=out)
+
+        self.assertIn('Processed 1 outbox events', out.getvalue())
+        self.assertTrue(Notification.objects.filter(notification_type='new_review').exists())
@@ -0,0 +1,682 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+import random
+
+from PIL import Image, ImageDraw
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Place, PlacePhoto
+from core.utils.photo_processing import get_derivative_name, process_photo
+from core.utils.photo_hashing import BKTree, dedupe_photos, hamming, phash, dhash, to_signed
+from core.utils.photo_layout import get_legacy_derivative_name, migrate_photo_layout
+from core.utils.photo_storage import MAX_FILE_SIZE, get_photo_name, place_photo_storage, validate_photo_file
+from core.utils.upload_tickets import get_upload_backend
+
+User = get_user_model()
+
+
+def make_image(size=(1200, 800), image_format='JPEG', color=(200, 80, 40)):
+    buffer = BytesIO()
+    mode = 'RGBA' if image_format == 'PNG' else 'RGB'
+    Image.new(mode, size, color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def make_pattern(seed, size=(1200, 800), image_format='JPEG', quality=90):
+    """A photo-like image of random shapes; the same seed draws the same picture."""
+    rng = random.Random(seed)
+    img = Image.new('RGB', (1200, 800), (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x0, y0 = rng.randrange(1200), rng.randrange(800)
+        x1, y1 = x0 + rng.randrange(100, 600), y0 + rng.randrange(100, 400)
+        draw.ellipse([x0, y0, x1, y1], fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    img = img.resize(size, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+class PhotoDerivativeTest(TestCase):
+    """Tests for uploading photos and generating their derivatives."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            PLACE_PHOTOS_ROOT=os.path.join(self.media_root, 'places'),
+        )
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(
+            username='photographer',
+            email='photographer@example.com',
+            password='testpassword'
+        )
+        self.place = Place.objects.create(
+            name='Photo Place',
+            address='1 Photo Road',
+            place_type='cafe',
+            district='daan',
+            created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/places/{self.place.id}/photos/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def upload(self, content, name='photo.jpg', content_type='image/jpeg'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                self.url,
+                {'image': SimpleUploadedFile(name, content, content_type=content_type), 'caption': 'Front'},
+                format='multipart'
+            )
+
+    def test_upload_generates_derivatives_in_both_formats(self):
+        response = self.upload(make_image((1200, 800)))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        photo = PlacePhoto.objects.get(id=response.data['id'])
+        self.assertEqual((photo.width, photo.height), (1200, 800))
+        self.assertIsNotNone(photo.processed_at)
+        self.assertEqual(set(photo.derivatives), {'thumb', 'card', 'full'})
+        self.assertEqual(
+            (photo.derivatives['thumb']['width'], photo.derivatives['thumb']['height']), (200, 133)
+        )
+        self.assertEqual(photo.derivatives['card']['width'], 640)
+        # The original is smaller than the full box and is not upscaled
+        self.assertEqual(photo.derivatives['full']['width'], 1200)
+
+        for extension, image_format in [('webp', 'WEBP'), ('jpeg', 'JPEG')]:
+            name = get_derivative_name(photo, 'card', extension)
+            with place_photo_storage.open(name) as f:
+                self.assertEqual(Image.open(f).format, image_format)
+            self.assertEqual(photo.derivatives['card'][extension], place_photo_storage.url(name))
+
+    def test_large_jpeg_is_downscaled_while_decoding(self):
+        response = self.upload(make_image((3200, 2400)))
+
+        photo = PlacePhoto.objects.get(id=response.data['id'])
+        # Dimensions of the original are recorded, not of the draft decode
+        self.assertEqual((photo.width, photo.height), (3200, 2400))
+        self.assertEqual(
+            (photo.derivatives['full']['width'], photo.derivatives['full']['height']), (1600, 1200)
+        )
+
+    def test_transparent_png_is_flattened(self):
+        response = self.upload(make_image((400, 400), 'PNG', (0, 0, 0, 0)), name='logo.png', content_type='image/png')
+
+        photo = PlacePhoto.objects.get(id=response.data['id'])
+        name = get_derivative_name(photo, 'thumb', 'jpeg')
+        with place_photo_storage.open(name) as f:
+            self.assertEqual(Image.open(f).getpixel((10, 10)), (255, 255, 255))
+
+    def test_list_serves_card_derivative(self):
+        self.upload(make_image())
+        PlacePhoto.objects.update(moderation_status='APPROVED')
+
+        response = self.client.get(self.url)
+
+        photo = PlacePhoto.objects.get()
+        result = response.data['results'][0] if 'results' in response.data else response.data[0]
+        self.assertEqual(result['displayUrl'], photo.derivatives['card']['jpeg'])
+        self.assertEqual(result['displayUrlWebp'], photo.derivatives['card']['webp'])
+
+        response = self.client.get(f'{self.url}{photo.id}/')
+        self.assertEqual(response.data['displayUrl'], photo.derivatives['full']['jpeg'])
+
+    def test_url_only_photo_falls_back_to_url(self):
+        photo = PlacePhoto.objects.create(place=self.place, user=self.user, url='https://example.com/a.jpg')
+        self.assertEqual(process_photo(photo), {})
+        self.assertEqual(photo.get_display_url('thumb'), 'https://example.com/a.jpg')
+
+    def test_failed_processing_is_logged_and_recorded(self):
+        with mock.patch('core.tasks.process_photo', side_effect=OSError('truncated file')):
+            with self.assertLogs('core.utils.background', 'ERROR') as logs:
+                response = self.upload(make_image())
+
+        # The upload itself committed
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertIn('process_photo_derivatives failed', logs.output[0])
+        photo = PlacePhoto.objects.get(id=response.data['id'])
+        self.assertEqual(photo.processing_error, 'OSError: truncated file')
+        self.assertIsNone(photo.processed_at)
+
+        # Reprocessing clears the failure
+        process_photo(photo)
+        photo.refresh_from_db()
+        self.assertEqual(photo.processing_error, '')
+        self.assertIsNotNone(photo.processed_at)
+
+    def test_delete_removes_files(self):
+        response = self.upload(make_image())
+        photo = PlacePhoto.objects.get(id=response.data['id'])
+        names = [photo.image.name, get_derivative_name(photo, 'thumb', 'webp')]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'{self.url}{photo.id}/')
+
+        for name in names:
+            self.assertFalse(place_photo_storage.exists(name))
+
+    def test_rejects_undersized_upload(self):
+        response = self.upload(make_image((100, 100)))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlacePhoto.objects.exists())
+
+
+class CountingFile(BytesIO):
+    """In-memory upload that records how many bytes were read."""
+
+    def __init__(self, content, name):
+        super().__init__(content)
+        self.name = name
+        self.size = len(content)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class HeaderValidationTest(TestCase):
+    """Tests for header-only photo validation."""
+
+    def test_reads_only_the_header(self):
+        content = make_image((1200, 800)) + os.urandom(3 * 1024 * 1024)
+        upload = CountingFile(content, 'photo.jpg')
+
+        validate_photo_file(upload)
+
+        self.assertLess(upload.bytes_read, 64 * 1024)
+        self.assertEqual(upload.tell(), 0)
+
+    def test_rejects_unsupported_format_with_allowed_extension(self):
+        buffer = BytesIO()
+        Image.new('RGB', (400, 400)).save(buffer, format='GIF')
+        with self.assertRaisesMessage(ValidationError, 'files are allowed'):
+            validate_photo_file(CountingFile(buffer.getvalue(), 'photo.jpg'))
+
+    def test_rejects_non_image(self):
+        with self.assertRaisesMessage(ValidationError, 'Invalid image file'):
+            validate_photo_file(CountingFile(b'not an image' * 100, 'photo.jpg'))
+
+    def test_reports_dimension_errors(self):
+        with self.assertRaisesMessage(ValidationError, 'must not exceed'):
+            validate_photo_file(CountingFile(make_image((4100, 400)), 'photo.jpg'))
+
+    def test_oversized_upload_is_rejected_while_streaming(self):
+        user = User.objects.create_user(username='big', email='big@example.com', password='testpassword')
+        place = Place.objects.create(name='Big Place', address='1 Big Road', place_type='cafe', created_by=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        content = make_image((1200, 800)) + os.urandom(MAX_FILE_SIZE)
+        response = client.post(
+            f'/api/places/{place.id}/photos/',
+            {'image': SimpleUploadedFile('photo.jpg', content, content_type='image/jpeg')},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('must not exceed', str(response.data))
+        self.assertFalse(PlacePhoto.objects.exists())
+
+
+class DirectUploadTest(TestCase):
+    """Tests for upload tickets with the filesystem stand-in for object storage."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            PLACE_PHOTOS_ROOT=os.path.join(self.media_root, 'places'),
+        )
+        self.settings_override.enable()
+
+        self.user = User.objects.create_user(
+            username='direct', email='direct@example.com', password='testpassword'
+        )
+        self.place = Place.objects.create(
+            name='Direct Place', address='1 Direct Road', place_type='cafe', created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/places/{self.place.id}/photos/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def get_ticket(self, filename='front.jpg'):
+        response = self.client.post(
+            f'{self.url}upload_ticket/',
+            {'filename': filename, 'contentType': 'image/jpeg'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data
+
+    def put(self, ticket, content):
+        # The upload target is authenticated by the ticket alone
+        return APIClient().generic(
+            ticket['upload']['method'], ticket['upload']['url'], content, content_type='image/jpeg'
+        )
+
+    def complete(self, ticket, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'{self.url}complete_upload/', {'ticket': ticket['ticket'], **extra}, format='json'
+            )
+
+    def test_upload_and_complete_creates_processed_photo(self):
+        ticket = self.get_ticket()
+        self.assertEqual(self.put(ticket, make_image((1200, 800))).status_code, status.HTTP_200_OK)
+
+        response = self.complete(ticket, caption='Front')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        photo = PlacePhoto.objects.get()
+        self.assertEqual(str(photo.id), ticket['photoId'])
+        self.assertEqual(photo.caption, 'Front')
+        self.assertEqual(photo.image.name, get_photo_name(photo.id, 'front.jpg'))
+        self.assertEqual(set(photo.derivatives), {'thumb', 'card', 'full'})
+
+        # Completing twice is idempotent
+        response = self.complete(ticket)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(PlacePhoto.objects.count(), 1)
+
+    def test_concurrent_completion_returns_the_first_photo(self):
+        ticket = self.get_ticket()
+        self.put(ticket, make_image((1200, 800)))
+        name = get_photo_name(ticket['photoId'], 'front.jpg')
+
+        def complete_elsewhere(stored):
+            # Another request completes the ticket after this one's existence check
+            PlacePhoto.objects.create(id=ticket['photoId'], place=self.place, user=self.user, image=name)
+
+        with mock.patch('core.utils.upload_tickets.validate_photo_file', side_effect=complete_elsewhere):
+            response = self.complete(ticket)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        self.assertEqual(str(response.data['id']), ticket['photoId'])
+        self.assertEqual(PlacePhoto.objects.count(), 1)
+
+    def test_is_primary_is_parsed_as_boolean(self):
+        ticket = self.get_ticket()
+        self.put(ticket, make_image((1200, 800)))
+
+        response = self.complete(ticket, isPrimary='maybe')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('isPrimary', response.data)
+
+        response = self.complete(ticket, isPrimary='false')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertFalse(PlacePhoto.objects.get().is_primary)
+
+    def test_complete_before_upload_fails(self):
+        response = self.complete(self.get_ticket())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlacePhoto.objects.exists())
+
+    def test_ticket_is_bound_to_user(self):
+        ticket = self.get_ticket()
+        self.put(ticket, make_image())
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        self.client.force_authenticate(user=other)
+
+        response = self.complete(ticket)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlacePhoto.objects.exists())
+
+    def test_tampered_or_expired_ticket_is_rejected(self):
+        ticket = self.get_ticket()
+        tampered_url = ticket['upload']['url'].replace(ticket['ticket'], ticket['ticket'] + 'x')
+        response = APIClient().put(tampered_url, make_image(), content_type='image/jpeg')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(PHOTO_UPLOAD_TICKET_MAX_AGE=-1):
+            self.assertEqual(self.put(ticket, make_image()).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ticket_uploads_once(self):
+        ticket = self.get_ticket()
+        self.put(ticket, make_image((1200, 800)))
+        name = get_photo_name(ticket['photoId'], 'front.jpg')
+        with place_photo_storage.open(name) as f:
+            original = f.read()
+
+        # Not replaced before completion...
+        response = self.put(ticket, make_image((1200, 800), color=(0, 0, 0)))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        with place_photo_storage.open(name) as f:
+            self.assertEqual(f.read(), original)
+
+        # ...nor after
+        self.complete(ticket)
+        place_photo_storage.delete(name)
+        response = self.put(ticket, make_image((1200, 800)))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(place_photo_storage.exists(name))
+
+    def test_oversized_upload_is_rejected(self):
+        ticket = self.get_ticket()
+        response = self.put(ticket, make_image() + os.urandom(MAX_FILE_SIZE))
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_invalid_upload_is_deleted_on_completion(self):
+        ticket = self.get_ticket()
+        self.put(ticket, make_image((100, 100)))
+
+        response = self.complete(ticket)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PlacePhoto.objects.exists())
+        self.assertFalse(place_photo_storage.exists(get_photo_name(ticket['photoId'], 'front.jpg')))
+
+    def test_rejects_disallowed_file_type(self):
+        response = self.client.post(
+            f'{self.url}upload_ticket/', {'filename': 'a.gif', 'contentType': 'image/gif'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StubS3Storage(FileSystemStorage):
+    """Stands in for S3Boto3Storage: one directory per bucket under S3_ROOT."""
+
+    def __init__(self, bucket_name, location, **kwargs):
+        self.options = {'bucket_name': bucket_name, 'location': location, **kwargs}
+        super().__init__(
+            location=os.path.join(settings.S3_ROOT, bucket_name, location),
+            base_url=f'https://{bucket_name}.s3.example.com/{location}/'
+        )
+
+
+@override_settings(
+    PHOTO_UPLOAD_BACKEND='core.utils.upload_tickets.S3UploadBackend',
+    PHOTO_UPLOAD_S3_BUCKET='citystory-photos',
+    PHOTO_UPLOAD_S3_PREFIX='uploads/',
+    PHOTO_UPLOAD_S3_STORAGE='core.tests.test_photo_processing.StubS3Storage',
+)
+class S3DirectUploadTest(TestCase):
+    """Tests for completing uploads made with the S3 upload backend."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            PLACE_PHOTOS_ROOT=os.path.join(self.media_root, 'places'),
+            S3_ROOT=os.path.join(self.media_root, 's3'),
+        )
+        self.settings_override.enable()
+        # boto3 is only used to presign the upload
+        boto3 = mock.MagicMock()
+        boto3.client.return_value.generate_presigned_post.side_effect = lambda **kwargs: {
+            'url': 'https://citystory-photos.s3.example.com/', 'fields': {'key': kwargs['Key']}
+        }
+        self.patches = [
+            mock.patch.dict('sys.modules', boto3=boto3),
+            mock.patch('core.utils.upload_tickets._backend', None),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+        self.user = User.objects.create_user(username='s3', email='s3@example.com', password='testpassword')
+        self.place = Place.objects.create(
+            name='Bucket Place', address='1 Bucket Road', place_type='cafe', created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/places/{self.place.id}/photos/'
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def get_ticket(self):
+        response = self.client.post(
+            f'{self.url}upload_ticket/', {'filename': 'front.jpg', 'contentType': 'image/jpeg'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data
+
+    def upload_to_bucket(self, key, content):
+        """Write the object where S3 would put it: the bucket, under the full key."""
+        path = os.path.join(settings.S3_ROOT, 'citystory-photos', *key.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def complete(self, ticket):
+        return self.client.post(f'{self.url}complete_upload/', {'ticket': ticket['ticket']}, format='json')
+
+    def test_completion_checks_the_uploaded_bucket_object(self):
+        ticket = self.get_ticket()
+        key = ticket['upload']['fields']['key']
+        name = get_photo_name(ticket['photoId'], 'front.jpg')
+        self.assertEqual(key, f'uploads/{name}')
+        self.upload_to_bucket(key, make_image((1200, 800)))
+
+        response = self.complete(ticket)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        photo = PlacePhoto.objects.get()
+        self.assertEqual(photo.image.name, name)
+        self.assertEqual(photo.url, f'https://citystory-photos.s3.example.com/uploads/{name}')
+
+        storage = get_upload_backend().get_storage()
+        self.assertEqual(
+            (storage.options['bucket_name'], storage.options['location']), ('citystory-photos', 'uploads')
+        )
+
+    def test_object_outside_the_bucket_is_not_uploaded(self):
+        ticket = self.get_ticket()
+        # Only in the local photo storage, which S3 uploads never reach
+        place_photo_storage.save(get_photo_name(ticket['photoId'], 'front.jpg'), ContentFile(make_image()))
+
+        response = self.complete(ticket)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('not been uploaded', str(response.data))
+        self.assertFalse(PlacePhoto.objects.exists())
+
+    def test_invalid_object_is_deleted_from_the_bucket(self):
+        ticket = self.get_ticket()
+        key = ticket['upload']['fields']['key']
+        self.upload_to_bucket(key, make_image((100, 100)))
+
+        response = self.complete(ticket)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(get_upload_backend().get_storage().exists(get_photo_name(ticket['photoId'], 'front.jpg')))
+
+
+class PhotoLayoutTest(TestCase):
+    """Tests for fan-out photo names and moving files into that layout."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            PLACE_PHOTOS_ROOT=os.path.join(self.media_root, 'places'),
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username='layout', email='layout@example.com', password='testpassword'
+        )
+        self.place = Place.objects.create(
+            name='Layout Place', address='1 Layout Road', place_type='cafe', created_by=self.user
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_names_fan_out_by_photo_id(self):
+        photo = PlacePhoto(place=self.place, user=self.user)
+        photo_id = str(photo.id)
+        self.assertEqual(
+            get_photo_name(photo.id, 'Front.JPG'),
+            os.path.join('photos', photo_id[0:2], photo_id[2:4], f'{photo_id}.jpg')
+        )
+
+    def test_name_allocation_makes_one_existence_check(self):
+        name = place_photo_storage.save('photos/ab/cd/taken.jpg', ContentFile(b'x'))
+
+        with mock.patch.object(place_photo_storage, 'exists', wraps=place_photo_storage.exists) as exists:
+            available = place_photo_storage.get_available_name(name)
+
+        self.assertEqual(exists.call_count, 1)
+        self.assertNotEqual(available, name)
+        self.assertTrue(available.startswith('photos/ab/cd/taken_'))
+
+    def test_migrate_moves_legacy_files(self):
+        photo = PlacePhoto.objects.create(place=self.place, user=self.user, url='pending')
+        legacy_name = place_photo_storage.save(f'{self.place.id}/photos/original.jpg', ContentFile(make_image()))
+        legacy_derivative = get_legacy_derivative_name(photo, 'thumb', 'webp')
+        place_photo_storage.save(legacy_derivative, ContentFile(b'webp'))
+        PlacePhoto.objects.filter(pk=photo.pk).update(
+            image=legacy_name,
+            url=place_photo_storage.url(legacy_name),
+            derivatives={'thumb': {'width': 200, 'height': 133, 'webp': place_photo_storage.url(legacy_derivative)}}
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = migrate_photo_layout()
+
+        self.assertEqual(summary, {'photos': 1, 'files': 2, 'failed': 0})
+        photo.refresh_from_db()
+        new_derivative = get_derivative_name(photo, 'thumb', 'webp')
+        self.assertEqual(photo.image.name, get_photo_name(photo.id, 'original.jpg'))
+        self.assertEqual(photo.url, place_photo_storage.url(photo.image.name))
+        self.assertEqual(photo.derivatives['thumb']['webp'], place_photo_storage.url(new_derivative))
+        self.assertTrue(place_photo_storage.exists(photo.image.name))
+        self.assertTrue(place_photo_storage.exists(new_derivative))
+        self.assertFalse(place_photo_storage.exists(legacy_name))
+        self.assertFalse(place_photo_storage.exists(legacy_derivative))
+
+        # Photos already in the new layout are skipped
+        self.assertEqual(migrate_photo_layout()['photos'], 0)
+
+
+class DuplicateDetectionTest(TestCase):
+    """Tests for perceptual hashes and near-duplicate photos."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            PLACE_PHOTOS_ROOT=os.path.join(self.media_root, 'places'),
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user(
+            username='dupes', email='dupes@example.com', password='testpassword'
+        )
+        self.place = Place.objects.create(
+            name='Dupe Place', address='1 Dupe Road', place_type='cafe', created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/places/{self.place.id}/photos/'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def upload(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {'image': SimpleUploadedFile('photo.jpg', content, content_type='image/jpeg')},
+                format='multipart'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return PlacePhoto.objects.get(id=response.data['id'])
+
+    def test_hashes_survive_resizing_and_reencoding(self):
+        original = Image.open(BytesIO(make_pattern(1)))
+        copy = Image.open(BytesIO(make_pattern(1, size=(600, 400), quality=40)))
+        other = Image.open(BytesIO(make_pattern(2)))
+
+        self.assertLessEqual(hamming(phash(original), phash(copy)), 6)
+        self.assertLessEqual(hamming(dhash(original), dhash(copy)), 10)
+        self.assertGreater(hamming(phash(original), phash(other)), 12)
+
+    def test_reupload_is_flagged(self):
+        first = self.upload(make_pattern(1))
+        second = self.upload(make_pattern(1, size=(900, 600), quality=60))
+        third = self.upload(make_pattern(2))
+
+        self.assertIsNone(first.duplicate_of_id)
+        self.assertEqual(second.duplicate_of_id, first.id)
+        self.assertIsNone(third.duplicate_of_id)
+        self.assertEqual(second.moderation_status, 'PENDING')
+        self.assertTrue(second.derivatives)
+
+        response = self.client.get(f'{self.url}{second.id}/')
+        self.assertEqual(response.data['duplicateOf'], str(first.id))
+
+    @override_settings(PHOTO_DUPLICATE_ACTION='reject')
+    def test_reupload_is_rejected_without_derivatives(self):
+        first = self.upload(make_pattern(1))
+        second = self.upload(make_pattern(1))
+
+        self.assertEqual(second.duplicate_of_id, first.id)
+        self.assertEqual(second.moderation_status, 'REJECTED')
+        self.assertEqual(second.derivatives, {})
+        self.assertFalse(place_photo_storage.exists(get_derivative_name(second, 'thumb', 'jpeg')))
+
+    def test_bk_tree_matches_brute_force(self):
+        rng = random.Random(7)
+        keys = [rng.getrandbits(64) for _ in range(300)]
+        # Near copies of a few keys
+        keys += [key ^ (1 << rng.randrange(64)) for key in keys[:20]]
+        tree = BKTree()
+        for key in keys:
+            tree.add(key, key)
+
+        for query in keys[:25]:
+            expected = sorted(key for key in keys if hamming(query, key) <= 6)
+            self.assertEqual(sorted(item for _, item in tree.search(query, 6)), expected)
+
+    def test_batch_dedupe_keeps_oldest_copy(self):
+        base = random.Random(3).getrandbits(64)
+        photos = []
+        for bits in [base, base ^ 0b1, base ^ 0b11, ~base & (2 ** 64 - 1)]:
+            photos.append(PlacePhoto.objects.create(
+                place=self.place, user=self.user, url='https://example.com/a.jpg',
+                phash=to_signed(bits), dhash=to_signed(bits)
+            ))
+        PlacePhoto.objects.filter(pk=photos[0].pk).update(moderation_status='APPROVED')
+
+        self.assertEqual(dedupe_photos(dry_run=True)['flagged'], 2)
+        self.assertFalse(PlacePhoto.objects.filter(duplicate_of__isnull=False).exists())
+
+        summary = dedupe_photos(reject=True)
+
+        self.assertEqual(summary, {'places': 1, 'flagged': 2, 'rejected': 2})
+        for photo in photos:
+            photo.refresh_from_db()
+        self.assertEqual([p.duplicate_of_id for p in photos], [None, photos[0].id, photos[0].id, None])
+        self.assertEqual(photos[1].moderation_status, 'REJECTED')
+        self.assertEqual(photos[3].moderation_status, 'PENDING')
@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.models import Feature, Place
+from core.utils.place_import import import_places, iter_rows
+
+User = get_user_model()
+
+CSV_ROWS = """name,address,placeType,district,latitude,longitude,priceLevel,features
+Sun Cafe,1 Main Rd,cafe,daan,25.03,121.55,200,Wi-Fi|Outdoor Seating
+Sun Cafe,2 Main Rd,cafe,,,,400,
+Broken,3 Main Rd,spaceship,,,,,
+Moon Bar,4 Main Rd,bar,xinyi,25.04,121.56,,wi-fi
+"""
+
+
+class PlaceImportTest(TestCase):
+    """Test the streaming place import."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="importer",
+            email="importer@example.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.wifi = Feature.objects.create(name="Wi-Fi", feature_type="amenity")
+        Place.objects.create(name="Sun Cafe", address="Old Rd", place_type="cafe", created_by=self.admin)
+
+    def _import(self, text=CSV_ROWS, file_format='csv', **kwargs):
+        with patch('core.utils.geocoding.geocode_address', return_value=None):
+            with self.captureOnCommitCallbacks(execute=True):
+                return import_places(iter_rows(StringIO(text), file_format), user=self.admin, **kwargs)
+
+    def test_imports_valid_rows_and_reports_errors(self):
+        summary = self._import(batch_size=2)
+
+        self.assertEqual(summary['processed'], 4)
+        self.assertEqual(summary['created'], 3)
+        self.assertEqual(summary['geocoding'], 1)
+        self.assertEqual([error['row'] for error in summary['errors']], [3])
+        self.assertIn('placeType', summary['errors'][0]['errors'])
+
+        slugs = set(Place.objects.filter(name="Sun Cafe").values_list('slug', flat=True))
+        self.assertEqual(slugs, {'sun-cafe', 'sun-cafe-1', 'sun-cafe-2'})
+        moon = Place.objects.get(name="Moon Bar")
+        self.assertEqual(moon.moderation_status, 'APPROVED')
+        self.assertFalse(moon.draft)
+        self.assertEqual(moon.created_by, self.admin)
+
+    def test_matches_and_creates_features(self):
+        self._import()
+
+        seating = Feature.objects.get(name="Outdoor Seating")
+        self.assertEqual(seating.feature_type, 'other')
+        sun = Place.objects.get(name="Sun Cafe", district='daan')
+        self.assertEqual(set(sun.features.values_list('name', flat=True)), {"Wi-Fi", "Outdoor Seating"})
+        self.assertEqual(sorted(sun.feature_bits), sorted([self.wifi.bit, seating.bit]))
+        self.assertEqual(list(Place.objects.get(name="Moon Bar").features.values_list('name', flat=True)), ["Wi-Fi"])
+
+    def test_queues_geocoding_for_rows_without_coordinates(self):
+        with patch('core.utils.geocoding.geocode_address', return_value=(25.05, 121.52)) as geocode:
+            with patch('core.utils.geocoding.determine_district', return_value='zhongshan'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    import_places(iter_rows(StringIO(CSV_ROWS), 'csv'), user=self.admin)
+
+        geocode.assert_called_once_with('2 Main Rd')
+        place = Place.objects.get(address='2 Main Rd')
+        self.assertEqual((place.latitude, place.district), (25.05, 'zhongshan'))
+
+    def test_resumes_from_start(self):
+        summary = self._import(start=3)
+
+        self.assertEqual(summary['processed'], 4)
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(list(Place.objects.filter(address__endswith='Main Rd').values_list('name', flat=True)), ["Moon Bar"])
+
+    def test_jsonl_rows(self):
+        text = '{"name": "Tea House", "address": "5 Main Rd", "placeType": "cafe"}\n\nnot json\n'
+        summary = self._import(text, 'jsonl', approve=False)
+
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual([error['row'] for error in summary['errors']], [2])
+        self.assertEqual(Place.objects.get(name="Tea House").moderation_status, 'PENDING')
+
+    def test_command_checkpoints_and_resumes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'places.csv')
+            with open(path, 'w', encoding='utf-8') as handle:
+                handle.write(CSV_ROWS)
+            checkpoint = f'{path}.checkpoint'
+            with open(checkpoint, 'w', encoding='utf-8') as handle:
+                json.dump({'processed': 3, 'created': 2}, handle)
+
+            out, err = StringIO(), StringIO()
+            with patch('core.utils.geocoding.geocode_address', return_value=None):
+                call_command('import_places', path, user='importer', stdout=out, stderr=err)
+
+            self.assertIn('Resuming after row 3', out.getvalue())
+            self.assertIn('Imported 1 places', out.getvalue())
+            self.assertFalse(os.path.exists(checkpoint))
+        self.assertTrue(Place.objects.filter(name="Moon Bar").exists())
+
+
+class AdminPlaceImportViewTest(APITestCase):
+    """Test the admin place import endpoint."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="importadmin",
+            email="importadmin@example.com",
+            password="testpassword",
+            is_staff=True
+        )
+        self.url = reverse('admin-place-import')
+
+    def _upload(self, content, name='places.csv', **data):
+        return self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile(name, content.encode()), **data},
+            format='multipart'
+        )
+
+    def test_requires_admin(self):
+        user = User.objects.create_user(username="plain", email="plain@example.com", password="testpassword")
+        self.client.force_authenticate(user=user)
+        self.assertEqual(self._upload(CSV_ROWS).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_imports_upload(self):
+        self.client.force_authenticate(user=self.admin)
+        with patch('core.utils.geocoding.geocode_address', return_value=None):
+            response = self._upload(CSV_ROWS, pending='true')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['processed'], 4)
+        self.assertFalse(Place.objects.filter(moderation_status='APPROVED').exists())
+
+    def test_rejects_unknown_format(self):
+        self.client.force_authenticate(user=self.admin)
+        response = self._upload('name\n', name='places.xlsx')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
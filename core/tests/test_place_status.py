@@ -157,8 +157,9 @@ class PlaceStatusWorkflowTests(APITestCase):
         self.assertFalse(new_place.draft)
         self.assertEqual(new_place.moderation_status, 'PENDING')
         
-        # Step 3: Moderator approves the place
-        new_place.update_moderation_status('APPROVED', moderator=self.moderator)
+        # Step 3: Moderator approves the place (the notification follows on commit)
+        with self.captureOnCommitCallbacks(execute=True):
+            new_place.update_moderation_status('APPROVED', moderator=self.moderator)
         
         # Verify place is now approved
         new_place.refresh_from_db()
@@ -196,11 +197,12 @@ class PlaceStatusWorkflowTests(APITestCase):
         
         # Have moderator reject the place directly
         rejection_comment = 'Information is incomplete or inaccurate'
-        place_to_reject.update_moderation_status(
-            'REJECTED', 
-            moderator=self.moderator,
-            comment=rejection_comment
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            place_to_reject.update_moderation_status(
+                'REJECTED', 
+                moderator=self.moderator,
+                comment=rejection_comment
+            )
         
         # Verify the place was properly rejected
         place_to_reject.refresh_from_db()
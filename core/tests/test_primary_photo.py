@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Place, PlacePhoto
+from core.serializers import PlaceSerializer
+
+User = get_user_model()
+
+
+class PrimaryPhotoTest(TestCase):
+    """Tests for the denormalized Place.primary_photo."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner', email='owner@example.com', password='testpassword'
+        )
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='testpassword'
+        )
+        self.place = Place.objects.create(
+            name='Card Place', address='1 Card Road', place_type='cafe', created_by=self.user,
+            moderation_status='APPROVED', draft=False
+        )
+
+    def add_photo(self, **kwargs):
+        defaults = {'place': self.place, 'user': self.user, 'url': 'https://example.com/photo.jpg'}
+        return PlacePhoto.objects.create(**{**defaults, **kwargs})
+
+    def refresh(self):
+        self.place.refresh_from_db()
+        return self.place.primary_photo_id
+
+    def test_follows_approval_and_rejection(self):
+        photo = self.add_photo(is_primary=True)
+        self.assertIsNone(self.refresh())
+
+        photo.approve(self.admin)
+        self.assertEqual(self.refresh(), photo.id)
+        self.assertEqual(self.place.primary_photo_thumbnail_url, 'https://example.com/photo.jpg')
+        self.assertTrue(self.place.has_primary_photo)
+
+        photo.reject(self.admin)
+        self.assertIsNone(self.refresh())
+
+    def test_follows_primary_flag_and_deletion(self):
+        first = self.add_photo(is_primary=True, moderation_status='APPROVED')
+        second = self.add_photo(moderation_status='APPROVED', url='https://example.com/second.jpg')
+        self.assertEqual(self.refresh(), first.id)
+
+        second.is_primary = True
+        second.save()
+        self.assertEqual(self.refresh(), second.id)
+
+        second.delete()
+        self.assertEqual(self.refresh(), first.id)
+
+        first.is_primary = False
+        first.save()
+        self.assertIsNone(self.refresh())
+
+    def test_thumbnail_url_follows_derivatives(self):
+        photo = self.add_photo(is_primary=True, moderation_status='APPROVED')
+        photo.derivatives = {'thumb': {'width': 200, 'height': 150, 'jpeg': '/media/thumb.jpg'}}
+        photo.save(update_fields=['derivatives'])
+
+        self.refresh()
+        self.assertEqual(self.place.primary_photo_thumbnail_url, '/media/thumb.jpg')
+
+    def test_stale_place_save_keeps_primary_photo(self):
+        stale = Place.objects.get(pk=self.place.pk)
+        photo = self.add_photo(is_primary=True, moderation_status='APPROVED')
+
+        stale.description = 'Updated'
+        stale.save()
+
+        self.assertEqual(self.refresh(), photo.id)
+        self.assertEqual(self.place.description, 'Updated')
+
+    def test_list_serializes_primary_photo_without_queries(self):
+        photo = self.add_photo(is_primary=True, moderation_status='APPROVED')
+        places = list(Place.objects.all())
+        serializer = PlaceSerializer()
+
+        with self.assertNumQueries(0):
+            data = [serializer.get_primaryPhoto(place) for place in places]
+
+        self.assertEqual(data, [{'id': str(photo.id), 'thumbnailUrl': 'https://example.com/photo.jpg'}])
+
+        response = APIClient().get('/api/places/')
+        results = response.data['results'] if 'results' in response.data else response.data
+        self.assertEqual(results[0]['primaryPhoto']['id'], str(photo.id))
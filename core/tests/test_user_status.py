@@ -1,10 +1,16 @@
-from django.test import TestCase
-from django.urls import reverse
+from unittest.mock import PropertyMock, patch
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.test import RequestFactory, TestCase
+from django.urls import resolve, reverse
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from django.utils import timezone
 
+from core.middleware import UserStatusMiddleware
+
 User = get_user_model()
 
 class UserStatusManagementTest(TestCase):
@@ -212,4 +218,49 @@ class UserStatusManagementTest(TestCase):
             self.active_user.last_login.timestamp(),
             timezone.now().timestamp(),
             delta=60  # Allow 60 seconds difference
-        ) 
\ No newline at end of file
+        ) 
+
+
+class UserStatusMiddlewareTest(TestCase):
+    """Test route classification and lazy user evaluation in UserStatusMiddleware."""
+
+    def setUp(self):
+        self.middleware = UserStatusMiddleware(lambda request: None)
+        self.factory = RequestFactory()
+        self.inactive_user = User.objects.create_user(
+            username='inactive', email='inactive@example.com', password='userpass123', is_active=False
+        )
+
+    def _process(self, request, path):
+        return self.middleware.process_view(request, resolve(path).func, (), {})
+
+    def test_public_routes_match_combined_pattern(self):
+        for path in ['/api/token/', '/api/token/refresh', '/api/register/', '/admin/login/']:
+            self.assertTrue(self.middleware.PUBLIC_ROUTES_RE.match(path), path)
+        self.assertIsNone(self.middleware.PUBLIC_ROUTES_RE.match('/api/notifications/'))
+
+    def test_public_views_do_not_evaluate_user(self):
+        # Not in PUBLIC_ROUTES, but its view only uses AllowAny
+        path = reverse('google-oauth-callback')
+        self.assertIsNone(self.middleware.PUBLIC_ROUTES_RE.match(path))
+        request = self.factory.get(path)
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session'
+        with patch.object(HttpRequest, 'user', new_callable=PropertyMock, create=True) as user:
+            self.assertIsNone(self._process(request, path))
+        user.assert_not_called()
+
+    def test_requests_without_session_do_not_evaluate_user(self):
+        path = reverse('notification-list')
+        request = self.factory.get(path, HTTP_AUTHORIZATION='Bearer token')
+        with patch.object(HttpRequest, 'user', new_callable=PropertyMock, create=True) as user:
+            self.assertIsNone(self._process(request, path))
+        user.assert_not_called()
+
+    def test_inactive_session_user_is_refused_on_protected_views(self):
+        path = reverse('notification-list')
+        request = self.factory.get(path)
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session'
+        request.user = self.inactive_user
+
+        response = self._process(request, path)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
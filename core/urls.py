@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedSimpleRouter
-from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView
+from rest_framework_simplejwt.views import TokenVerifyView
 from .views import (
     UserRegistrationView,
     CustomTokenObtainPairView,
@@ -24,8 +24,11 @@ from .views import (
     ConvertSessionView
 )
 from .views.user_status import AdminUserStatusView, self_deactivate_view
-from .views.search import FullTextSearchView, CombinedSearchView
-from core.views.auth import CustomTokenVerifyView
+from .views.place_import import AdminPlaceImportView
+from .views.search import FullTextSearchView, CombinedSearchView, PlaceFacetsView
+from .views.notification_stream import notification_stream
+from .views.photo_uploads import photo_upload_target
+from core.views.auth import CustomTokenRefreshView, CustomTokenVerifyView
 
 
 # Create a router for top-level endpoints
@@ -54,7 +57,7 @@ urlpatterns = [
     path('register/', UserRegistrationView.as_view(), name='register'),
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('logout/', LogoutView.as_view(), name='logout'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('google/auth/', GoogleOAuthCallbackView.as_view(), name='google_auth'),
     
@@ -62,12 +65,22 @@ urlpatterns = [
     path('admin/users/<int:user_id>/status/', AdminUserStatusView.as_view(), name='admin-user-status'),
     path('users/self/deactivate/', self_deactivate_view, name='self-deactivate'),
     
+    # Place bulk import (see core/utils/place_import.py)
+    path('admin/places/import/', AdminPlaceImportView.as_view(), name='admin-place-import'),
+    
     # Search endpoints
     path('search/', FullTextSearchView.as_view(), name='full-text-search'),
     path('search/combined/', CombinedSearchView.as_view(), name='combined-search'),
+    path('search/facets/', PlaceFacetsView.as_view(), name='search-facets'),
     
     path('auth/convert-session/', ConvertSessionView.as_view(), name='convert-session'),
 
+    # Real-time notification stream (must precede the router's notifications/<pk>/ route)
+    path('notifications/stream/', notification_stream, name='notification-stream'),
+
+    # Upload target of the filesystem stand-in for object storage (see core/utils/upload_tickets.py)
+    path('uploads/photos/<str:ticket>/', photo_upload_target, name='photo-upload-target'),
+
 
     path('', include(router.urls)),
     path('', include(places_router.urls)),
@@ -0,0 +1,36 @@
+"""
+Dispatching work to background workers.
+
+Tasks are queued once the current transaction commits, so workers never see
+rows that were rolled back or not yet committed. With BACKGROUND_TASKS_ASYNC
+disabled (the default unless CELERY_BROKER_URL is set) the task runs inline
+in the web process right after the commit instead. A failing task never fails
+the request that queued it, which has already committed: the error is logged,
+and tasks record their own failure state (e.g. PlacePhoto.processing_error).
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+def run_in_background(task, *args, **kwargs):
+    """
+    Queue a Celery task after the current transaction commits.
+
+    Args:
+        task: A Celery task (a function decorated with @shared_task)
+    """
+    def dispatch():
+        try:
+            if getattr(settings, 'BACKGROUND_TASKS_ASYNC', False):
+                task.delay(*args, **kwargs)
+            else:
+                task(*args, **kwargs)
+        except Exception as e:
+            # The request that triggered the task has already committed
+            logger.exception(f"Background task {task.__name__} failed: {str(e)}")
+
+    transaction.on_commit(dispatch)
@@ -0,0 +1,303 @@
+"""
+Latency and query-count benchmarks for the core endpoints.
+
+Each scenario issues one request (or runs one task) against the current
+database, typically one generated with ``python manage.py seed_dataset``.
+Every iteration runs in a transaction that is rolled back, so scenarios that
+write (e.g. the badge task) measure the same work on every iteration.
+
+The connection scenarios instead repeat a read-only request outside any
+transaction, either on a fresh connection each time (CONN_MAX_AGE = 0) or on
+a persistent one that is health checked first (DB_CONN_MAX_AGE), to show what
+connection reuse saves per request.
+
+Results are plain dicts so they can be written as JSON and compared across
+commits with ``python manage.py run_benchmarks --output before.json``.
+"""
+import logging
+import math
+import platform
+import statistics
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..middleware import UserStatusMiddleware
+from ..models import HelpfulVote, Notification, Place, PlacePhoto, Review
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class BenchmarkContext(NamedTuple):
+    """Sample objects the scenarios request."""
+    anonymous: APIClient
+    authenticated: APIClient
+    user: object
+    place: Place
+    search_term: str
+    middleware: UserStatusMiddleware
+    middleware_requests: list
+
+
+class _Rollback(Exception):
+    """Raised to roll back the transaction wrapping one iteration."""
+
+
+def _get(client_attr, url_builder):
+    def run(context):
+        response = getattr(context, client_attr).get(url_builder(context))
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}")
+    return run
+
+
+# Requests passed through UserStatusMiddleware per status_middleware iteration
+MIDDLEWARE_BATCH = 100
+
+
+def _build_middleware_requests(place) -> list:
+    """(request, view function) pairs: public, anonymous protected and session requests."""
+    factory = RequestFactory()
+    samples = [
+        ('get', reverse('place-list'), {}),
+        ('post', reverse('token_obtain_pair'), {}),
+        ('get', reverse('place-reviews-list', kwargs={'place_pk': place.pk}), {}),
+        ('get', reverse('notification-list'), {'HTTP_AUTHORIZATION': 'Bearer token'}),
+        ('post', reverse('self-deactivate'), {}),
+    ]
+    requests = []
+    for method, path, headers in samples:
+        request = getattr(factory, method)(path, **headers)
+        requests.append((request, resolve(path).func))
+    return requests
+
+
+def _run_status_middleware(context):
+    requests = context.middleware_requests
+    for i in range(MIDDLEWARE_BATCH):
+        request, view_func = requests[i % len(requests)]
+        context.middleware.process_view(request, view_func, (), {})
+
+
+def _run_badge_task(context):
+    from ..tasks import check_badge_eligibility
+    check_badge_eligibility()
+
+
+SCENARIOS: Dict[str, Callable] = {
+    'place_list': _get('anonymous', lambda c: reverse('place-list')),
+    'place_search': _get(
+        'anonymous', lambda c: f"{reverse('combined-search')}?q={c.search_term}"
+    ),
+    'near_me': _get(
+        'authenticated',
+        lambda c: f"{reverse('place-near-me')}?lat={c.place.latitude}&lng={c.place.longitude}"
+    ),
+    'place_reviews': _get(
+        'authenticated', lambda c: reverse('place-reviews-list', kwargs={'place_pk': c.place.pk})
+    ),
+    'profile': _get('authenticated', lambda c: reverse('user-profile-list')),
+    'badge_task': _run_badge_task,
+    'status_middleware': _run_status_middleware,
+}
+
+
+def _new_connection(context):
+    # The request connects (and authenticates) again, as with CONN_MAX_AGE = 0
+    connection.close()
+
+
+def _persistent_connection(context):
+    # The request reuses the connection after a health check, as at the start
+    # of every request with CONN_HEALTH_CHECKS
+    connection.ensure_connection()
+    connection.health_check_done = False
+
+
+# Untimed preparation before each timed anonymous place list request
+CONNECTION_SCENARIOS: Dict[str, Callable] = {
+    'request_new_connection': _new_connection,
+    'request_persistent_connection': _persistent_connection,
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def build_context() -> Optional[BenchmarkContext]:
+    """
+    Pick the sample user and place: the visible place of the most helpful
+    review (a popular place), falling back to the best rated visible place,
+    and its owner (or the first active user).
+    """
+    place = (
+        Place.objects
+        .filter(moderation_status='APPROVED', draft=False, latitude__isnull=False)
+        .order_by('-avg_rating', '-created_at')
+        .first()
+    )
+    top_review = (
+        Review.objects.filter(moderation_status='APPROVED', place__draft=False)
+        .order_by('-helpful_count')
+        .select_related('place')
+        .first()
+    )
+    if top_review and top_review.place.latitude is not None:
+        place = top_review.place
+    if place is None:
+        return None
+
+    user = place.created_by or User.objects.filter(is_active=True).first()
+    if user is None:
+        return None
+
+    authenticated = APIClient()
+    authenticated.force_authenticate(user=user)
+    search_term = place.name.split()[0]
+    return BenchmarkContext(
+        APIClient(), authenticated, user, place, search_term,
+        UserStatusMiddleware(lambda request: None), _build_middleware_requests(place)
+    )
+
+
+def run_scenario(run: Callable, context: BenchmarkContext, iterations=20, warmup=2) -> Dict:
+    """
+    Time a scenario.
+
+    Returns:
+        Latency percentiles in milliseconds and the number of queries per
+        iteration, or an "error" entry if the scenario fails
+    """
+    timings = []
+    query_counts = []
+    for i in range(warmup + iterations):
+        try:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    run(context)
+                    elapsed = (time.perf_counter() - start) * 1000
+                raise _Rollback()
+        except _Rollback:
+            pass
+        except Exception as e:
+            logger.warning(f"Benchmark scenario failed: {str(e)}")
+            return {'error': f"{type(e).__name__}: {str(e)}"}
+
+        if i >= warmup:
+            timings.append(elapsed)
+            query_counts.append(len(queries))
+
+    return _summarize(timings, query_counts)
+
+
+def run_connection_scenario(prepare: Callable, context: BenchmarkContext, iterations=20, warmup=2) -> Dict:
+    """
+    Time the anonymous place list request after prepare() set up the
+    connection. Runs outside any transaction, so it needs a read-only request.
+    """
+    if connection.in_atomic_block:
+        return {'error': 'Connection scenarios cannot run inside a transaction'}
+
+    request = SCENARIOS['place_list']
+    timings = []
+    query_counts = []
+    for i in range(warmup + iterations):
+        try:
+            prepare(context)
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                request(context)
+            elapsed = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            logger.warning(f"Benchmark scenario failed: {str(e)}")
+            return {'error': f"{type(e).__name__}: {str(e)}"}
+
+        if i >= warmup:
+            timings.append(elapsed)
+            query_counts.append(len(queries))
+
+    return _summarize(timings, query_counts)
+
+
+def _summarize(timings: List[float], query_counts: List[int]) -> Dict:
+    return {
+        'iterations': len(timings),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': max(query_counts),
+    }
+
+
+def dataset_summary() -> Dict[str, int]:
+    """Row counts of the benchmarked tables, stored with the results."""
+    return {
+        'users': User.objects.count(),
+        'places': Place.objects.count(),
+        'reviews': Review.objects.count(),
+        'photos': PlacePhoto.objects.count(),
+        'helpful_votes': HelpfulVote.objects.count(),
+        'notifications': Notification.objects.count(),
+    }
+
+
+def run_benchmarks(scenarios=None, iterations=20, warmup=2, label='') -> Dict:
+    """
+    Run the benchmark scenarios.
+
+    Args:
+        scenarios: Names from SCENARIOS or CONNECTION_SCENARIOS (defaults to all)
+        iterations: Measured iterations per scenario
+        warmup: Unmeasured iterations run first (warm caches and connections)
+        label: Free-form label stored with the results, e.g. a commit hash
+
+    Returns:
+        {"meta": {...}, "results": {<scenario>: {...}}}
+    """
+    context = build_context()
+    if context is None:
+        raise ValueError('No visible places with coordinates; seed the database first.')
+
+    results = {}
+    # The test client sends requests as "testserver"
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for name in scenarios or [*SCENARIOS, *CONNECTION_SCENARIOS]:
+            if name in CONNECTION_SCENARIOS:
+                results[name] = run_connection_scenario(
+                    CONNECTION_SCENARIOS[name], context, iterations=iterations, warmup=warmup
+                )
+            else:
+                results[name] = run_scenario(SCENARIOS[name], context, iterations=iterations, warmup=warmup)
+
+    return {
+        'meta': {
+            'label': label,
+            'timestamp': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'iterations': iterations,
+            'warmup': warmup,
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'dataset': dataset_summary(),
+        },
+        'results': results,
+    }
@@ -0,0 +1,29 @@
+"""
+Database helpers that behave the same with and without server-side cursors.
+
+QuerySet.iterator() streams rows through a server-side cursor, which only
+lives as long as its transaction. Behind PgBouncer in transaction pooling
+mode server-side cursors are disabled (DB_PGBOUNCER), and iterator() then
+fetches the whole result at once. Long loops that write as they go use
+iterate_in_chunks() instead: keyset pagination on the primary key, one
+short query per chunk, with bounded memory in every mode.
+"""
+from typing import Iterator
+
+
+def iterate_in_chunks(queryset, chunk_size=1000) -> Iterator:
+    """
+    Yield the objects of a queryset in primary key order, chunk_size at a
+    time. Rows changed while iterating are seen as of their chunk's query.
+    """
+    last_pk = None
+    queryset = queryset.order_by('pk')
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1].pk
@@ -0,0 +1,88 @@
+"""
+Feature predicates on Place.feature_bits.
+
+Every feature has a small integer (Feature.bit) and every place stores the
+bits of its features in a GIN-indexed integer array. "Has all of" is
+feature_bits @> ARRAY[...], "has any of" is feature_bits && ARRAY[...] and
+"has none of" is its negation, so filtering by features needs neither a join
+through PlaceFeature nor DISTINCT.
+
+The bits are kept up to date by the signals in core/signals.py; after bulk
+inserts that bypass signals, run rebuild_feature_bits() (or the
+rebuild_feature_bits management command).
+"""
+import logging
+from typing import Dict, Iterable, List
+
+from ..models import Feature, Place
+
+logger = logging.getLogger(__name__)
+
+
+def parse_feature_ids(value) -> List[str]:
+    """Comma-separated feature ids from a query parameter."""
+    return [feature_id.strip() for feature_id in (value or '').split(',') if feature_id.strip()]
+
+
+def get_feature_bits(feature_ids: Iterable) -> Dict[str, int]:
+    """{feature id: bit} for the features that exist."""
+    feature_ids = [str(feature_id) for feature_id in feature_ids]
+    if not feature_ids:
+        return {}
+    return dict(
+        Feature.objects.filter(pk__in=feature_ids, bit__isnull=False).values_list('pk', 'bit')
+    )
+
+
+def filter_by_features(queryset, any_of=(), all_of=(), none_of=()):
+    """
+    Restrict a Place queryset by feature ids.
+
+    Args:
+        any_of: Places with at least one of these features
+        all_of: Places with every one of these features
+        none_of: Places with none of these features
+    """
+    any_of, all_of, none_of = list(any_of), list(all_of), list(none_of)
+    if not (any_of or all_of or none_of):
+        return queryset
+    bits = get_feature_bits(any_of + all_of + none_of)
+
+    if all_of:
+        if any(str(feature_id) not in bits for feature_id in all_of):
+            # No place has a feature that does not exist
+            return queryset.none()
+        queryset = queryset.filter(feature_bits__contains=[bits[str(f)] for f in all_of])
+    if any_of:
+        any_bits = [bits[str(f)] for f in any_of if str(f) in bits]
+        if not any_bits:
+            return queryset.none()
+        queryset = queryset.filter(feature_bits__overlap=any_bits)
+    if none_of:
+        none_bits = [bits[str(f)] for f in none_of if str(f) in bits]
+        if none_bits:
+            queryset = queryset.exclude(feature_bits__overlap=none_bits)
+    return queryset
+
+
+def rebuild_feature_bits(batch_size=1000) -> int:
+    """
+    Recompute feature_bits of every place, in primary-key batches.
+
+    Returns:
+        Number of places processed
+    """
+    processed = 0
+    last_pk = None
+    while True:
+        queryset = Place.objects.order_by('pk')
+        if last_pk is not None:
+            queryset = queryset.filter(pk__gt=last_pk)
+        place_ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not place_ids:
+            break
+        Place.refresh_feature_bits(place_ids)
+        processed += len(place_ids)
+        last_pk = place_ids[-1]
+    logger.info(f"Rebuilt feature bits of {processed} places")
+    return processed
@@ -0,0 +1,100 @@
+"""
+Cached feature catalog.
+
+The feature list behind the filter panels changes rarely but is fetched
+every time a panel opens. get_feature_catalog() builds it once, with each
+feature's places_count, in a single annotated query and caches it under the
+current catalog version. Creating, updating or deleting a feature bumps the
+version (see core/signals.py), so the next request rebuilds the catalog;
+places_count alone may lag by up to FEATURE_CATALOG_CACHE_TIMEOUT seconds.
+
+Each catalog carries a digest of its content, used as a strong ETag so
+clients can revalidate with If-None-Match and get 304 Not Modified.
+"""
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from ..choices import FEATURE_TYPES
+from ..models import Feature
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'feature_catalog'
+VERSION_KEY = f'{CACHE_PREFIX}:version'
+
+
+def _get_cache_timeout():
+    return getattr(settings, 'FEATURE_CATALOG_CACHE_TIMEOUT', 600)
+
+
+def with_places_count(queryset):
+    """Annotate features with places_count, the number of approved places that have them."""
+    return queryset.annotate(
+        places_count=Count(
+            'place_features',
+            filter=Q(place_features__place__moderation_status='APPROVED')
+        )
+    )
+
+
+def get_catalog_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so an evicted version never reuses an old number
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_feature_catalog():
+    """Move to a new catalog version; the old cached catalog is never read again."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def build_feature_catalog() -> Dict:
+    """The catalog document (uncached): features with places_count, and a digest."""
+    from ..serializers import FeatureSerializer
+
+    features = with_places_count(Feature.objects.all()).order_by('feature_type', 'name')
+    data = json.loads(json.dumps(FeatureSerializer(features, many=True).data))
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    return {'features': data, 'etag': f'"{digest[:32]}"'}
+
+
+def get_feature_catalog() -> Dict:
+    """The catalog for the current version, built on a cache miss."""
+    key = f'{CACHE_PREFIX}:{get_catalog_version()}'
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_feature_catalog()
+        cache.set(key, catalog, _get_cache_timeout())
+        logger.info(f"Built feature catalog with {len(catalog['features'])} features")
+    return catalog
+
+
+def group_by_category(features: List[Dict]) -> Dict:
+    """{type code: {'name': ..., 'features': [...]}} for every FEATURE_TYPES entry."""
+    result = {type_code: {'name': type_name, 'features': []} for type_code, type_name in FEATURE_TYPES}
+    for feature in features:
+        if feature['featureType'] in result:
+            result[feature['featureType']]['features'].append(feature)
+    return result
+
+
+def count_by_category(features: List[Dict]) -> List[Dict]:
+    """[{'type', 'name', 'count'}] for every FEATURE_TYPES entry."""
+    grouped = group_by_category(features)
+    return [
+        {'type': type_code, 'name': group['name'], 'count': len(group['features'])}
+        for type_code, group in grouped.items()
+    ]
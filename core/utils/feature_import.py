@@ -0,0 +1,160 @@
+"""
+Bulk feature import and place-feature association.
+
+Seeding a city means thousands of features and tens of thousands of
+place-feature links. Both imports validate every row in memory, look up what
+already exists with one query, and insert the rest with
+bulk_create(ignore_conflicts=True) in batches. Invalid rows are reported with
+their index instead of failing the whole import.
+
+bulk_create bypasses save() and signals, so the imports do what those would:
+assign Feature.bit, refresh Place.feature_bits of the linked places and
+invalidate the cached feature catalog.
+"""
+import logging
+from typing import Dict, Iterable, List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from ..models import Feature, Place, PlaceFeature
+from .feature_catalog import invalidate_feature_catalog
+
+logger = logging.getLogger(__name__)
+
+
+def _feature_key(name, feature_type):
+    """Features are the same if their names match case-insensitively within a type."""
+    return (name.strip().lower(), feature_type)
+
+
+def _batches(items: List, batch_size: int):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def _invalidate_catalog():
+    invalidate_feature_catalog()
+    transaction.on_commit(invalidate_feature_catalog)
+
+
+def import_features(rows: Iterable[Dict], batch_size=500) -> Dict:
+    """
+    Create features that do not exist yet.
+
+    Args:
+        rows: Feature data as accepted by FeatureSerializer
+              ({"name", "featureType", "icon"})
+        batch_size: Rows per INSERT
+
+    Returns:
+        {"created": <features created>, "skipped": <rows matching an existing
+        feature or an earlier row>, "errors": [{"index", "errors"}]}
+    """
+    from ..serializers import FeatureSerializer
+
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        serializer = FeatureSerializer(data=row)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+
+    seen = {
+        _feature_key(name, feature_type)
+        for name, feature_type in Feature.objects.values_list('name', 'feature_type')
+    }
+    features = []
+    for data in valid:
+        key = _feature_key(data['name'], data['feature_type'])
+        if key in seen:
+            continue
+        seen.add(key)
+        features.append(Feature(**data))
+
+    with transaction.atomic():
+        next_bit = Feature.next_bit()
+        for offset, feature in enumerate(features):
+            feature.bit = next_bit + offset
+        for batch in _batches(features, batch_size):
+            Feature.objects.bulk_create(batch, ignore_conflicts=True)
+        # ignore_conflicts hides rows that lost a race; count what is there
+        created = Feature.objects.filter(pk__in=[feature.pk for feature in features]).count()
+        if created:
+            _invalidate_catalog()
+
+    logger.info(f"Imported {created} features ({len(errors)} invalid rows)")
+    return {'created': created, 'skipped': len(valid) - created, 'errors': errors}
+
+
+def _place_pk(value):
+    try:
+        return str(Place._meta.pk.to_python(value))
+    except ValidationError:
+        return None
+
+
+def associate_features(rows: Iterable[Dict], batch_size=1000) -> Dict:
+    """
+    Link features to places; links that already exist are left alone.
+
+    Args:
+        rows: {"place_id": ..., "feature_ids": [...]} per place
+        batch_size: Links per INSERT
+
+    Returns:
+        {"linked": <new links>, "places": <places that got new links>,
+        "errors": [{"index", "errors"}]}
+    """
+    errors = []
+    requested = []
+    for index, row in enumerate(rows):
+        place_id = row.get('place_id') if isinstance(row, dict) else None
+        feature_ids = row.get('feature_ids') if isinstance(row, dict) else None
+        if not place_id:
+            errors.append({'index': index, 'errors': {'place_id': ['This field is required.']}})
+        elif not feature_ids or not isinstance(feature_ids, list):
+            errors.append({'index': index, 'errors': {'feature_ids': ['Must be a non-empty list.']}})
+        else:
+            requested.append((index, place_id, [str(feature_id) for feature_id in feature_ids]))
+
+    place_ids = {_place_pk(place_id) for _, place_id, _ in requested} - {None}
+    known_places = {str(pk) for pk in Place.objects.filter(pk__in=place_ids).values_list('pk', flat=True)}
+    known_features = set(
+        Feature.objects
+        .filter(pk__in={feature_id for _, _, ids in requested for feature_id in ids})
+        .values_list('pk', flat=True)
+    )
+    existing = {
+        (str(place_id), feature_id)
+        for place_id, feature_id in
+        PlaceFeature.objects.filter(place_id__in=known_places).values_list('place_id', 'feature_id')
+    }
+
+    links = {}
+    for index, place_id, feature_ids in requested:
+        pk = _place_pk(place_id)
+        if pk not in known_places:
+            errors.append({'index': index, 'errors': {'place_id': [f'Place with id {place_id} does not exist']}})
+            continue
+        unknown = [feature_id for feature_id in feature_ids if feature_id not in known_features]
+        if unknown:
+            errors.append({'index': index, 'errors': {'feature_ids': [f'Unknown features: {", ".join(unknown)}']}})
+        for feature_id in feature_ids:
+            if feature_id in known_features and (pk, feature_id) not in existing:
+                links[(pk, feature_id)] = PlaceFeature(place_id=pk, feature_id=feature_id)
+
+    links = list(links.values())
+    linked_places = sorted({link.place_id for link in links})
+    with transaction.atomic():
+        for batch in _batches(links, batch_size):
+            PlaceFeature.objects.bulk_create(batch, ignore_conflicts=True)
+        for batch in _batches(linked_places, batch_size):
+            Place.refresh_feature_bits(batch)
+        if links:
+            _invalidate_catalog()
+
+    logger.info(f"Linked {len(links)} place features ({len(errors)} invalid rows)")
+    return {'linked': len(links), 'places': len(linked_places), 'errors': sorted(errors, key=lambda e: e['index'])}
@@ -0,0 +1,185 @@
+"""
+Helpful vote counting without a per-review hotspot.
+
+Toggling a vote is a DELETE ... RETURNING and, if nothing was deleted, an
+INSERT ... ON CONFLICT DO NOTHING RETURNING; the unique (review, user)
+constraint makes double submissions harmless. The count change goes to one of
+HELPFUL_VOTE_COUNTER_SHARDS counter rows per review, picked at random and
+upserted with RETURNING, so concurrent voters on the same review rarely touch
+the same row and never lock the review itself.
+
+A review's current count is its helpful_count plus its pending shard deltas.
+rollup_helpful_counts() folds the shards into helpful_count; run it
+periodically (the rollup_helpful_counts task or management command).
+
+Points and the notification for the review author are awarded in the
+background after the vote commits (see award_helpful_vote in core/tasks.py).
+"""
+import logging
+import random
+from collections import defaultdict
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import HelpfulVote, Review, ReviewHelpfulCounter
+from .background import run_in_background
+
+logger = logging.getLogger(__name__)
+
+
+def _get_shard_count():
+    return getattr(settings, 'HELPFUL_VOTE_COUNTER_SHARDS', 8)
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _params(model, **values):
+    """Values converted for the database by their model fields, in order."""
+    return [
+        model._meta.get_field(name).get_db_prep_value(value, connection)
+        for name, value in values.items()
+    ]
+
+
+def add_vote(review_id, user_id) -> Optional[int]:
+    """Insert a vote; returns its id, or None if the user had already voted."""
+    now = timezone.now()
+    params = _params(HelpfulVote, review=review_id, user=user_id, is_helpful=True, created_at=now, updated_at=now)
+    sql = (
+        f"INSERT INTO {_table(HelpfulVote)} (review_id, user_id, is_helpful, created_at, updated_at) "
+        f"VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT (review_id, user_id) DO NOTHING RETURNING id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def remove_vote(review_id, user_id) -> bool:
+    """Delete a vote; returns whether there was one."""
+    sql = f"DELETE FROM {_table(HelpfulVote)} WHERE review_id = %s AND user_id = %s RETURNING id"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, _params(HelpfulVote, review=review_id, user=user_id))
+        return cursor.fetchone() is not None
+
+
+def add_to_counter(review_id, delta: int) -> int:
+    """Add delta to a random counter shard of the review; returns the shard's new delta."""
+    sql = (
+        f"INSERT INTO {_table(ReviewHelpfulCounter)} (review_id, shard, delta) VALUES (%s, %s, %s) "
+        f"ON CONFLICT (review_id, shard) DO UPDATE SET delta = {_table(ReviewHelpfulCounter)}.delta + EXCLUDED.delta "
+        f"RETURNING delta"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, _params(
+            ReviewHelpfulCounter, review=review_id, shard=random.randrange(_get_shard_count()), delta=delta
+        ))
+        return cursor.fetchone()[0]
+
+
+def with_pending_helpful_counts(queryset):
+    """
+    Annotate reviews with pending_helpful_count, the sum of their counter
+    shards, so Review.current_helpful_count is exact without extra queries.
+    """
+    pending = (
+        ReviewHelpfulCounter.objects
+        .filter(review=OuterRef('pk'))
+        .values('review')
+        .annotate(total=Sum('delta'))
+        .values('total')
+    )
+    return queryset.annotate(
+        pending_helpful_count=Coalesce(Subquery(pending, output_field=IntegerField()), Value(0))
+    )
+
+
+def get_helpful_count(review_id) -> int:
+    """Rolled-up helpful_count plus the pending shard deltas."""
+    review = with_pending_helpful_counts(
+        Review.objects.filter(pk=review_id).only('id', 'helpful_count')
+    ).first()
+    return review.current_helpful_count if review else 0
+
+
+def get_received_helpful_count(user_id) -> int:
+    """Helpful votes on all of a user's reviews, including the pending shard deltas."""
+    rolled_up = Review.objects.filter(user_id=user_id).aggregate(total=Sum('helpful_count'))['total'] or 0
+    pending = ReviewHelpfulCounter.objects.filter(review__user_id=user_id).aggregate(total=Sum('delta'))['total'] or 0
+    return rolled_up + pending
+
+
+def toggle_helpful_vote(review_id, user_id) -> Tuple[bool, int]:
+    """
+    Add the user's vote, or remove it if there is one.
+
+    Returns:
+        (vote_added, helpful_count)
+    """
+    from ..tasks import award_helpful_vote
+
+    with transaction.atomic():
+        if remove_vote(review_id, user_id):
+            add_to_counter(review_id, -1)
+            vote_added = False
+        else:
+            vote_id = add_vote(review_id, user_id)
+            # None means a concurrent request added the same vote first
+            if vote_id is not None:
+                add_to_counter(review_id, 1)
+                run_in_background(award_helpful_vote, vote_id)
+            vote_added = True
+    return vote_added, get_helpful_count(review_id)
+
+
+def rollup_helpful_counts(batch_size=1000) -> int:
+    """
+    Fold pending counter shards into Review.helpful_count.
+
+    Each batch takes every shard row of up to batch_size reviews, locks them,
+    applies one UPDATE per distinct net delta and deletes the rows. Votes
+    arriving meanwhile wait for the batch or start new shard rows, so none are
+    lost.
+
+    Returns:
+        Number of reviews updated
+    """
+    updated = 0
+    last_review_id = None
+    while True:
+        with transaction.atomic():
+            pending = ReviewHelpfulCounter.objects.order_by('review_id')
+            if last_review_id is not None:
+                pending = pending.filter(review_id__gt=last_review_id)
+            review_ids = list(pending.values_list('review_id', flat=True).distinct()[:batch_size])
+            if not review_ids:
+                break
+            last_review_id = review_ids[-1]
+
+            shards = list(
+                ReviewHelpfulCounter.objects
+                .select_for_update()
+                .filter(review_id__in=review_ids)
+                .values_list('pk', 'review_id', 'delta')
+            )
+            totals = defaultdict(int)
+            for _, review_id, delta in shards:
+                totals[review_id] += delta
+            reviews_by_delta = defaultdict(list)
+            for review_id, delta in totals.items():
+                if delta:
+                    reviews_by_delta[delta].append(review_id)
+            for delta, ids in reviews_by_delta.items():
+                Review.objects.filter(pk__in=ids).update(helpful_count=F('helpful_count') + delta)
+            ReviewHelpfulCounter.objects.filter(pk__in=[pk for pk, _, _ in shards]).delete()
+            updated += len(totals)
+    logger.info(f"Rolled up helpful vote counts of {updated} reviews")
+    return updated
@@ -0,0 +1,203 @@
+"""
+Moderation side effects, for single objects and in bulk.
+
+Moderating an object notifies its owner and, on approval, awards points.
+Both go through the outbox (see outbox.py): the post_save signals record one
+moderation_changed event per saved object, and bulk_moderate, which changes
+the status of many objects with a single UPDATE, records the same events with
+one INSERT. The drain builds the notifications and points from the helpers
+below and writes them in batches: notifications with bulk_create, points with
+bulk_create plus one F() update per distinct point delta. bulk_moderate
+recomputes ratings and primary photos itself, once per affected place.
+"""
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Notification, Place, PlacePhoto, Review, UserPoints
+from .notification_broker import publish_notification
+from .moderation_queue import not_claimed_by_others
+from .notification_counters import notifications_created
+
+logger = logging.getLogger(__name__)
+
+# Points awarded to the owner when their content is approved
+MODERATION_POINTS = {'place': 20, 'review': 10, 'photo': 5}
+
+# Name used in notification types and point sources for each model
+CONTENT_KINDS = {Place: 'place', Review: 'review', PlacePhoto: 'photo'}
+
+REJECTION_GUIDANCE = {
+    'place': 'You can edit the place details and resubmit for approval.',
+    'review': 'You can edit your review and resubmit it for approval.',
+    'photo': 'You can upload a new photo or remove this one from your uploads.',
+}
+
+
+def get_content_kind(obj) -> str:
+    return CONTENT_KINDS[type(obj)]
+
+
+def get_content_owner_id(obj):
+    """Id of the user who submitted the content."""
+    return obj.created_by_id if isinstance(obj, Place) else obj.user_id
+
+
+def _describe(obj) -> str:
+    """'your place "X"' / 'your review for "X"' as used in the messages."""
+    kind = get_content_kind(obj)
+    if kind == 'place':
+        return f'Your place "{obj.name}"'
+    return f'Your {kind} for "{obj.place.name}"'
+
+
+def build_moderation_notification(obj) -> Optional[Notification]:
+    """
+    The (unsaved) notification telling the owner that their content was
+    approved or rejected, or None if there is nothing to send.
+    """
+    owner_id = get_content_owner_id(obj)
+    if owner_id is None or obj.moderation_status not in ('APPROVED', 'REJECTED'):
+        return None
+
+    kind = get_content_kind(obj)
+    if obj.moderation_status == 'APPROVED':
+        notification_type = f'{kind}_approved'
+        title = f'Your {kind.title()} Has Been Approved!'
+        message = f'{_describe(obj)} has been approved and is now visible to all users.'
+    else:
+        notification_type = f'{kind}_rejected'
+        title = f'Your {kind.title()} Needs Attention'
+
+        # Construct a more helpful message with the rejection reason and guidance
+        base_message = f'{_describe(obj)} requires changes before it can be approved.'
+        if obj.moderation_comment:
+            reason = f"Reason: {obj.moderation_comment}"
+        else:
+            reason = "Please check our content guidelines for more information."
+        message = f"{base_message}\n\n{reason}\n\n{REJECTION_GUIDANCE[kind]}"
+
+    return Notification(
+        user_id=owner_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.id
+    )
+
+
+def get_approval_points_description(obj) -> str:
+    kind = get_content_kind(obj)
+    if kind == 'place':
+        return f"Place {obj.name} approved"
+    return f"{kind.title()} for {obj.place.name} approved"
+
+
+def build_approval_points(obj) -> Optional[UserPoints]:
+    """The (unsaved) points record for approved content, or None."""
+    owner_id = get_content_owner_id(obj)
+    if owner_id is None or obj.moderation_status != 'APPROVED':
+        return None
+    kind = get_content_kind(obj)
+    return UserPoints.build_record(
+        user_id=owner_id,
+        points=MODERATION_POINTS[kind],
+        source_type=kind,
+        source_id=obj.id,
+        description=get_approval_points_description(obj)
+    )
+
+
+def create_notifications(notifications: List[Notification]) -> List[Notification]:
+    """
+    Insert notifications in batches and, once committed, push them and count
+    them as unread (what the Notification post_save signals do one by one).
+    """
+    if not notifications:
+        return []
+    created = Notification.objects.bulk_create(notifications, batch_size=500)
+
+    def publish():
+        notifications_created(created)
+        for notification in created:
+            publish_notification(notification)
+
+    transaction.on_commit(publish)
+    return created
+
+
+def bulk_moderate(model, ids: Iterable, status: str, moderator=None, comment='') -> Dict:
+    """
+    Set the moderation status of many objects of one model.
+
+    Objects that already have the status are left untouched and get no
+    notifications or points. The others get them once the transaction
+    commits and their outbox events are drained. Objects claimed by another
+    moderator whose lease has not expired are skipped too.
+
+    Args:
+        model: Place, Review or PlacePhoto
+        ids: Primary keys of the objects
+        status: 'PENDING', 'APPROVED' or 'REJECTED'
+        moderator: User recorded as the moderator, whose claims are respected
+        comment: Moderation comment (e.g. the rejection reason)
+
+    Returns:
+        {"updated": <objects changed>,
+         "unchanged": <ids not found, already in the status or claimed by another moderator>}
+    """
+    if status not in dict(model.MODERATION_STATUS_CHOICES):
+        raise ValueError(f"Invalid status: {status}")
+
+    ids = list(ids)
+    related = ['created_by'] if model is Place else ['place']
+    now = timezone.now()
+
+    with transaction.atomic():
+        queryset = model.objects.select_for_update(of=('self',)).filter(pk__in=ids).exclude(moderation_status=status)
+        if moderator is not None:
+            # Checked under the row locks, so a claim cannot be taken in between
+            queryset = queryset.filter(not_claimed_by_others(moderator, now))
+        objects = list(queryset.select_related(*related))
+        changed_ids = [obj.pk for obj in objects]
+        if not changed_ids:
+            return {'updated': 0, 'unchanged': len(ids)}
+
+        model.objects.filter(pk__in=changed_ids).update(
+            moderation_status=status,
+            moderated_at=now,
+            moderator=moderator,
+            moderation_comment=comment,
+            claimed_by=None,
+            claim_expires_at=None,
+            updated_at=now
+        )
+
+        previous_status = {obj.pk: obj.moderation_status for obj in objects}
+        for obj in objects:
+            obj.moderation_status = status
+            obj.moderation_comment = comment
+            obj.moderated_at = now
+            obj.moderator = moderator
+
+        # Notifications and points come from the same events as single-object moderation
+        from .outbox import record_moderation_changes
+        record_moderation_changes(objects)
+
+        if model is Review:
+            # Only approved reviews count towards the average
+            Place.bulk_update_average_ratings({
+                obj.place_id for obj in objects
+                if 'APPROVED' in (status, previous_status[obj.pk])
+            })
+        elif model is PlacePhoto:
+            for place_id in {obj.place_id for obj in objects if obj.is_primary}:
+                Place.refresh_primary_photo(place_id)
+
+    logger.info(f"Moderated {len(changed_ids)} {model._meta.verbose_name_plural} as {status}")
+    return {'updated': len(changed_ids), 'unchanged': len(ids) - len(changed_ids)}
@@ -0,0 +1,168 @@
+"""
+Per-user publish/subscribe channels for pushing notifications to clients.
+
+Notification creates are published to the owning user's channel and delivered
+to every open SSE or WebSocket connection of that user, so clients no longer
+need to poll the unread count endpoints.
+
+The in-memory broker keeps subscribers in process memory. It is used for tests
+and single-node deployments where the ASGI server handles both the API and the
+streams. Multi-node deployments need a shared broker (e.g. Redis pub/sub)
+implementing the same subscribe/unsubscribe/publish interface, configured via
+settings.NOTIFICATION_BROKER.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of undelivered events buffered per connection
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """A single stream connection listening on a user's channel."""
+
+    def __init__(self, user_id, loop: asyncio.AbstractEventLoop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def put(self, event: Dict[str, Any]):
+        """Queue an event. Must be called from the subscription's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping notification event for user {self.user_id}: subscriber is not reading")
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event.
+
+        Returns:
+            The event, or None if no event arrived within the timeout
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryNotificationBroker:
+    """
+    Process-local broker with one channel per user.
+
+    publish() may be called from any thread (signals run in sync worker threads
+    under ASGI); delivery is handed to each subscriber's event loop.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id) -> Subscription:
+        """Open a subscription on the user's channel from the running event loop."""
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Close a subscription."""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event: Dict[str, Any]) -> int:
+        """
+        Publish an event to every subscriber of the user's channel.
+
+        Returns:
+            Number of subscriptions the event was handed to
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+                delivered += 1
+            except RuntimeError:
+                # The subscriber's event loop has been closed
+                self.unsubscribe(subscription)
+        return delivered
+
+    def subscriber_count(self, user_id) -> int:
+        """Return the number of open subscriptions for a user."""
+        with self._lock:
+            return len(self._subscribers.get(user_id, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process-wide broker configured by settings.NOTIFICATION_BROKER."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_path = getattr(
+                    settings, 'NOTIFICATION_BROKER',
+                    'core.utils.notification_broker.InMemoryNotificationBroker'
+                )
+                _broker = import_string(broker_path)()
+    return _broker
+
+
+def notification_event(notification) -> Dict[str, Any]:
+    """Build the 'notification' event pushed to clients for a new notification."""
+    from ..serializers import NotificationSerializer
+
+    return {
+        'event': 'notification',
+        'data': NotificationSerializer(notification).data,
+    }
+
+
+def unread_count_event(unread_count: int) -> Dict[str, Any]:
+    """Build the 'unread_count' event pushed to clients."""
+    return {
+        'event': 'unread_count',
+        'data': {'unread_count': unread_count},
+    }
+
+
+def publish_notification(notification) -> int:
+    """Publish a newly created notification to its user's channel."""
+    try:
+        broker = get_broker()
+        # Most users have no open stream; don't serialize for no one
+        if not broker.subscriber_count(notification.user_id):
+            return 0
+        return broker.publish(notification.user_id, notification_event(notification))
+    except Exception as e:
+        # Pushing is best-effort; clients resync the unread count on reconnect
+        logger.exception(f"Failed to publish notification {notification.id}: {str(e)}")
+        return 0
+
+
+def publish_unread_count(user_id, unread_count) -> int:
+    """Publish a user's new unread count after notifications are marked as read."""
+    try:
+        return get_broker().publish(user_id, unread_count_event(unread_count))
+    except Exception as e:
+        logger.exception(f"Failed to publish unread count for user {user_id}: {str(e)}")
+        return 0
@@ -0,0 +1,187 @@
+"""
+Cached per-user unread notification counters.
+
+Each user has one cache key holding the total unread count and one key per
+notification type. The keys are adjusted with atomic cache increments when
+notifications are created, marked read or deleted by the retention job, so the
+unread badge in the UI is a single cache get instead of COUNT queries.
+
+Whenever a key is missing (never built, evicted or expired) the counters for
+that user are rebuilt from the database with a single grouped query. Counters
+expire after NOTIFICATION_COUNTER_TIMEOUT seconds, which bounds any drift from
+races between a rebuild and a concurrent increment.
+
+With multiple application processes the cache must be shared (Redis or
+Memcached, see CACHES in settings); the default local-memory cache only keeps
+counters consistent within a single process.
+"""
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from ..models.notification import Notification
+
+COUNTER_KEY_PREFIX = 'notifications:unread'
+
+
+def _get_timeout():
+    return getattr(settings, 'NOTIFICATION_COUNTER_TIMEOUT', 3600)
+
+
+def _notification_types():
+    return [choice[0] for choice in Notification.NOTIFICATION_TYPES]
+
+
+def total_key(user_id) -> str:
+    """Cache key of a user's total unread count."""
+    return f"{COUNTER_KEY_PREFIX}:{user_id}:total"
+
+
+def type_key(user_id, notification_type) -> str:
+    """Cache key of a user's unread count for one notification type."""
+    return f"{COUNTER_KEY_PREFIX}:{user_id}:type:{notification_type}"
+
+
+def rebuild_unread_counters(user_id) -> Dict:
+    """
+    Recompute a user's unread counters from the database and cache them.
+
+    Returns:
+        {"unread_count": <total>, "notification_types": {<type>: <count>, ...}}
+    """
+    rows = (
+        Notification.objects
+        .filter(user_id=user_id, is_read=False)
+        .values('notification_type')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    by_type = {notification_type: 0 for notification_type in _notification_types()}
+    for row in rows:
+        by_type[row['notification_type']] = row['count']
+    total = sum(by_type.values())
+
+    values = {type_key(user_id, t): count for t, count in by_type.items()}
+    values[total_key(user_id)] = total
+    cache.set_many(values, timeout=_get_timeout())
+
+    return {
+        'unread_count': total,
+        'notification_types': {t: count for t, count in by_type.items() if count},
+    }
+
+
+def get_unread_count(user_id) -> int:
+    """Return a user's total unread count (one cache get when warm)."""
+    total = cache.get(total_key(user_id))
+    if total is None:
+        total = rebuild_unread_counters(user_id)['unread_count']
+    return total
+
+
+def get_unread_counts(user_id) -> Dict:
+    """
+    Return a user's unread counts, total and by notification type.
+
+    Returns:
+        {"unread_count": <total>, "notification_types": {<type>: <count>, ...}}
+    """
+    keys = {type_key(user_id, t): t for t in _notification_types()}
+    keys[total_key(user_id)] = None
+    values = cache.get_many(list(keys))
+    if len(values) < len(keys):
+        return rebuild_unread_counters(user_id)
+
+    return {
+        'unread_count': values[total_key(user_id)],
+        'notification_types': {
+            notification_type: values[key]
+            for key, notification_type in keys.items()
+            if notification_type and values[key]
+        },
+    }
+
+
+def _increment(key, delta) -> Optional[int]:
+    """
+    Atomically add delta to a counter.
+
+    Returns:
+        The new value, or None if the counter is not cached (it will be rebuilt
+        from the database on the next read)
+    """
+    try:
+        value = cache.incr(key, delta)
+    except ValueError:
+        return None
+    if value < 0:
+        # Out of sync with the database; force a rebuild on the next read
+        cache.delete(key)
+        return None
+    return value
+
+
+def adjust_unread_counters(user_id, deltas: Dict[str, int]) -> Optional[int]:
+    """
+    Apply per-type deltas to a user's counters.
+
+    Returns:
+        The new total, or None if the total is not cached
+    """
+    deltas = {t: delta for t, delta in deltas.items() if delta}
+    if not deltas:
+        return cache.get(total_key(user_id))
+
+    for notification_type, delta in deltas.items():
+        _increment(type_key(user_id, notification_type), delta)
+    return _increment(total_key(user_id), sum(deltas.values()))
+
+
+def notification_created(notification) -> Optional[int]:
+    """Count a newly created notification."""
+    if notification.is_read:
+        return cache.get(total_key(notification.user_id))
+    return adjust_unread_counters(notification.user_id, {notification.notification_type: 1})
+
+
+def notifications_created(notifications):
+    """Count newly created notifications, one adjustment per user."""
+    deltas = defaultdict(Counter)
+    for notification in notifications:
+        if not notification.is_read:
+            deltas[notification.user_id][notification.notification_type] += 1
+
+    for user_id, user_deltas in deltas.items():
+        adjust_unread_counters(user_id, user_deltas)
+
+
+def notification_read(user_id, notification_type) -> Optional[int]:
+    """Uncount a notification that has just been marked as read."""
+    return adjust_unread_counters(user_id, {notification_type: -1})
+
+
+def reset_unread_counters(user_id) -> int:
+    """Set all of a user's counters to zero after marking everything as read."""
+    values = {type_key(user_id, t): 0 for t in _notification_types()}
+    values[total_key(user_id)] = 0
+    cache.set_many(values, timeout=_get_timeout())
+    return 0
+
+
+def notifications_deleted(rows: Iterable[Tuple[int, str, bool]]):
+    """
+    Uncount deleted notifications.
+
+    Args:
+        rows: (user_id, notification_type, is_read) for every deleted notification
+    """
+    deltas = defaultdict(Counter)
+    for user_id, notification_type, is_read in rows:
+        if not is_read:
+            deltas[user_id][notification_type] -= 1
+
+    for user_id, user_deltas in deltas.items():
+        adjust_unread_counters(user_id, user_deltas)
@@ -0,0 +1,207 @@
+"""
+Utilities for enforcing notification retention.
+
+Old notifications are removed in bounded primary-key ranges with raw DELETE
+statements instead of a single ``QuerySet.delete()``. Django's delete collector
+loads every matching row into memory and removes them in one long transaction;
+deleting small id ranges keeps memory, lock time and table bloat flat no matter
+how large the notifications table grows.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models.notification import Notification
+from .notification_counters import notifications_deleted
+
+logger = logging.getLogger(__name__)
+
+# Fields written to the archive for every deleted notification
+ARCHIVE_FIELDS = [
+    'id', 'user_id', 'actor_id', 'notification_type', 'title', 'message',
+    'is_read', 'email_sent', 'created_at', 'updated_at',
+    'content_type_id', 'object_id',
+]
+
+
+def get_retention_rules(days: Optional[int] = None,
+                        rules: Optional[Dict[str, int]] = None) -> Dict[Optional[str], int]:
+    """
+    Build the retention rules to apply.
+
+    Args:
+        days: Default retention in days for types without a specific rule
+        rules: Mapping of notification_type -> retention in days
+
+    Returns:
+        Mapping of notification_type -> days, where the ``None`` key holds the
+        default retention for every type not listed explicitly
+    """
+    if days is None:
+        days = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 30)
+    if rules is None:
+        rules = getattr(settings, 'NOTIFICATION_RETENTION_RULES', {})
+
+    valid_types = {choice[0] for choice in Notification.NOTIFICATION_TYPES}
+    retention = {None: days}
+    for notification_type, type_days in rules.items():
+        if notification_type not in valid_types:
+            logger.warning(f"Ignoring retention rule for unknown notification type '{notification_type}'")
+            continue
+        retention[notification_type] = type_days
+    return retention
+
+
+def _rule_queryset(notification_type, cutoff, typed_rules: Iterable[str]):
+    """Return the queryset of notifications expired under a single rule."""
+    queryset = Notification.objects.filter(created_at__lt=cutoff)
+    if notification_type is None:
+        # The default rule covers every type without its own rule
+        return queryset.exclude(notification_type__in=list(typed_rules))
+    return queryset.filter(notification_type=notification_type)
+
+
+def _archive_rows(archive_file, queryset):
+    """Append the given notifications to the archive as JSON lines."""
+    written = 0
+    for row in queryset.values(*ARCHIVE_FIELDS).iterator():
+        archive_file.write(json.dumps(row, cls=DjangoJSONEncoder))
+        archive_file.write('\n')
+        written += 1
+    return written
+
+
+def _delete_range(low_id, high_id, cutoff, notification_type, typed_rules):
+    """
+    Delete expired notifications with ids in [low_id, high_id] using a raw DELETE.
+
+    Notifications have no dependent rows and no delete signals, so bypassing the
+    delete collector is safe. The primary-key range keeps each statement on the
+    primary key index and bounds the number of locked rows.
+    """
+    table = connection.ops.quote_name(Notification._meta.db_table)
+    sql = f"DELETE FROM {table} WHERE id >= %s AND id <= %s AND created_at < %s"
+    params = [low_id, high_id, cutoff]
+
+    if notification_type is not None:
+        sql += " AND notification_type = %s"
+        params.append(notification_type)
+    elif typed_rules:
+        placeholders = ', '.join(['%s'] * len(typed_rules))
+        sql += f" AND notification_type NOT IN ({placeholders})"
+        params.extend(typed_rules)
+
+    # RETURNING reports the deleted rows so the unread counters can be adjusted
+    # without a separate SELECT
+    sql += " RETURNING user_id, notification_type, is_read"
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    transaction.on_commit(lambda: notifications_deleted(rows))
+    return len(rows)
+
+
+def purge_notifications(days: Optional[int] = None,
+                        rules: Optional[Dict[str, int]] = None,
+                        batch_size: Optional[int] = None,
+                        pause: Optional[float] = None,
+                        archive_dir: Optional[str] = None,
+                        now=None) -> Dict[str, int]:
+    """
+    Delete expired notifications in primary-key ranged batches.
+
+    Args:
+        days: Default retention in days (NOTIFICATION_RETENTION_DAYS)
+        rules: Per-type retention overrides (NOTIFICATION_RETENTION_RULES)
+        batch_size: Maximum rows deleted per statement (NOTIFICATION_RETENTION_BATCH_SIZE)
+        pause: Seconds to sleep between batches (NOTIFICATION_RETENTION_BATCH_PAUSE)
+        archive_dir: If set, rows are written to a gzip-compressed JSON lines
+            file in this directory before they are deleted (NOTIFICATION_ARCHIVE_DIR)
+        now: Reference time for the cutoffs, defaults to timezone.now()
+
+    Returns:
+        Mapping of notification_type (or 'default') -> number of deleted rows
+    """
+    if batch_size is None:
+        batch_size = getattr(settings, 'NOTIFICATION_RETENTION_BATCH_SIZE', 1000)
+    if pause is None:
+        pause = getattr(settings, 'NOTIFICATION_RETENTION_BATCH_PAUSE', 0.1)
+    if archive_dir is None:
+        archive_dir = getattr(settings, 'NOTIFICATION_ARCHIVE_DIR', None)
+    if now is None:
+        now = timezone.now()
+
+    retention = get_retention_rules(days, rules)
+    typed_rules = sorted(t for t in retention if t is not None)
+
+    archive_file = None
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.join(
+            archive_dir,
+            f"notifications-{now.strftime('%Y%m%d%H%M%S')}.jsonl.gz"
+        )
+        archive_file = gzip.open(archive_path, 'at', encoding='utf-8')
+        logger.info(f"Archiving expired notifications to {archive_path}")
+
+    summary = {}
+    try:
+        for notification_type, type_days in retention.items():
+            cutoff = now - timedelta(days=type_days)
+            queryset = _rule_queryset(notification_type, cutoff, typed_rules)
+
+            # Ids grow with created_at, so the newest expired row bounds the scan
+            # and later batches never walk through rows that are still retained.
+            upper_id = (
+                queryset.order_by('-created_at', '-id')
+                .values_list('id', flat=True)
+                .first()
+            )
+            deleted = 0
+            last_id = 0
+
+            while upper_id is not None:
+                batch_ids = list(
+                    queryset.filter(id__gt=last_id, id__lte=upper_id)
+                    .order_by('id')
+                    .values_list('id', flat=True)[:batch_size]
+                )
+                if not batch_ids:
+                    break
+
+                low_id, high_id = batch_ids[0], batch_ids[-1]
+                with transaction.atomic():
+                    if archive_file:
+                        _archive_rows(
+                            archive_file,
+                            queryset.filter(id__gte=low_id, id__lte=high_id).order_by('id')
+                        )
+                    deleted += _delete_range(low_id, high_id, cutoff, notification_type, typed_rules)
+
+                last_id = high_id
+                if len(batch_ids) < batch_size:
+                    break
+                if pause:
+                    time.sleep(pause)
+
+            summary[notification_type or 'default'] = deleted
+            logger.info(
+                f"Deleted {deleted} '{notification_type or 'default'}' notifications "
+                f"older than {type_days} days"
+            )
+    finally:
+        if archive_file:
+            archive_file.close()
+
+    return summary
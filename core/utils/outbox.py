@@ -0,0 +1,328 @@
+"""
+Transactional outbox for signal side effects.
+
+Moderation changes, new reviews and photos, and badge awards used to create
+notifications and award points (with their total and level recomputation)
+inline, inside the save that triggered them. The signals now only record one
+compact OutboxEvent row in the same transaction, so the side effects happen
+if and only if the change commits, and the request does one extra INSERT.
+
+process_outbox() drains the pending events in batches: each batch is claimed
+with SELECT ... FOR UPDATE SKIP LOCKED, its notifications and points are
+built from one query per content kind and written with bulk inserts, and the
+events are marked processed in the same transaction. Concurrent drainers
+never take the same events, and an event's effects are applied exactly once
+with its processed_at. Recording uses the event's idempotency key, so the same
+event recorded twice is kept once. A batch that fails is retried until
+OUTBOX_MAX_ATTEMPTS, with the error kept on the events.
+
+Draining:
+- OUTBOX_DRAIN_ON_COMMIT (default): every committing transaction that
+  recorded events triggers a drain of those events only, so a request never
+  works through an older backlog. It runs through run_in_background, i.e. the
+  process_outbox Celery task when BACKGROUND_TASKS_ASYNC is set, or inline
+  right after the commit otherwise;
+- with it disabled (single-node setups), run the drain_outbox management
+  command, e.g. with --loop under a process supervisor. The command, and the
+  periodic process_outbox task, drain everything pending, including retries.
+
+Draining pushes the new notifications to the drainer's NOTIFICATION_BROKER
+and counts them in its cache. With the in-memory broker or a local-memory
+cache a Celery worker would push to no one and count in its own memory, so
+the transaction's events are then drained in the web process even with
+BACKGROUND_TASKS_ASYNC set.
+"""
+import logging
+import weakref
+from collections import defaultdict
+from functools import partial
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Notification, OutboxEvent, Review, UserBadge, UserPoints
+from .background import run_in_background
+from .moderation import (
+    CONTENT_KINDS, build_approval_points, build_moderation_notification, create_notifications, get_content_kind
+)
+
+logger = logging.getLogger(__name__)
+
+MODELS_BY_KIND = {kind: model for model, kind in CONTENT_KINDS.items()}
+
+# Points awarded with a new badge
+BADGE_POINTS = 10
+
+
+def _get_batch_size():
+    return getattr(settings, 'OUTBOX_BATCH_SIZE', 200)
+
+
+def _get_max_attempts():
+    return getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def record_event(event_type: str, payload: Dict, idempotency_key: str):
+    """Record an event in the current transaction; a repeated key is ignored."""
+    record_events([OutboxEvent(event_type=event_type, payload=payload, idempotency_key=idempotency_key)])
+
+
+def record_events(events: List[OutboxEvent]):
+    """Record many (unsaved) events with one INSERT; repeated keys are ignored."""
+    if not events:
+        return
+    OutboxEvent.objects.bulk_create(events, batch_size=500, ignore_conflicts=True)
+    if getattr(settings, 'OUTBOX_DRAIN_ON_COMMIT', True):
+        _schedule_drain([event.idempotency_key for event in events])
+
+
+def notifications_are_process_local() -> bool:
+    """Whether notification pushes and unread counters only reach this process."""
+    from django.core.cache import cache
+    from django.core.cache.backends.locmem import LocMemCache
+    from .notification_broker import InMemoryNotificationBroker, get_broker
+    return isinstance(get_broker(), InMemoryNotificationBroker) or isinstance(cache, LocMemCache)
+
+
+def _drain_after_commit(keys):
+    from ..tasks import process_outbox as process_outbox_task
+    # Events recorded from here on belong to the next transaction
+    connection._outbox_drain = None
+    if getattr(settings, 'BACKGROUND_TASKS_ASYNC', False) and notifications_are_process_local():
+        # A worker's pushes and counters would not reach this process's streams
+        try:
+            process_outbox(keys=keys)
+        except Exception:
+            logger.exception("Draining the outbox after commit failed")
+        return
+    run_in_background(process_outbox_task, keys=keys)
+
+
+def _schedule_drain(idempotency_keys):
+    # One drain per transaction, covering every event it records. Only the
+    # transaction's on-commit callbacks hold the drain, so the weak reference
+    # dies when a rollback discards them
+    pending = getattr(connection, '_outbox_drain', None)
+    drain = pending() if pending is not None else None
+    if drain is not None:
+        drain.args[0].extend(idempotency_keys)
+        return
+    drain = partial(_drain_after_commit, list(idempotency_keys))
+    connection._outbox_drain = weakref.ref(drain)
+    transaction.on_commit(drain)
+
+
+def moderation_event(instance) -> OutboxEvent:
+    """The (unsaved) moderation_changed event of a moderated place, review or photo."""
+    kind = get_content_kind(instance)
+    moderated_at = instance.moderated_at or timezone.now()
+    return OutboxEvent(
+        event_type='moderation_changed',
+        payload={
+            'kind': kind,
+            'id': str(instance.pk),
+            'status': instance.moderation_status,
+            'comment': instance.moderation_comment or '',
+        },
+        idempotency_key=f'moderation:{kind}:{instance.pk}:{instance.moderation_status}:{moderated_at.isoformat()}'
+    )
+
+
+def record_moderation_change(instance):
+    """A moderated place, review or photo: notify the owner, award points on approval."""
+    record_events([moderation_event(instance)])
+
+
+def record_moderation_changes(instances):
+    """record_moderation_change() for many objects, with one INSERT."""
+    record_events([moderation_event(instance) for instance in instances])
+
+
+def record_content_created(instance):
+    """A new review or photo: notify the place owner."""
+    kind = get_content_kind(instance)
+    record_event('content_created', {'kind': kind, 'id': str(instance.pk)}, f'created:{kind}:{instance.pk}')
+
+
+def record_badge_awarded(user_badge):
+    """A new badge: notify the user and award BADGE_POINTS."""
+    record_event('badge_awarded', {'user_badge': str(user_badge.pk)}, f'badge:{user_badge.pk}')
+
+
+Effects = Tuple[List[Notification], List[UserPoints]]
+
+
+def _load(events, related: Dict) -> Dict:
+    """{(kind, id): object} for the events' payloads, one query per kind."""
+    ids = defaultdict(set)
+    for event in events:
+        ids[event.payload['kind']].add(event.payload['id'])
+    objects = {}
+    for kind, kind_ids in ids.items():
+        model = MODELS_BY_KIND[kind]
+        for pk, obj in model.objects.select_related(*related[kind]).in_bulk(list(kind_ids)).items():
+            objects[(kind, str(pk))] = obj
+    return objects
+
+
+def moderation_effects(events) -> Dict[int, Effects]:
+    objects = _load(events, {'place': ['created_by'], 'review': ['place'], 'photo': ['place']})
+    effects = {}
+    for event in events:
+        obj = objects.get((event.payload['kind'], event.payload['id']))
+        if obj is None:
+            continue
+        # As it was when moderated, even if it changed since
+        obj.moderation_status = event.payload['status']
+        obj.moderation_comment = event.payload['comment']
+        notification = build_moderation_notification(obj)
+        points = build_approval_points(obj)
+        effects[event.pk] = ([notification] if notification else [], [points] if points else [])
+    return effects
+
+
+def creation_effects(events) -> Dict[int, Effects]:
+    objects = _load(events, {'review': ['place'], 'photo': ['place']})
+    effects = {}
+    for event in events:
+        obj = objects.get((event.payload['kind'], event.payload['id']))
+        if obj is None or obj.place.created_by_id is None:
+            continue
+        if isinstance(obj, Review):
+            notification_type = 'new_review'
+            title = 'New Review for Your Place'
+            message = f'A new review has been posted for "{obj.place.name}"'
+        else:
+            notification_type = 'new_photo'
+            title = 'New Photo for Your Place'
+            message = f'A new photo has been uploaded for "{obj.place.name}"'
+        notification = Notification(
+            user_id=obj.place.created_by_id,
+            actor_id=obj.user_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            content_type=ContentType.objects.get_for_model(obj),
+            object_id=obj.id
+        )
+        effects[event.pk] = ([notification], [])
+    return effects
+
+
+def badge_effects(events) -> Dict[int, Effects]:
+    user_badges = UserBadge.objects.select_related('badge').in_bulk(
+        [event.payload['user_badge'] for event in events]
+    )
+    user_badges = {str(pk): user_badge for pk, user_badge in user_badges.items()}
+    effects = {}
+    for event in events:
+        user_badge = user_badges.get(event.payload['user_badge'])
+        if user_badge is None:
+            continue
+        badge = user_badge.badge
+        notification = Notification(
+            user_id=user_badge.user_id,
+            notification_type='badge_earned',
+            title=f'New Badge Earned: {badge.name}!',
+            message=f'Congratulations! You\'ve earned the badge: {badge.name}. {badge.description}'
+        )
+        points = UserPoints.build_record(
+            user_id=user_badge.user_id,
+            points=BADGE_POINTS,
+            source_type='badge',
+            source_id=badge.id,
+            description=f"Earned the {badge.name} badge"
+        )
+        effects[event.pk] = ([notification], [points])
+    return effects
+
+
+EVENT_HANDLERS = {
+    'moderation_changed': moderation_effects,
+    'content_created': creation_effects,
+    'badge_awarded': badge_effects,
+}
+
+
+def _apply(events) -> Dict[int, str]:
+    """Build and write the effects of events; returns {event id: error} for failed ones."""
+    by_type = defaultdict(list)
+    for event in events:
+        by_type[event.event_type].append(event)
+
+    errors = {}
+    notifications, points = [], []
+    for event_type, typed_events in by_type.items():
+        handler = EVENT_HANDLERS.get(event_type)
+        if handler is None:
+            errors.update({event.pk: f'No handler for {event_type}' for event in typed_events})
+            continue
+        try:
+            effects = handler(typed_events)
+        except Exception as e:
+            logger.exception(f"Building {event_type} outbox effects failed")
+            errors.update({event.pk: repr(e) for event in typed_events})
+            continue
+        for event_notifications, event_points in effects.values():
+            notifications.extend(event_notifications)
+            points.extend(event_points)
+
+    create_notifications(notifications)
+    UserPoints.bulk_add_points(points)
+    return errors
+
+
+def process_outbox(batch_size=None, max_batches=None, keys=None) -> int:
+    """
+    Apply pending outbox events in batches until none are left (or
+    max_batches ran).
+
+    Args:
+        keys: Only apply the events with these idempotency keys
+
+    Returns:
+        Number of events processed
+    """
+    batch_size = batch_size or _get_batch_size()
+    max_attempts = _get_max_attempts()
+    processed = 0
+    batches = 0
+    # Failed events wait for the next drain rather than looping in this one
+    failed = set()
+    pending = OutboxEvent.objects.filter(processed_at__isnull=True, attempts__lt=max_attempts)
+    if keys is not None:
+        pending = pending.filter(idempotency_key__in=list(keys))
+    while max_batches is None or batches < max_batches:
+        batches += 1
+        with transaction.atomic():
+            events = list(
+                pending
+                .select_for_update(skip_locked=True)
+                .exclude(pk__in=failed)
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+            ids = [event.pk for event in events]
+            try:
+                with transaction.atomic():
+                    errors = _apply(events)
+            except Exception as e:
+                logger.exception(f"Applying {len(events)} outbox events failed")
+                errors = {pk: repr(e) for pk in ids}
+
+            done = [pk for pk in ids if pk not in errors]
+            OutboxEvent.objects.filter(pk__in=done).update(
+                processed_at=timezone.now(), attempts=F('attempts') + 1, last_error=''
+            )
+            for pk, error in errors.items():
+                OutboxEvent.objects.filter(pk=pk).update(attempts=F('attempts') + 1, last_error=error[:2000])
+            failed.update(errors)
+            processed += len(done)
+    if processed:
+        logger.info(f"Processed {processed} outbox events")
+    return processed
@@ -0,0 +1,351 @@
+"""
+Perceptual hashes for detecting duplicate place photos.
+
+Every processed photo gets two 64-bit hashes: a pHash (low frequencies of the
+DCT of a 32x32 grayscale copy) and a dHash (brightness gradients of a 9x8
+copy). Re-encoded, resized or lightly edited copies of the same shot differ in
+only a few bits, so two photos of a place are near-duplicates when both
+Hamming distances are small (PHOTO_DUPLICATE_MAX_DISTANCE and
+PHOTO_DUPLICATE_MAX_DHASH_DISTANCE).
+
+Lookups use multi-index hashing: the pHash is split into four 16-bit bands,
+each stored in an indexed column. If two hashes differ in at most d bits, at
+least one band differs in at most d // 4 bits (pigeonhole), so the candidates
+are the photos whose band matches one of the band's neighbours within that
+radius, which is a handful of index lookups instead of a scan of the place's
+photos. Batch deduplication of a whole place uses a BK-tree in memory.
+
+Near-duplicates found while processing are flagged (duplicate_of is set) or,
+with PHOTO_DUPLICATE_ACTION = 'reject', rejected before they reach moderation.
+"""
+import logging
+import math
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List
+
+from PIL import Image
+from django.conf import settings
+from django.db.models import Q
+
+from .db import iterate_in_chunks
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = HASH_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+BAND_FIELDS = [f'phash_band_{i}' for i in range(BAND_COUNT)]
+
+DCT_SIZE = 32
+DCT_KEEP = 8
+
+DUPLICATE_COMMENT = 'Duplicate of an existing photo of this place'
+
+
+def _get_max_distance():
+    return getattr(settings, 'PHOTO_DUPLICATE_MAX_DISTANCE', 6)
+
+
+def _get_max_dhash_distance():
+    return getattr(settings, 'PHOTO_DUPLICATE_MAX_DHASH_DISTANCE', 10)
+
+
+@lru_cache(maxsize=1)
+def _dct_cosines():
+    """cos((2x + 1) * u * pi / 2N) for the kept frequencies u."""
+    return [
+        [math.cos((2 * x + 1) * u * math.pi / (2 * DCT_SIZE)) for x in range(DCT_SIZE)]
+        for u in range(DCT_KEEP)
+    ]
+
+
+def _bits_to_int(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def phash(img) -> int:
+    """64-bit DCT hash of a PIL image (unsigned)."""
+    small = img.convert('L').resize((DCT_SIZE, DCT_SIZE), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    rows = [pixels[y * DCT_SIZE:(y + 1) * DCT_SIZE] for y in range(DCT_SIZE)]
+    cosines = _dct_cosines()
+
+    # The DCT is separable: transform the rows, then the columns, keeping
+    # only the 8x8 lowest frequencies
+    row_coefficients = [
+        [sum(c * p for c, p in zip(cosines[u], row)) for u in range(DCT_KEEP)]
+        for row in rows
+    ]
+    coefficients = [
+        sum(cosines[v][y] * row_coefficients[y][u] for y in range(DCT_SIZE))
+        for v in range(DCT_KEEP)
+        for u in range(DCT_KEEP)
+    ]
+    # The DC term only carries the average brightness
+    median = sorted(coefficients[1:])[(len(coefficients) - 1) // 2]
+    return _bits_to_int(c > median for c in coefficients)
+
+
+def dhash(img) -> int:
+    """64-bit gradient hash of a PIL image (unsigned)."""
+    small = img.convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+    return _bits_to_int(
+        pixels[y * 9 + x] < pixels[y * 9 + x + 1]
+        for y in range(8)
+        for x in range(8)
+    )
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return bin((a ^ b) & ((1 << HASH_BITS) - 1)).count('1')
+
+
+def to_signed(value: int) -> int:
+    """Store an unsigned 64-bit hash in a signed BIGINT column."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def split_bands(value: int) -> List[int]:
+    """The four 16-bit bands of an unsigned hash, most significant first."""
+    return [
+        (value >> (BAND_BITS * (BAND_COUNT - 1 - i))) & BAND_MASK
+        for i in range(BAND_COUNT)
+    ]
+
+
+def band_neighbors(band: int, radius: int) -> List[int]:
+    """All band values within the given Hamming radius of band."""
+    neighbors = [band]
+    for distance in range(1, radius + 1):
+        for positions in combinations(range(BAND_BITS), distance):
+            flipped = band
+            for position in positions:
+                flipped ^= 1 << position
+            neighbors.append(flipped)
+    return neighbors
+
+
+def set_photo_hashes(photo, img):
+    """Compute and assign the photo's hashes and bands (not saved)."""
+    p = phash(img)
+    photo.phash = to_signed(p)
+    photo.dhash = to_signed(dhash(img))
+    for field, band in zip(BAND_FIELDS, split_bands(p)):
+        setattr(photo, field, band)
+
+
+def hash_fields():
+    """Model fields written by set_photo_hashes."""
+    return ['phash', 'dhash'] + BAND_FIELDS
+
+
+def is_near_duplicate(phash_a, dhash_a, phash_b, dhash_b) -> bool:
+    """Whether two photos' (signed) hashes are within the duplicate thresholds."""
+    return (
+        hamming(to_unsigned(phash_a), to_unsigned(phash_b)) <= _get_max_distance()
+        and hamming(to_unsigned(dhash_a), to_unsigned(dhash_b)) <= _get_max_dhash_distance()
+    )
+
+
+def find_duplicate(photo):
+    """
+    The oldest non-rejected photo of the same place that the photo nearly
+    duplicates, or None.
+    """
+    from ..models import PlacePhoto
+
+    if photo.phash is None:
+        return None
+
+    radius = _get_max_distance() // BAND_COUNT
+    bands = split_bands(to_unsigned(photo.phash))
+    band_filter = Q()
+    for field, band in zip(BAND_FIELDS, bands):
+        band_filter |= Q(**{f'{field}__in': band_neighbors(band, radius)})
+
+    candidates = (
+        PlacePhoto.objects
+        .filter(band_filter, place_id=photo.place_id, phash__isnull=False)
+        .exclude(pk=photo.pk)
+        .exclude(moderation_status='REJECTED')
+        .only('id', 'phash', 'dhash', 'uploaded_at', 'duplicate_of_id')
+        .order_by('uploaded_at')
+    )
+    if photo.uploaded_at:
+        # Only earlier uploads count as the original
+        candidates = candidates.filter(uploaded_at__lt=photo.uploaded_at)
+    for candidate in candidates:
+        if is_near_duplicate(photo.phash, photo.dhash, candidate.phash, candidate.dhash):
+            # Point at the first copy rather than at another duplicate
+            if candidate.duplicate_of_id:
+                return PlacePhoto.objects.filter(pk=candidate.duplicate_of_id).first() or candidate
+            return candidate
+    return None
+
+
+def reject_duplicate(photo):
+    """Reject a pending near-duplicate; the uploader is notified as for any rejection."""
+    if photo.moderation_status == 'PENDING':
+        photo.update_moderation_status('REJECTED', comment=DUPLICATE_COMMENT)
+
+
+def should_reject_duplicates() -> bool:
+    return getattr(settings, 'PHOTO_DUPLICATE_ACTION', 'flag') == 'reject'
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over hashes for Hamming-distance range queries.
+
+    Each child edge is labelled with its distance to the parent; by the
+    triangle inequality, a search within radius r only descends into children
+    whose label is within r of the query's distance to the node.
+    """
+
+    def __init__(self):
+        self.root = None
+
+    def add(self, key: int, item):
+        node = [key, item, {}]
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming(key, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, key: int, radius: int) -> List:
+        """Items within radius of key, as (distance, item) pairs sorted by distance."""
+        results = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_key, item, children = stack.pop()
+            distance = hamming(key, node_key)
+            if distance <= radius:
+                results.append((distance, item))
+            for label, child in children.items():
+                if distance - radius <= label <= distance + radius:
+                    stack.append(child)
+        return sorted(results, key=lambda result: result[0])
+
+
+def compute_missing_hashes(batch_size=200) -> int:
+    """
+    Hash uploaded photos that were processed before hashing was added.
+
+    Returns:
+        Number of photos hashed
+    """
+    from ..models import PlacePhoto
+    from .photo_processing import open_for_resizing
+
+    hashed = 0
+    queryset = (
+        PlacePhoto.objects
+        .filter(phash__isnull=True)
+        .exclude(image__isnull=True)
+        .exclude(image='')
+        .only('id', 'image')
+    )
+    for photo in iterate_in_chunks(queryset, chunk_size=batch_size):
+        try:
+            with photo.image.storage.open(photo.image.name, 'rb') as image_file:
+                # Hashes need only a tiny copy; let the JPEG decoder downscale
+                _, img = open_for_resizing(image_file, (DCT_SIZE * 2, DCT_SIZE * 2))
+        except Exception as e:
+            logger.warning(f"Could not hash photo {photo.id}: {str(e)}")
+            continue
+        set_photo_hashes(photo, img)
+        photo.save(update_fields=hash_fields())
+        hashed += 1
+    return hashed
+
+
+def dedupe_place_photos(place_id, reject=False, dry_run=False) -> Dict[str, int]:
+    """
+    Find near-duplicates among a place's photos, keeping the oldest copy.
+
+    Duplicates get duplicate_of set; with reject, pending duplicates are
+    rejected as well.
+
+    Returns:
+        {"flagged": <duplicates found>, "rejected": <duplicates rejected>}
+    """
+    from ..models import PlacePhoto
+
+    photos = list(
+        PlacePhoto.objects
+        .filter(place_id=place_id, phash__isnull=False)
+        .exclude(moderation_status='REJECTED')
+        .order_by('uploaded_at', 'pk')
+    )
+    tree = BKTree()
+    summary = {'flagged': 0, 'rejected': 0}
+    for photo in photos:
+        original = None
+        for _, candidate in tree.search(to_unsigned(photo.phash), _get_max_distance()):
+            if is_near_duplicate(photo.phash, photo.dhash, candidate.phash, candidate.dhash):
+                original = candidate
+                break
+        if original is None:
+            tree.add(to_unsigned(photo.phash), photo)
+            continue
+
+        summary['flagged'] += 1
+        if dry_run:
+            continue
+        if photo.duplicate_of_id != original.id:
+            photo.duplicate_of = original
+            photo.save(update_fields=['duplicate_of'])
+        if reject and photo.moderation_status == 'PENDING':
+            reject_duplicate(photo)
+            summary['rejected'] += 1
+    return summary
+
+
+def dedupe_photos(place_ids=None, reject=False, dry_run=False) -> Dict[str, int]:
+    """
+    Deduplicate the photos of the given places (defaults to every place with
+    at least two hashed photos).
+
+    Returns:
+        {"places": ..., "flagged": ..., "rejected": ...}
+    """
+    from django.db.models import Count
+
+    from ..models import PlacePhoto
+
+    if place_ids is None:
+        place_ids = (
+            PlacePhoto.objects
+            .filter(phash__isnull=False)
+            .exclude(moderation_status='REJECTED')
+            .values('place_id')
+            .annotate(photo_count=Count('id'))
+            .filter(photo_count__gt=1)
+            .values_list('place_id', flat=True)
+        )
+
+    summary = {'places': 0, 'flagged': 0, 'rejected': 0}
+    for place_id in list(place_ids):
+        result = dedupe_place_photos(place_id, reject=reject, dry_run=dry_run)
+        summary['places'] += 1
+        summary['flagged'] += result['flagged']
+        summary['rejected'] += result['rejected']
+    return summary
@@ -0,0 +1,124 @@
+"""
+Moving photo files into the fan-out layout.
+
+Photos used to be stored per place ({place_id}/photos/{name}, derivatives under
+{place_id}/photos/derivatives/), which made popular places' directories grow
+without bound and name allocation probe them file by file. New files go to
+photos/{id[0:2]}/{id[2:4]}/ (see get_photo_dir). This module moves existing
+files there with ``python manage.py migrate_photo_layout``.
+
+Each photo is handled on its own: files are copied to their new names, the row
+is updated, and the old files are deleted only after the update commits, so an
+interrupted run leaves every photo pointing at files that exist. Photos already
+in the new layout are skipped, so the command can simply be run again.
+"""
+import logging
+import os
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+
+from ..models import PlacePhoto
+from .db import iterate_in_chunks
+from .photo_processing import DERIVATIVE_FORMATS, delete_photo_files, get_derivative_name
+from .photo_storage import get_photo_name
+
+logger = logging.getLogger(__name__)
+
+NEW_LAYOUT_PREFIX = 'photos' + os.sep
+
+
+def get_legacy_derivative_name(photo, size, extension):
+    """Storage name of a derivative in the per-place layout."""
+    return os.path.join(str(photo.place_id), 'photos', 'derivatives', f"{photo.id}_{size}.{extension}")
+
+
+def plan_photo_moves(photo) -> List[Tuple[str, str]]:
+    """
+    (old name, new name) pairs for a photo's existing files.
+    """
+    storage = photo.image.storage
+    moves = [(photo.image.name, get_photo_name(photo.id, photo.image.name))]
+    for size in photo.derivatives or {}:
+        for extension in DERIVATIVE_FORMATS:
+            old_name = get_legacy_derivative_name(photo, size, extension)
+            if storage.exists(old_name):
+                moves.append((old_name, get_derivative_name(photo, size, extension)))
+    return moves
+
+
+def _copy(storage, old_name, new_name):
+    # A copy left by an interrupted run may be incomplete
+    if storage.exists(new_name):
+        storage.delete(new_name)
+    with storage.open(old_name, 'rb') as f:
+        saved = storage.save(new_name, f)
+    if saved != new_name:
+        raise RuntimeError(f"Storage saved {old_name} as {saved} instead of {new_name}")
+
+
+def move_photo_files(photo) -> int:
+    """
+    Move one photo's original and derivatives to the fan-out layout.
+
+    Returns:
+        Number of files moved
+    """
+    storage = photo.image.storage
+    moves = plan_photo_moves(photo)
+    for old_name, new_name in moves:
+        _copy(storage, old_name, new_name)
+
+    old_url = storage.url(photo.image.name)
+    new_name = moves[0][1]
+    derivatives = {
+        size: {
+            **entry,
+            **{
+                extension: storage.url(get_derivative_name(photo, size, extension))
+                for extension in DERIVATIVE_FORMATS if extension in entry
+            }
+        }
+        for size, entry in (photo.derivatives or {}).items()
+    }
+    updates = {'image': new_name, 'derivatives': derivatives}
+    if photo.url == old_url:
+        updates['url'] = storage.url(new_name)
+
+    old_names = [old_name for old_name, _ in moves]
+    with transaction.atomic():
+        PlacePhoto.objects.filter(pk=photo.pk).update(**updates)
+        transaction.on_commit(lambda: delete_photo_files(storage, old_names))
+    return len(moves)
+
+
+def migrate_photo_layout(batch_size=500, dry_run=False, stdout=None) -> Dict[str, int]:
+    """
+    Move all photos that are not yet in the fan-out layout.
+
+    Returns:
+        {"photos": <photos moved>, "files": <files moved>, "failed": <photos left as they were>}
+    """
+    summary = {'photos': 0, 'files': 0, 'failed': 0}
+    queryset = (
+        PlacePhoto.objects
+        .exclude(image__isnull=True)
+        .exclude(image='')
+        .exclude(image__startswith=NEW_LAYOUT_PREFIX)
+        .only('id', 'place_id', 'image', 'url', 'derivatives')
+    )
+    for photo in iterate_in_chunks(queryset, chunk_size=batch_size):
+        if dry_run:
+            for old_name, new_name in plan_photo_moves(photo):
+                if stdout:
+                    stdout.write(f'{old_name} -> {new_name}')
+                summary['files'] += 1
+            summary['photos'] += 1
+            continue
+        try:
+            summary['files'] += move_photo_files(photo)
+            summary['photos'] += 1
+        except Exception as e:
+            logger.warning(f"Could not move files of photo {photo.id}: {str(e)}")
+            summary['failed'] += 1
+    return summary
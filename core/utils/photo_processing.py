@@ -0,0 +1,165 @@
+"""
+Background processing of uploaded place photos.
+
+After upload, workers generate a responsive set of derivatives (see
+PHOTO_DERIVATIVE_SIZES) in WebP and JPEG and record their URLs and dimensions
+on the photo, so list endpoints can serve the smallest adequate asset instead
+of the full-size original.
+
+JPEG originals are opened in Pillow's draft mode, which lets the decoder
+downscale by 1/2, 1/4 or 1/8 while decoding, so a 4000px upload is never fully
+decoded to produce a 1600px derivative. Each smaller size is then resized from
+the previous one rather than from the original.
+"""
+import logging
+import os
+from io import BytesIO
+from typing import Dict
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from .photo_hashing import (
+    find_duplicate, hash_fields, reject_duplicate, set_photo_hashes, should_reject_duplicates
+)
+from .photo_storage import get_photo_dir
+
+logger = logging.getLogger(__name__)
+
+EXIF_ORIENTATION = 0x0112
+# Orientations that rotate the image by 90 degrees
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'method': 4}),
+    'jpeg': ('JPEG', {'optimize': True, 'progressive': True}),
+}
+
+
+def get_derivative_name(photo, size, extension):
+    """Storage name of a derivative, next to the original."""
+    return os.path.join(get_photo_dir(photo.id), f"{photo.id}_{size}.{extension}")
+
+
+def _to_rgb(img):
+    """Flatten transparency onto white; JPEG has no alpha channel."""
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def _encode(img, extension):
+    image_format, options = DERIVATIVE_FORMATS[extension]
+    quality = settings.PHOTO_DERIVATIVE_QUALITY[extension]
+    buffer = BytesIO()
+    img.save(buffer, format=image_format, quality=quality, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def _save(storage, name, content):
+    # Reprocessing replaces the previous derivative under the same name
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def _largest_first(sizes):
+    return sorted(sizes.items(), key=lambda item: item[1][0] * item[1][1], reverse=True)
+
+
+def open_for_resizing(image_file, max_box):
+    """
+    Decode an image for resizing to at most max_box.
+
+    Returns:
+        (width, height) of the original as displayed (EXIF orientation applied),
+        and the decoded RGB image
+    """
+    with Image.open(image_file) as img:
+        width, height = img.size
+        if img.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+            width, height = height, width
+        if img.format == 'JPEG':
+            # Let the decoder downscale while decoding; keeps at least max_box
+            img.draft('RGB', max_box)
+        working = ImageOps.exif_transpose(img)
+        if working is img:
+            working = img.copy()
+    return (width, height), _to_rgb(working)
+
+
+def process_photo(photo) -> Dict:
+    """
+    Hash the photo, then generate its derivatives and record them on the photo.
+
+    Near-duplicates of an earlier photo of the place are flagged; with
+    PHOTO_DUPLICATE_ACTION = 'reject' they are rejected instead and no
+    derivatives are generated.
+
+    Returns:
+        The recorded derivatives
+    """
+    if not photo.image:
+        return {}
+
+    storage = photo.image.storage
+    sizes = _largest_first(settings.PHOTO_DERIVATIVE_SIZES)
+    with storage.open(photo.image.name, 'rb') as image_file:
+        (width, height), working = open_for_resizing(image_file, sizes[0][1])
+
+    photo.width = width
+    photo.height = height
+    set_photo_hashes(photo, working)
+    photo.duplicate_of = find_duplicate(photo)
+    photo.processing_error = ''
+    update_fields = ['width', 'height', 'duplicate_of', 'processed_at', 'processing_error'] + hash_fields()
+
+    if photo.duplicate_of is not None and should_reject_duplicates():
+        photo.processed_at = timezone.now()
+        photo.save(update_fields=update_fields)
+        reject_duplicate(photo)
+        logger.info(f"Rejected photo {photo.id} as a duplicate of {photo.duplicate_of_id}")
+        return {}
+
+    derivatives = {}
+    for size, box in sizes:
+        # Each size is resized from the previous (larger) one
+        working.thumbnail(box, Image.Resampling.LANCZOS)
+        entry = {'width': working.width, 'height': working.height}
+        for extension in DERIVATIVE_FORMATS:
+            name = _save(storage, get_derivative_name(photo, size, extension), _encode(working, extension))
+            entry[extension] = storage.url(name)
+        derivatives[size] = entry
+
+    photo.derivatives = derivatives
+    photo.processed_at = timezone.now()
+    photo.save(update_fields=update_fields + ['derivatives'])
+    logger.info(f"Generated {len(derivatives)} derivative sizes for photo {photo.id}")
+    return derivatives
+
+
+def get_photo_file_names(photo):
+    """Storage names of a photo's original and derivatives."""
+    if not photo.image:
+        return []
+    return [photo.image.name] + [
+        get_derivative_name(photo, size, extension)
+        for size in settings.PHOTO_DERIVATIVE_SIZES
+        for extension in DERIVATIVE_FORMATS
+    ]
+
+
+def delete_photo_files(storage, names):
+    """Delete photo files, e.g. the names collected before deleting the photo."""
+    for name in names:
+        try:
+            storage.delete(name)
+        except OSError as e:
+            logger.warning(f"Could not delete photo file {name}: {str(e)}")
@@ -9,6 +9,8 @@ from PIL import Image
 from django.core.exceptions import ValidationError
 from django.core.files.base import ContentFile
 from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import MultiPartParserError
 from django.conf import settings
 
 # Constants for validation
@@ -16,12 +18,21 @@ MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 MIN_DIMENSION = 300
 MAX_DIMENSION = 4000
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP'}
 THUMBNAIL_SIZE = (200, 200)
 
+# Header-only validation reads at most this much of an upload
+HEADER_CHUNK_SIZE = 8 * 1024
+HEADER_READ_LIMIT = 512 * 1024
+# Room for multipart boundaries and the other form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
 class PlacePhotoStorage(FileSystemStorage):
     """
     Custom storage class for place photos.
-    Organizes photos in a structured directory pattern: 'places/{place_id}/photos/'.
+    Stores files under PLACE_PHOTOS_ROOT (MEDIA_ROOT/places) in fan-out
+    directories keyed by photo id (see get_photo_dir), served from
+    MEDIA_URL/places/.
     
     Future Migration to S3:
     To migrate to S3, create a new storage class inheriting from S3Boto3Storage:
@@ -34,28 +45,81 @@ class PlacePhotoStorage(FileSystemStorage):
         default_acl = 'private'
     """
     
-    def __init__(self):
-        super().__init__(location=settings.PLACE_PHOTOS_ROOT)
+    @property
+    def base_location(self):
+        # Read the setting on each access so it can be overridden (e.g. in tests)
+        return self._value_or_setting(self._location, settings.PLACE_PHOTOS_ROOT)
+    
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+    
+    @property
+    def base_url(self):
+        return self._value_or_setting(self._base_url, f"{settings.MEDIA_URL}places/")
     
     def get_available_name(self, name, max_length=None):
         """
         Returns a filename that's free on the target storage system.
-        Adds a suffix to the filename if it already exists.
+        
+        Photo names embed the photo's UUID, so a clash only happens when the
+        same photo is saved again. One existence check is made, and a clash is
+        resolved with a random suffix instead of probing "_1", "_2", ... in
+        turn; the cost no longer grows with the number of files in a directory.
         """
-        name = self._normalize_name(name)
+        name = os.path.normpath(name)
+        if not self.exists(name):
+            return name
         dir_name, file_name = os.path.split(name)
         file_root, file_ext = os.path.splitext(file_name)
-        
-        counter = 1
-        while self.exists(name):
-            name = os.path.join(dir_name, f"{file_root}_{counter}{file_ext}")
-            counter += 1
-        
-        return name
+        return os.path.join(dir_name, self.get_alternative_name(file_root, file_ext))
+
+def get_place_photo_storage():
+    """Storage of PlacePhoto files (callable so migrations don't freeze the backend)."""
+    return place_photo_storage
+
+place_photo_storage = PlacePhotoStorage()
+
+def read_image_header(file, limit=HEADER_READ_LIMIT):
+    """
+    Identify an image from its header without decoding the pixel data.
+
+    Reads the file in growing chunks and stops as soon as Pillow can parse the
+    header (JPEG markers up to the frame header, PNG IHDR, WebP VP8 header),
+    which for almost every photo is within the first few kilobytes; EXIF
+    blocks push it further, hence the limit.
+
+    Returns:
+        (format, (width, height)), e.g. ('JPEG', (1200, 800))
+
+    Raises:
+        ValidationError: If no supported image header is found within the limit
+    """
+    file.seek(0)
+    header = b''
+    chunk_size = HEADER_CHUNK_SIZE
+    try:
+        while len(header) < limit:
+            chunk = file.read(min(chunk_size, limit - len(header)))
+            header += chunk
+            try:
+                # Image.open only parses the header; pixels are decoded lazily
+                with Image.open(BytesIO(header)) as img:
+                    return img.format, img.size
+            except Image.DecompressionBombError:
+                raise ValidationError('Invalid image file')
+            except Exception:
+                if not chunk:
+                    break
+            chunk_size *= 2
+        raise ValidationError('Invalid image file')
+    finally:
+        file.seek(0)
 
 def validate_photo_file(file):
     """
     Validates photo files for size, type, and dimensions.
+    Only the image header is read; decoding is left to the background workers.
     Raises ValidationError if the file doesn't meet requirements.
     """
     # Check file size
@@ -71,26 +135,51 @@ def validate_photo_file(file):
             f'Only {", ".join(ALLOWED_EXTENSIONS)} files are allowed'
         )
     
+    # Check the actual format, not just the extension
+    image_format, (width, height) = read_image_header(file)
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(
+            f'Only {", ".join(ALLOWED_EXTENSIONS)} files are allowed'
+        )
+    
     # Check image dimensions
-    try:
-        img = Image.open(file)
-        width, height = img.size
-        
-        if width < MIN_DIMENSION or height < MIN_DIMENSION:
-            raise ValidationError(
-                f'Image dimensions must be at least {MIN_DIMENSION}x{MIN_DIMENSION} pixels'
+    if width < MIN_DIMENSION or height < MIN_DIMENSION:
+        raise ValidationError(
+            f'Image dimensions must be at least {MIN_DIMENSION}x{MIN_DIMENSION} pixels'
+        )
+    
+    if width > MAX_DIMENSION or height > MAX_DIMENSION:
+        raise ValidationError(
+            f'Image dimensions must not exceed {MAX_DIMENSION}x{MAX_DIMENSION} pixels'
+        )
+
+class PhotoUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams uploaded photos to a temporary file in chunks and aborts as soon
+    as the upload exceeds MAX_FILE_SIZE, instead of buffering the whole body
+    in the request worker's memory first.
+    """
+    
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Reject before reading anything when the body is obviously too large
+        if content_length and content_length > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+            raise MultiPartParserError(
+                f'File size must not exceed {MAX_FILE_SIZE/1024/1024}MB'
             )
-        
-        if width > MAX_DIMENSION or height > MAX_DIMENSION:
-            raise ValidationError(
-                f'Image dimensions must not exceed {MAX_DIMENSION}x{MAX_DIMENSION} pixels'
+        return super().handle_raw_input(input_data, META, content_length, boundary, encoding)
+    
+    def new_file(self, *args, **kwargs):
+        self.received = 0
+        return super().new_file(*args, **kwargs)
+    
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > MAX_FILE_SIZE:
+            self.file.close()
+            raise MultiPartParserError(
+                f'File size must not exceed {MAX_FILE_SIZE/1024/1024}MB'
             )
-        
-        # Reset file pointer for future reads
-        file.seek(0)
-        
-    except Exception as e:
-        raise ValidationError('Invalid image file') from e
+        return super().receive_data_chunk(raw_data, start)
 
 def generate_thumbnail(image_file):
     """
@@ -98,6 +187,9 @@ def generate_thumbnail(image_file):
     Returns the thumbnail as a ContentFile.
     """
     img = Image.open(image_file)
+    if img.format == 'JPEG':
+        # Downscale while decoding instead of decoding the full image
+        img.draft('RGB', THUMBNAIL_SIZE)
     
     # Convert to RGB if necessary (for PNG/WEBP support)
     if img.mode in ('RGBA', 'P'):
@@ -115,20 +207,35 @@ def generate_thumbnail(image_file):
     
     return thumb_file
 
+def get_photo_dir(photo_id):
+    """
+    Fan-out directory of a photo's files, relative to PlacePhotoStorage.
+    Format: photos/{id[0:2]}/{id[2:4]}
+    
+    The first four hex digits of the UUID spread photos evenly over 65,536
+    directories, so no directory grows with a popular place.
+    """
+    photo_id = str(photo_id)
+    return os.path.join('photos', photo_id[0:2], photo_id[2:4])
+
+def get_photo_name(photo_id, filename):
+    """
+    Storage name of a photo original, relative to PlacePhotoStorage.
+    Format: photos/{id[0:2]}/{id[2:4]}/{photo_id}{ext}
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    return os.path.join(get_photo_dir(photo_id), f"{photo_id}{ext}")
+
 def get_photo_path(instance, filename):
     """
     Generates the upload path for place photos.
-    Format: places/{place_id}/photos/{filename}
     """
-    ext = os.path.splitext(filename)[1].lower()
-    new_filename = f"{instance.place.id}_{instance.order}{ext}"
-    return os.path.join('places', str(instance.place.id), 'photos', new_filename)
+    return get_photo_name(instance.id, filename)
 
 def get_thumbnail_path(instance, filename):
     """
-    Generates the upload path for photo thumbnails.
-    Format: places/{place_id}/photos/thumbnails/{filename}
+    Generates the upload path for photo thumbnails, relative to PlacePhotoStorage.
+    Format: photos/{id[0:2]}/{id[2:4]}/{photo_id}_thumb{ext}
     """
     ext = os.path.splitext(filename)[1].lower()
-    new_filename = f"{instance.place.id}_{instance.order}_thumb{ext}"
-    return os.path.join('places', str(instance.place.id), 'photos', 'thumbnails', new_filename) 
\ No newline at end of file
+    return os.path.join(get_photo_dir(instance.id), f"{instance.id}_thumb{ext}")
@@ -0,0 +1,195 @@
+"""
+Facet counts for the place search filters.
+
+For any combination of the combined search filters (q, type, district,
+minPrice, maxPrice, features, allFeatures, excludeFeatures)
+get_place_facets() returns how many approved places match in each district,
+place type, price bucket and for the most common features. Each dimension is
+one grouped query. A dimension's own filter is left out when counting it, so
+a multi-select filter still shows the counts of its other options. Results are cached per filter signature for
+PLACE_FACETS_CACHE_TIMEOUT seconds.
+"""
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, FloatField, Q, Value
+
+from ..choices import DISTRICT_CHOICES, PLACE_TYPE_CHOICES, PRICE_LEVEL_CHOICES
+from ..models import Place, PlaceFeature
+from .feature_bits import filter_by_features, parse_feature_ids
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'place_facets'
+
+
+def _get_cache_timeout():
+    return getattr(settings, 'PLACE_FACETS_CACHE_TIMEOUT', 300)
+
+
+def _get_top_features():
+    return getattr(settings, 'PLACE_FACETS_TOP_FEATURES', 20)
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_search_filters(params) -> Dict:
+    """Normalize the combined search filter parameters (invalid values are dropped)."""
+    valid_districts = {value for value, _ in DISTRICT_CHOICES}
+    districts = [d.strip() for d in (params.get('district') or '').split(',')]
+    return {
+        'q': (params.get('q') or '').strip(),
+        'type': params.get('type') or None,
+        'district': sorted({d for d in districts if d in valid_districts}),
+        'minPrice': _to_int(params.get('minPrice')),
+        'maxPrice': _to_int(params.get('maxPrice')),
+        'features': sorted(set(parse_feature_ids(params.get('features')))),
+        'allFeatures': sorted(set(parse_feature_ids(params.get('allFeatures')))),
+        'excludeFeatures': sorted(set(parse_feature_ids(params.get('excludeFeatures')))),
+    }
+
+
+def search_text(queryset, query):
+    """
+    Full-text search over name, description and address, annotated with rank;
+    falls back to icontains matching when nothing ranks.
+    """
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    search_vector = (
+        SearchVector('name', weight='A', config='english') +
+        SearchVector('description', weight='B', config='english') +
+        SearchVector('address', weight='C', config='english')
+    )
+    search_query = SearchQuery(query, search_type='plain', config='english')
+    ranked = queryset.annotate(rank=SearchRank(search_vector, search_query)).filter(rank__gt=0.1)
+    if ranked.exists():
+        return ranked
+
+    logger.info("No full-text results, falling back to icontains")
+    return queryset.filter(
+        Q(name__icontains=query) |
+        Q(description__icontains=query) |
+        Q(address__icontains=query)
+    ).annotate(rank=Value(0.1, output_field=FloatField()))
+
+
+def apply_search_filters(queryset, filters: Dict, exclude=None):
+    """Apply the parsed structured filters (not q), except the excluded dimension."""
+    if filters['type'] and exclude != 'place_type':
+        queryset = queryset.filter(place_type=filters['type'])
+    if filters['district'] and exclude != 'district':
+        queryset = queryset.filter(district__in=filters['district'])
+    if exclude != 'price_level':
+        if filters['minPrice'] is not None:
+            queryset = queryset.filter(price_level__gte=filters['minPrice'])
+        if filters['maxPrice'] is not None:
+            queryset = queryset.filter(price_level__lte=filters['maxPrice'])
+    if exclude != 'features':
+        queryset = filter_by_features(
+            queryset,
+            any_of=filters['features'],
+            all_of=filters['allFeatures'],
+            none_of=filters['excludeFeatures'],
+        )
+    return queryset
+
+
+def searchable_places():
+    return Place.objects.filter(moderation_status='APPROVED', draft=False)
+
+
+def _matching_places(filters: Dict, exclude=None):
+    queryset = searchable_places()
+    if filters['q']:
+        # Count over plain rows; grouping a ranked queryset would group by rank
+        queryset = searchable_places().filter(pk__in=search_text(queryset, filters['q']).values('pk'))
+    return apply_search_filters(queryset, filters, exclude=exclude).order_by()
+
+
+def count_by(queryset, field) -> Dict:
+    """{value: count} of a queryset grouped by one field, in one query."""
+    return {
+        row[field]: row['count']
+        for row in queryset.order_by().values(field).annotate(count=Count('pk'))
+    }
+
+
+def _choice_counts(counts: Dict, choices) -> List[Dict]:
+    return [{'value': value, 'name': name, 'count': counts.get(value, 0)} for value, name in choices]
+
+
+def price_bucket(price_level) -> Optional[int]:
+    """The PRICE_LEVEL_CHOICES value whose range includes price_level."""
+    if price_level is None:
+        return None
+    for value, _ in PRICE_LEVEL_CHOICES:
+        if price_level <= value:
+            return value
+    return PRICE_LEVEL_CHOICES[-1][0]
+
+
+def _price_counts(queryset) -> List[Dict]:
+    buckets = {}
+    for price_level, count in count_by(queryset, 'price_level').items():
+        bucket = price_bucket(price_level)
+        if bucket is not None:
+            buckets[bucket] = buckets.get(bucket, 0) + count
+    return _choice_counts(buckets, PRICE_LEVEL_CHOICES)
+
+
+def _feature_counts(queryset, limit) -> List[Dict]:
+    rows = (
+        PlaceFeature.objects
+        .filter(place_id__in=queryset.values('pk'))
+        .values('feature_id', 'feature__name', 'feature__feature_type')
+        .annotate(count=Count('pk'))
+        .order_by('-count', 'feature__name')[:limit]
+    )
+    return [
+        {
+            'id': row['feature_id'],
+            'name': row['feature__name'],
+            'featureType': row['feature__feature_type'],
+            'count': row['count'],
+        }
+        for row in rows
+    ]
+
+
+def compute_place_facets(filters: Dict) -> Dict:
+    """Facet counts for parsed filters (uncached)."""
+    return {
+        'count': _matching_places(filters).count(),
+        'district': _choice_counts(count_by(_matching_places(filters, exclude='district'), 'district'), DISTRICT_CHOICES),
+        'placeType': _choice_counts(
+            count_by(_matching_places(filters, exclude='place_type'), 'place_type'), PLACE_TYPE_CHOICES
+        ),
+        'priceLevel': _price_counts(_matching_places(filters, exclude='price_level')),
+        'features': _feature_counts(_matching_places(filters, exclude='features'), _get_top_features()),
+    }
+
+
+def get_cache_key(filters: Dict) -> str:
+    signature = hashlib.md5(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return f'{CACHE_PREFIX}:{signature}'
+
+
+def get_place_facets(params) -> Dict:
+    """Facet counts for the given query parameters, cached per filter signature."""
+    filters = parse_search_filters(params)
+    key = get_cache_key(filters)
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_place_facets(filters)
+        cache.set(key, facets, _get_cache_timeout())
+    return facets
@@ -0,0 +1,202 @@
+"""
+Streaming bulk import of places from CSV or JSON Lines.
+
+Onboarding a city used to mean saving places one at a time, each save
+running clean(), a slug uniqueness loop and the signals. import_places()
+instead reads rows lazily and handles them in batches:
+
+1. every row is validated in memory (PlaceImportRowSerializer);
+2. slugs are allocated in memory against the set of existing slugs, loaded
+   with one query at the start of the import;
+3. features are matched by name against one query of the catalog, and
+   missing ones are created with one bulk import per batch;
+4. places (with their feature_bits) and their PlaceFeature links are
+   inserted with bulk_create;
+5. places without coordinates are queued for geocoding.
+
+Each batch commits on its own and the number of rows consumed so far is
+passed to on_batch, so an interrupted import can resume with start=<rows
+consumed> (the import_places command keeps this in a checkpoint file).
+
+Imported places skip the post_save signals: the importer is the moderator,
+so there is no one to notify.
+"""
+import csv
+import io
+import json
+import logging
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Feature, Place, PlaceFeature
+from .background import run_in_background
+from .feature_import import import_features
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """'csv' or 'jsonl' from a file name, or None."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    return None
+
+
+def iter_rows(stream, file_format: str) -> Iterator[Dict]:
+    """
+    Rows of a text stream, parsed lazily. Empty CSV cells are dropped so they
+    count as missing rather than as empty strings; a JSON Lines row that is
+    not an object is yielded as None.
+    """
+    if file_format == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value for key, value in row.items() if key and value not in ('', None)}
+    elif file_format == 'jsonl':
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+            yield row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+
+def open_rows(binary_file, file_format: str) -> Iterator[Dict]:
+    """Rows of a binary file (e.g. an upload), decoded as UTF-8 on the fly."""
+    return iter_rows(io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline=''), file_format)
+
+
+def _feature_map() -> Dict[str, Tuple[str, Optional[int]]]:
+    """{lowercased name: (feature id, bit)} of the catalog."""
+    return {
+        name.lower(): (pk, bit)
+        for pk, name, bit in Feature.objects.order_by('feature_type').values_list('pk', 'name', 'bit')
+    }
+
+
+def _validate(rows, first_row: int):
+    from ..serializers import PlaceImportRowSerializer
+
+    valid, errors = [], []
+    for offset, row in enumerate(rows):
+        number = first_row + offset
+        if row is None:
+            errors.append({'row': number, 'errors': {'non_field_errors': ['Not a JSON object.']}})
+            continue
+        serializer = PlaceImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors.append({'row': number, 'errors': serializer.errors})
+    return valid, errors
+
+
+def _import_batch(valid, user, approve, taken_slugs, features) -> Tuple[int, int, list]:
+    """Insert one batch of validated rows; returns (created, geocoding queued, errors)."""
+    missing = sorted({
+        name for _, data in valid for name in data.get('features', []) if name.lower() not in features
+    })
+    if missing:
+        import_features([{'name': name, 'featureType': 'other'} for name in missing])
+        features.update(_feature_map())
+
+    now = timezone.now()
+    places, links = [], []
+    for number, data in valid:
+        feature_names = data.pop('features', [])
+        place = Place(
+            **data,
+            slug=Place.allocate_slug(Place.slug_base(data['name']), taken_slugs),
+            created_by=user,
+            contributor_id=user.id if user else None,
+            draft=False,
+            moderation_status='APPROVED' if approve else 'PENDING',
+            moderated_at=now if approve else None,
+            moderator=user if approve else None,
+        )
+        matched = {features[name.lower()] for name in feature_names if name.lower() in features}
+        place.feature_bits = sorted(bit for _, bit in matched if bit is not None)
+        places.append((number, place))
+        links.extend(PlaceFeature(place=place, feature_id=feature_id) for feature_id, _ in matched)
+
+    # A slug taken concurrently makes its row conflict; it is reported, not raised
+    Place.objects.bulk_create([place for _, place in places], ignore_conflicts=True)
+    created_ids = set(Place.objects.filter(pk__in=[place.pk for _, place in places]).values_list('pk', flat=True))
+    errors = [
+        {'row': number, 'errors': {'slug': [f'Slug {place.slug} was taken meanwhile; import the row again.']}}
+        for number, place in places if place.pk not in created_ids
+    ]
+    PlaceFeature.objects.bulk_create(
+        [link for link in links if link.place_id in created_ids], ignore_conflicts=True
+    )
+
+    to_geocode = [str(place.pk) for _, place in places if place.pk in created_ids and place.latitude is None]
+    if to_geocode:
+        from ..tasks import geocode_places
+        run_in_background(geocode_places, to_geocode)
+    return len(created_ids), len(to_geocode), errors
+
+
+def import_places(
+    rows: Iterable[Optional[Dict]],
+    user=None,
+    approve=True,
+    batch_size=500,
+    start=0,
+    on_batch: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Import places from an iterable of rows (see iter_rows).
+
+    Args:
+        rows: Row dicts with PlaceImportRowSerializer fields
+        user: Recorded as creator (and moderator when approve is set)
+        approve: Publish the places as approved; otherwise they wait for moderation
+        batch_size: Rows validated and inserted per transaction
+        start: Rows to skip, e.g. the "processed" count of an interrupted import
+        on_batch: Called with the running summary after each committed batch
+
+    Returns:
+        {"processed": <rows consumed, including skipped ones>, "created",
+        "geocoding": <places queued for geocoding>, "errors": [{"row", "errors"}]}
+        Row numbers start at 1.
+    """
+    rows = iter(rows)
+    summary = {'processed': start, 'created': 0, 'geocoding': 0, 'errors': []}
+    if start:
+        # Consume without validating
+        for _ in islice(rows, start):
+            pass
+
+    taken_slugs = set(Place.objects.exclude(slug__isnull=True).values_list('slug', flat=True))
+    features = _feature_map()
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        valid, errors = _validate(batch, first_row=summary['processed'] + 1)
+        with transaction.atomic():
+            created, geocoding, conflicts = _import_batch(valid, user, approve, taken_slugs, features)
+        summary['processed'] += len(batch)
+        summary['created'] += created
+        summary['geocoding'] += geocoding
+        summary['errors'].extend(sorted(errors + conflicts, key=lambda error: error['row']))
+        if on_batch:
+            on_batch(summary)
+
+    logger.info(
+        f"Imported {summary['created']} places from {summary['processed'] - start} rows "
+        f"({len(summary['errors'])} errors)"
+    )
+    return summary
@@ -0,0 +1,158 @@
+"""
+EXPLAIN-based checks that the hot read paths are served by their indexes.
+
+Each query shape mirrors a filter/ordering combination used by the views and is
+paired with the index declared for it (see the Meta.indexes of Place, Review
+and PlacePhoto). A shape passes when the declared index exists and the plan
+reads the rows through an index condition on the shape's filter columns, in
+order (no sort step). Which of several suitable indexes the planner picks
+depends on its statistics, so the index name itself is not checked. The shapes
+are checked by core/tests/test_query_plans.py against a seeded dataset, and can
+be checked against a real database with ``python manage.py check_query_plans``.
+"""
+import re
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from django.db import connection, transaction
+
+from ..models import Place, PlacePhoto, Review
+
+
+class QueryShape(NamedTuple):
+    """A query shape, the index declared for it and the columns it filters on."""
+    build: Callable
+    index: str
+    columns: Tuple[str, ...] = ()
+
+
+class PlanCheck(NamedTuple):
+    """Outcome of checking one query shape."""
+    name: str
+    index: str
+    index_exists: bool
+    uses_index: bool
+    plan: str
+
+
+def _visible_places():
+    return Place.objects.filter(moderation_status='APPROVED', draft=False)
+
+
+# Builders take a sample place (for the per-place shapes) and return a queryset
+QUERY_SHAPES: Dict[str, QueryShape] = {
+    'places_recent': QueryShape(
+        lambda place: _visible_places().order_by('-created_at')[:20],
+        'place_visible_created_idx',
+    ),
+    'places_top_rated': QueryShape(
+        lambda place: _visible_places().order_by('-avg_rating')[:20],
+        'place_visible_rating_idx',
+    ),
+    'places_by_type': QueryShape(
+        lambda place: _visible_places().filter(place_type=place.place_type).order_by('-created_at')[:20],
+        'place_visible_type_idx',
+        ('place_type',),
+    ),
+    'places_by_district': QueryShape(
+        lambda place: _visible_places().filter(district=place.district).order_by('-created_at')[:20],
+        'place_visible_district_idx',
+        ('district',),
+    ),
+    'places_by_owner': QueryShape(
+        lambda place: Place.objects.filter(created_by_id=place.created_by_id).order_by('-created_at')[:20],
+        'place_owner_created_idx',
+        ('created_by_id',),
+    ),
+    'place_reviews': QueryShape(
+        lambda place: Review.objects.filter(place=place, moderation_status='APPROVED').order_by('-created_at')[:20],
+        'review_place_approved_idx',
+        ('place_id',),
+    ),
+    'place_photos': QueryShape(
+        lambda place: PlacePhoto.objects.filter(place=place, moderation_status='APPROVED').order_by('-uploaded_at')[:20],
+        'photo_place_approved_idx',
+        ('place_id',),
+    ),
+}
+
+# PostgreSQL plan nodes: "Sort  (cost=...", "->  Incremental Sort  (cost=..."
+PG_SORT_RE = re.compile(r'^\s*(->\s+)?(Incremental )?Sort\s+\(', re.MULTILINE)
+
+
+def explain_query(queryset, prefer_indexes=False) -> str:
+    """
+    Return the database's plan for a queryset.
+
+    Args:
+        prefer_indexes: Disable sequential scans, bitmap scans and explicit
+            sorts for the statement (PostgreSQL). On small seeded datasets
+            those are often cheapest, so this shows whether an index can
+            serve the query in order at scale.
+    """
+    if prefer_indexes and connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for setting in ('enable_seqscan', 'enable_bitmapscan', 'enable_sort'):
+                    cursor.execute(f'SET LOCAL {setting} = off')
+            return queryset.explain()
+    return queryset.explain()
+
+
+def plan_uses_index(plan, columns=(), vendor=None) -> bool:
+    """
+    Whether a plan reads its rows through an index, with an index condition
+    on every one of columns, and returns them without a sort step.
+
+    Args:
+        vendor: Database vendor that produced the plan (defaults to the connection's)
+    """
+    lines = plan.splitlines()
+    if (vendor or connection.vendor) == 'postgresql':
+        scans = [line for line in lines if 'Index Scan' in line or 'Index Only Scan' in line]
+        conditions = [line for line in lines if 'Index Cond:' in line]
+        sorted_ = bool(PG_SORT_RE.search(plan))
+    else:
+        # SQLite: "SEARCH core_place USING INDEX place_visible_type_idx (place_type=?)"
+        scans = conditions = [line for line in lines if re.search(r'USING (COVERING )?INDEX', line)]
+        sorted_ = 'TEMP B-TREE' in plan
+    if not scans or sorted_:
+        return False
+    return all(any(column in line for line in conditions) for column in columns)
+
+
+def index_exists(model, name) -> bool:
+    with connection.cursor() as cursor:
+        return name in connection.introspection.get_constraints(cursor, model._meta.db_table)
+
+
+def check_query_plans(place=None, prefer_indexes=False, shapes=None) -> List[PlanCheck]:
+    """
+    EXPLAIN every query shape and report whether an index serves it.
+
+    Args:
+        place: Sample place for per-place shapes (defaults to the newest
+            approved place)
+        prefer_indexes: See explain_query()
+        shapes: Names of the shapes to check (defaults to all)
+
+    Returns:
+        One PlanCheck per shape
+    """
+    if place is None:
+        place = _visible_places().order_by('-created_at').first() or Place.objects.first()
+    if place is None:
+        return []
+
+    results = []
+    for name in shapes or QUERY_SHAPES:
+        shape = QUERY_SHAPES[name]
+        queryset = shape.build(place)
+        plan = explain_query(queryset, prefer_indexes=prefer_indexes)
+        results.append(PlanCheck(
+            name,
+            shape.index,
+            index_exists(queryset.model, shape.index),
+            plan_uses_index(plan, shape.columns),
+            plan,
+        ))
+    return results
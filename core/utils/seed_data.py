@@ -0,0 +1,355 @@
+"""
+Generate a large, realistic dataset for local performance work.
+
+Rows are written with bulk_create in batches, so no model save() logic or
+signals run: moderation notifications, points and rating updates that would
+normally cascade from each row are generated directly instead. The data is
+shaped like production traffic:
+
+- places are spread across DISTRICT_CHOICES around each district's centre
+- review, photo and helpful vote counts follow a long-tailed (Zipf-like)
+  popularity distribution, so a few places and reviews get most of the activity
+- timestamps are spread over the last SEED_HISTORY_DAYS days
+
+The same seed always produces the same dataset shape.
+"""
+import logging
+import random
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, List
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from ..choices import DISTRICT_CHOICES, FEATURE_TYPES, PLACE_TYPE_CHOICES, PRICE_LEVEL_CHOICES
+from ..models import (
+    Feature, HelpfulVote, Notification, Place, PlaceFeature, PlacePhoto, Review, UserPoints
+)
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+SEED_USERNAME_PREFIX = 'seed_user_'
+SEED_PASSWORD = 'seed-password'
+SEED_HISTORY_DAYS = 365
+
+# Approximate district centres (latitude, longitude)
+DISTRICT_CENTERS = {
+    'xinyi': (25.0330, 121.5654),
+    'datong': (25.0631, 121.5130),
+    'daan': (25.0268, 121.5434),
+    'shilin': (25.0930, 121.5246),
+    'wanhua': (25.0355, 121.4997),
+    'songshan': (25.0500, 121.5776),
+    'zhongshan': (25.0642, 121.5332),
+    'beitou': (25.1321, 121.4986),
+    'nangang': (25.0550, 121.6070),
+    'wenshan': (24.9897, 121.5703),
+    'neihu': (25.0837, 121.5923),
+    'zhongzheng': (25.0324, 121.5198),
+}
+TAIPEI_CENTER = (25.0375, 121.5637)
+
+PLACE_NAME_WORDS = (
+    ['Golden', 'Hidden', 'Little', 'Old', 'Night', 'Lucky', 'Blue', 'Red', 'Happy', 'Green'],
+    ['Dragon', 'Lantern', 'Garden', 'Alley', 'Harbor', 'Bamboo', 'Tiger', 'Moon', 'River', 'Tea'],
+)
+FEATURE_NAMES = ['WiFi', 'Parking', 'Vegan', 'Pet Friendly', 'Outdoor Seating', 'Delivery',
+                 'Takeaway', 'Mobile Payment', 'Credit Cards', 'Wheelchair Accessible',
+                 'Live Music', 'Late Night', 'Rooftop', 'Family Friendly', 'Quiet']
+REVIEW_COMMENTS = [
+    'Great atmosphere and friendly staff.',
+    'Food was good but the wait was long.',
+    'Would come back again.',
+    'A bit pricey for what you get.',
+    'Hidden gem, highly recommended!',
+    'Average experience overall.',
+]
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Let bulk_create keep the timestamps set on instances instead of now()."""
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                changed.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _zipf_weights(count, exponent=1.1):
+    """Long-tailed popularity weights: the first items get most of the activity."""
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def _bulk_create(model, objs, batch_size, **kwargs):
+    for start in range(0, len(objs), batch_size):
+        model.objects.bulk_create(objs[start:start + batch_size], **kwargs)
+    return len(objs)
+
+
+def _unique_pairs(rng, left, right, count, left_weights=None):
+    """Draw up to count distinct (left, right) pairs, left items weighted by popularity."""
+    pairs = set()
+    if not left or not right:
+        return []
+    count = min(count, len(left) * len(right))
+    attempts = 0
+    while len(pairs) < count and attempts < count * 5:
+        batch = rng.choices(left, weights=left_weights, k=count - len(pairs))
+        for item in batch:
+            pairs.add((item, rng.choice(right)))
+        attempts += len(batch)
+    return list(pairs)
+
+
+class DatasetSeeder:
+    """Builds the dataset; see seed_dataset()."""
+
+    def __init__(self, seed=42, batch_size=1000, now=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = now or timezone.now()
+
+    def random_time(self, after=None):
+        """A timestamp within the history window, after the given one if set."""
+        start = after or self.now - timedelta(days=SEED_HISTORY_DAYS)
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.uniform(0, span))
+
+    def create_users(self, count) -> List:
+        offset = User.objects.filter(username__startswith=SEED_USERNAME_PREFIX).count()
+        password = make_password(SEED_PASSWORD)
+        users = []
+        for i in range(offset, offset + count):
+            users.append(User(
+                username=f'{SEED_USERNAME_PREFIX}{i}',
+                email=f'{SEED_USERNAME_PREFIX}{i}@example.com',
+                password=password,
+                date_joined=self.random_time(),
+            ))
+        _bulk_create(User, users, self.batch_size)
+        return list(User.objects.filter(username__in=[u.username for u in users]))
+
+    def create_features(self, count) -> List[Feature]:
+        existing = list(Feature.objects.all())
+        # bulk_create skips Feature.save, which numbers the feature bits
+        first_bit = Feature.next_bit()
+        features = [
+            Feature(
+                name=f"{FEATURE_NAMES[i % len(FEATURE_NAMES)]}"
+                     f"{'' if i < len(FEATURE_NAMES) else f' {i // len(FEATURE_NAMES) + 1}'}",
+                feature_type=FEATURE_TYPES[i % len(FEATURE_TYPES)][0],
+                bit=first_bit + n,
+            )
+            for n, i in enumerate(range(len(existing), count))
+        ]
+        _bulk_create(Feature, features, self.batch_size)
+        return existing + features
+
+    def create_places(self, count, users) -> List[Place]:
+        districts = [key for key, _ in DISTRICT_CHOICES]
+        places = []
+        for i in range(count):
+            district = self.rng.choice(districts)
+            center_lat, center_lng = DISTRICT_CENTERS.get(district, TAIPEI_CENTER)
+            name = f"{self.rng.choice(PLACE_NAME_WORDS[0])} {self.rng.choice(PLACE_NAME_WORDS[1])} {i}"
+            status_roll = self.rng.random()
+            created_at = self.random_time()
+            place = Place(
+                name=name,
+                address=f'{self.rng.randint(1, 300)} Seed Road, {district.title()}',
+                district=district,
+                latitude=center_lat + self.rng.gauss(0, 0.01),
+                longitude=center_lng + self.rng.gauss(0, 0.01),
+                place_type=self.rng.choice(PLACE_TYPE_CHOICES)[0],
+                price_level=self.rng.choice(PRICE_LEVEL_CHOICES)[0],
+                description=f'{name} is a seeded place for benchmarking.',
+                moderation_status=(
+                    'APPROVED' if status_roll < 0.8 else 'PENDING' if status_roll < 0.9 else 'REJECTED'
+                ),
+                draft=self.rng.random() < 0.05,
+                created_by=self.rng.choice(users),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            place.slug = f'{place.id.hex[:12]}-seed-{i}'
+            places.append(place)
+        _bulk_create(Place, places, self.batch_size)
+        return places
+
+    def create_place_features(self, places, features) -> int:
+        if not features:
+            return 0
+        links = []
+        for place in places:
+            sample = self.rng.sample(features, min(len(features), self.rng.randint(0, 6)))
+            for feature in sample:
+                links.append(PlaceFeature(place=place, feature=feature))
+            place.feature_bits = sorted(feature.bit for feature in sample)
+        created = _bulk_create(PlaceFeature, links, self.batch_size, ignore_conflicts=True)
+        # bulk_create bypasses the signals that maintain feature_bits
+        Place.objects.bulk_update(places, ['feature_bits'], batch_size=self.batch_size)
+        return created
+
+    def create_reviews(self, count, places, users) -> List[Review]:
+        visible = [p for p in places if p.moderation_status == 'APPROVED' and not p.draft] or places
+        pairs = _unique_pairs(self.rng, visible, users, count, _zipf_weights(len(visible)))
+        reviews = []
+        for place, user in pairs:
+            created_at = self.random_time(after=place.created_at)
+            reviews.append(Review(
+                place=place,
+                user=user,
+                overall_rating=self.rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 5, 9, 6])[0],
+                food_quality=self.rng.randint(1, 5),
+                service=self.rng.randint(1, 5),
+                value=self.rng.randint(1, 5),
+                cleanliness=self.rng.randint(1, 5),
+                comment=self.rng.choice(REVIEW_COMMENTS),
+                moderation_status='APPROVED' if self.rng.random() < 0.85 else 'PENDING',
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        _bulk_create(Review, reviews, self.batch_size)
+        return reviews
+
+    def update_ratings(self, places, reviews):
+        ratings = defaultdict(list)
+        for review in reviews:
+            if review.moderation_status == 'APPROVED':
+                ratings[review.place.id].append(review.overall_rating)
+        changed = []
+        for place in places:
+            if ratings.get(place.id):
+                place.avg_rating = round(sum(ratings[place.id]) / len(ratings[place.id]), 2)
+                changed.append(place)
+        Place.objects.bulk_update(changed, ['avg_rating'], batch_size=self.batch_size)
+
+    def create_photos(self, count, places, users) -> int:
+        visible = [p for p in places if p.moderation_status == 'APPROVED'] or places
+        if not visible:
+            return 0
+        chosen = self.rng.choices(visible, weights=_zipf_weights(len(visible)), k=count)
+        photos = []
+        has_primary = set()
+        for n, place in enumerate(chosen):
+            uploaded_at = self.random_time(after=place.created_at)
+            photos.append(PlacePhoto(
+                place=place,
+                user=self.rng.choice(users),
+                url=f'places/{place.id}/photos/seed-{n}.jpg',
+                caption=f'Photo of {place.name}',
+                is_primary=place.id not in has_primary,
+                moderation_status='APPROVED' if self.rng.random() < 0.85 else 'PENDING',
+                uploaded_at=uploaded_at,
+                created_at=uploaded_at,
+                updated_at=uploaded_at,
+            ))
+            has_primary.add(place.id)
+        return _bulk_create(PlacePhoto, photos, self.batch_size)
+
+    def create_helpful_votes(self, count, reviews, users) -> int:
+        approved = [r for r in reviews if r.moderation_status == 'APPROVED']
+        pairs = _unique_pairs(self.rng, approved, users, count, _zipf_weights(len(approved)))
+        votes = []
+        helpful_counts = defaultdict(int)
+        for review, user in pairs:
+            if review.user_id == user.id:
+                continue
+            created_at = self.random_time(after=review.created_at)
+            votes.append(HelpfulVote(review=review, user=user, created_at=created_at, updated_at=created_at))
+            helpful_counts[review.id] += 1
+        _bulk_create(HelpfulVote, votes, self.batch_size)
+
+        for review in approved:
+            review.helpful_count = helpful_counts.get(review.id, 0)
+        Review.objects.bulk_update(approved, ['helpful_count'], batch_size=self.batch_size)
+        return len(votes)
+
+    def create_notifications(self, count, users) -> int:
+        types = [key for key, _ in Notification.NOTIFICATION_TYPES]
+        notifications = []
+        weights = _zipf_weights(len(users), exponent=0.8)
+        for user in self.rng.choices(users, weights=weights, k=count):
+            notification_type = self.rng.choice(types)
+            created_at = self.random_time()
+            notifications.append(Notification(
+                user=user,
+                notification_type=notification_type,
+                title=notification_type.replace('_', ' ').title(),
+                message='Seeded notification',
+                is_read=self.rng.random() < 0.7,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+        return _bulk_create(Notification, notifications, self.batch_size)
+
+    def create_points(self, count, users) -> int:
+        sources = [key for key, _ in UserPoints.POINT_SOURCES]
+        amounts = {'place': 10, 'review': 5, 'photo': 3, 'helpful_vote': 1, 'badge': 20, 'special': 50}
+        entries = []
+        totals = defaultdict(int)
+        for user in self.rng.choices(users, weights=_zipf_weights(len(users), exponent=0.8), k=count):
+            source_type = self.rng.choice(sources)
+            created_at = self.random_time()
+            entries.append(UserPoints(
+                user=user,
+                points=amounts[source_type],
+                source_type=source_type,
+                description=f'Seeded {source_type} points',
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+            totals[user.id] += amounts[source_type]
+        _bulk_create(UserPoints, entries, self.batch_size)
+
+        for user in users:
+            user.guide_points = totals.get(user.id, 0)
+        User.objects.bulk_update(users, ['guide_points'], batch_size=self.batch_size)
+        return len(entries)
+
+
+def seed_dataset(users=200, places=1000, reviews=10000, photos=3000, features=30,
+                 helpful_votes=20000, notifications=20000, points=10000,
+                 seed=42, batch_size=1000, now=None) -> Dict[str, int]:
+    """
+    Generate a benchmark dataset.
+
+    Returns:
+        Number of rows created per kind
+    """
+    seeder = DatasetSeeder(seed=seed, batch_size=batch_size, now=now)
+    summary = {}
+
+    with transaction.atomic(), _explicit_timestamps(
+        Place, Review, PlacePhoto, HelpfulVote, Notification, UserPoints
+    ):
+        user_rows = seeder.create_users(users)
+        summary['users'] = len(user_rows)
+        feature_rows = seeder.create_features(features)
+        summary['features'] = len(feature_rows)
+        place_rows = seeder.create_places(places, user_rows)
+        summary['places'] = len(place_rows)
+        summary['place_features'] = seeder.create_place_features(place_rows, feature_rows)
+        review_rows = seeder.create_reviews(reviews, place_rows, user_rows)
+        summary['reviews'] = len(review_rows)
+        seeder.update_ratings(place_rows, review_rows)
+        summary['photos'] = seeder.create_photos(photos, place_rows, user_rows)
+        summary['helpful_votes'] = seeder.create_helpful_votes(helpful_votes, review_rows, user_rows)
+        summary['notifications'] = seeder.create_notifications(notifications, user_rows)
+        summary['points'] = seeder.create_points(points, user_rows)
+
+    logger.info(f"Seeded dataset: {summary}")
+    return summary
@@ -0,0 +1,66 @@
+"""
+Cached revocation set for stateless JWT authentication.
+
+ClaimsJWTAuthentication (core/authentication.py) trusts the access token for
+who the user is, so it needs another way to refuse the tokens of suspended or
+deactivated users. The revocation set holds the ids of inactive users; it is
+loaded with one query and cached for TOKEN_REVOCATION_CACHE_TIMEOUT seconds,
+so authenticating a request is a cache read instead of a user lookup.
+
+Saving a user whose is_active no longer matches the set drops the cached set
+(see core/signals.py), which covers AdminUserStatusView and
+self_deactivate_view. queryset.update() sends no post_save, so suspend or
+reactivate users in bulk with set_users_active(). With a per-process cache, other processes pick up the
+change within the timeout; use a shared cache (CACHE_BACKEND) to make it
+immediate everywhere.
+"""
+from typing import FrozenSet
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+REVOKED_USERS_KEY = 'token_revocation:users'
+
+
+def _get_cache_timeout():
+    return getattr(settings, 'TOKEN_REVOCATION_CACHE_TIMEOUT', 60)
+
+
+def get_revoked_user_ids() -> FrozenSet[str]:
+    """Ids (as strings) of the users whose tokens are refused."""
+    revoked = cache.get(REVOKED_USERS_KEY)
+    if revoked is None:
+        User = get_user_model()
+        revoked = frozenset(str(pk) for pk in User.objects.filter(is_active=False).values_list('pk', flat=True))
+        cache.set(REVOKED_USERS_KEY, revoked, _get_cache_timeout())
+    return revoked
+
+
+def is_user_revoked(user_id) -> bool:
+    return str(user_id) in get_revoked_user_ids()
+
+
+def invalidate_revoked_users():
+    """Drop the cached set now and again once the transaction commits."""
+    cache.delete(REVOKED_USERS_KEY)
+    transaction.on_commit(lambda: cache.delete(REVOKED_USERS_KEY))
+
+
+def set_users_active(queryset, is_active: bool) -> int:
+    """
+    Activate or suspend the users of a queryset with one UPDATE and drop the
+    cached set. Returns the number of users changed.
+    """
+    updated = queryset.exclude(is_active=is_active).update(is_active=is_active)
+    if updated:
+        invalidate_revoked_users()
+    return updated
+
+
+def sync_user_revocation(user):
+    """Drop the cached set if it disagrees with the user's is_active."""
+    revoked = cache.get(REVOKED_USERS_KEY)
+    if revoked is not None and (str(user.pk) in revoked) == bool(user.is_active):
+        invalidate_revoked_users()
@@ -0,0 +1,293 @@
+"""
+Direct-to-storage photo uploads.
+
+Instead of streaming photo bodies through an app worker, clients:
+
+1. Request an upload ticket: a signed token naming the storage key the photo
+   will be written to, plus the request to send to object storage
+2. Upload the file straight to object storage with that request
+3. Call the completion endpoint with the ticket; the API checks the stored
+   object (size, header-only format and dimension checks), creates the
+   PlacePhoto and queues derivative processing
+
+The upload request comes from the backend in PHOTO_UPLOAD_BACKEND:
+
+- FilesystemUploadBackend (default) is a local stand-in for object storage: it
+  points clients at /api/uploads/photos/<ticket>/, which writes the body into
+  PlacePhotoStorage. Useful in development and tests.
+- S3UploadBackend issues presigned POSTs for S3 or an S3-compatible server
+  such as MinIO (PHOTO_UPLOAD_S3_ENDPOINT_URL). It requires boto3, and the
+  place photo storage must be configured to read from the same bucket.
+
+Each backend also provides the storage its uploads land in, which completion
+checks the object against.
+"""
+import logging
+import os
+import uuid
+from typing import Dict
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from .photo_storage import (
+    ALLOWED_EXTENSIONS, MAX_FILE_SIZE, get_photo_name, get_place_photo_storage, validate_photo_file
+)
+
+logger = logging.getLogger(__name__)
+
+TICKET_SALT = 'core.photo-upload-ticket'
+
+
+def _get_max_age():
+    return getattr(settings, 'PHOTO_UPLOAD_TICKET_MAX_AGE', 900)
+
+
+class FilesystemUploadBackend:
+    """Local stand-in for object storage: uploads are PUT to an API endpoint."""
+
+    def get_upload_request(self, ticket, key, content_type, request=None) -> Dict:
+        url = reverse('photo-upload-target', kwargs={'ticket': ticket})
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return {
+            'method': 'PUT',
+            'url': url,
+            'headers': {'Content-Type': content_type},
+            'fields': {},
+        }
+
+    def get_storage(self):
+        return get_place_photo_storage()
+
+
+class S3UploadBackend:
+    """Presigned POST uploads to S3 or an S3-compatible server (e.g. MinIO)."""
+
+    def __init__(self):
+        try:
+            import boto3
+        except ImportError as e:
+            raise ImproperlyConfigured('S3UploadBackend requires boto3 to be installed') from e
+
+        self.bucket = getattr(settings, 'PHOTO_UPLOAD_S3_BUCKET', None)
+        if not self.bucket:
+            raise ImproperlyConfigured('PHOTO_UPLOAD_S3_BUCKET must be set to use S3UploadBackend')
+        self.prefix = getattr(settings, 'PHOTO_UPLOAD_S3_PREFIX', 'places/')
+        self.endpoint_url = getattr(settings, 'PHOTO_UPLOAD_S3_ENDPOINT_URL', None)
+        self.region_name = getattr(settings, 'PHOTO_UPLOAD_S3_REGION', None)
+        self.client = boto3.client('s3', endpoint_url=self.endpoint_url, region_name=self.region_name)
+        self._storage = None
+
+    def get_upload_request(self, ticket, key, content_type, request=None) -> Dict:
+        # A presigned POST (unlike a presigned PUT) can enforce the size limit
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}{key}",
+            Fields={'Content-Type': content_type},
+            Conditions=[
+                {'Content-Type': content_type},
+                ['content-length-range', 1, MAX_FILE_SIZE],
+            ],
+            ExpiresIn=_get_max_age(),
+        )
+        return {
+            'method': 'POST',
+            'url': post['url'],
+            'headers': {},
+            'fields': post['fields'],
+        }
+
+    def get_storage(self):
+        """Storage over the upload bucket and prefix (django-storages by default)."""
+        if self._storage is None:
+            storage_path = getattr(
+                settings, 'PHOTO_UPLOAD_S3_STORAGE', 'storages.backends.s3boto3.S3Boto3Storage'
+            )
+            try:
+                storage_class = import_string(storage_path)
+            except ImportError as e:
+                raise ImproperlyConfigured(
+                    f'S3UploadBackend could not import {storage_path}; install django-storages'
+                ) from e
+            self._storage = storage_class(
+                bucket_name=self.bucket,
+                location=self.prefix.strip('/'),
+                endpoint_url=self.endpoint_url,
+                region_name=self.region_name,
+                file_overwrite=False,
+            )
+        return self._storage
+
+
+_backend = None
+
+
+def get_upload_backend():
+    """Return the configured upload backend (created once per process)."""
+    global _backend
+    if _backend is None:
+        backend_path = getattr(
+            settings, 'PHOTO_UPLOAD_BACKEND', 'core.utils.upload_tickets.FilesystemUploadBackend'
+        )
+        _backend = import_string(backend_path)()
+    return _backend
+
+
+def issue_upload_ticket(place, user, filename, content_type, request=None) -> Dict:
+    """
+    Allocate a storage key for a new photo and sign an upload ticket for it.
+
+    Returns:
+        {"ticket", "photoId", "upload": {"method", "url", "headers", "fields"}, "expiresIn"}
+
+    Raises:
+        ValidationError: If the file type is not allowed
+    """
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise ValidationError(f'Only {", ".join(ALLOWED_EXTENSIONS)} files are allowed')
+    if not (content_type or '').startswith('image/'):
+        raise ValidationError('Content type must be an image type')
+
+    photo_id = uuid.uuid4()
+    key = get_photo_name(photo_id, filename)
+    ticket = signing.dumps(
+        {'place': str(place.id), 'user': user.id, 'photo': str(photo_id), 'key': key},
+        salt=TICKET_SALT,
+        compress=True,
+    )
+    return {
+        'ticket': ticket,
+        'photoId': str(photo_id),
+        'upload': get_upload_backend().get_upload_request(ticket, key, content_type, request),
+        'expiresIn': _get_max_age(),
+    }
+
+
+def read_ticket(ticket, max_age=None) -> Dict:
+    """
+    Verify a ticket's signature and age.
+
+    Raises:
+        ValidationError: If the ticket is invalid or expired
+    """
+    try:
+        return signing.loads(ticket, salt=TICKET_SALT, max_age=max_age or _get_max_age())
+    except signing.SignatureExpired:
+        raise ValidationError('Upload ticket has expired')
+    except signing.BadSignature:
+        raise ValidationError('Invalid upload ticket')
+
+
+def store_upload(ticket, stream, content_length=None):
+    """
+    Write an upload received by the filesystem stand-in to its storage key.
+
+    Each ticket uploads once: the object of a completed photo, or one that is
+    waiting to be completed, is never replaced.
+
+    Raises:
+        ValidationError: If the ticket is invalid, the body is too large
+            (code "too_large") or the ticket was already used (code "conflict")
+    """
+    from ..models import PlacePhoto
+
+    data = read_ticket(ticket)
+    if content_length is not None and content_length > MAX_FILE_SIZE:
+        raise ValidationError(f'File size must not exceed {MAX_FILE_SIZE/1024/1024}MB', code='too_large')
+
+    if PlacePhoto.objects.filter(id=data['photo']).exists():
+        raise ValidationError('This upload has already been completed', code='conflict')
+    storage = get_place_photo_storage()
+    if storage.exists(data['key']):
+        raise ValidationError('A photo has already been uploaded with this ticket', code='conflict')
+    return storage.save(data['key'], _LimitedStream(stream, MAX_FILE_SIZE))
+
+
+class _LimitedStream:
+    """File-like wrapper that fails once more than limit bytes are read."""
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.read_bytes = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.read_bytes += len(data)
+        if self.read_bytes > self.limit:
+            raise ValidationError(f'File size must not exceed {self.limit/1024/1024}MB', code='too_large')
+        return data
+
+    def chunks(self, chunk_size=64 * 1024):
+        while True:
+            data = self.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+
+def complete_upload(ticket, user, place, caption=None, is_primary=False):
+    """
+    Create the PlacePhoto for an uploaded object and queue its processing.
+
+    Completing the same ticket twice, even concurrently, returns the photo
+    created the first time.
+
+    Returns:
+        (photo, created)
+
+    Raises:
+        ValidationError: If the ticket does not belong to this user and place,
+            the object was not uploaded, or it is not a valid photo
+    """
+    from ..models import PlacePhoto
+    from ..tasks import process_photo_derivatives
+    from .background import run_in_background
+
+    data = read_ticket(ticket)
+    if data['user'] != user.id or data['place'] != str(place.id):
+        raise ValidationError('Upload ticket does not match this place and user')
+
+    existing = PlacePhoto.objects.filter(id=data['photo']).first()
+    if existing is not None:
+        return existing, False
+
+    # Where the upload backend sent the object
+    storage = get_upload_backend().get_storage()
+    key = data['key']
+    if not storage.exists(key):
+        raise ValidationError('The photo has not been uploaded yet')
+
+    try:
+        with storage.open(key, 'rb') as stored:
+            validate_photo_file(stored)
+    except ValidationError:
+        storage.delete(key)
+        raise
+
+    try:
+        with transaction.atomic():
+            photo = PlacePhoto.objects.create(
+                id=data['photo'],
+                place=place,
+                user=user,
+                image=key,
+                url=storage.url(key),
+                caption=caption,
+                is_primary=is_primary,
+            )
+            run_in_background(process_photo_derivatives, photo.id)
+    except IntegrityError:
+        # A concurrent completion of the same ticket created it first
+        existing = PlacePhoto.objects.filter(id=data['photo']).first()
+        if existing is None:
+            raise
+        return existing, False
+    logger.info(f"Completed direct upload of photo {photo.id} for place {place.id}")
+    return photo, True
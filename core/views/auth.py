@@ -1,13 +1,13 @@
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenVerifyView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenVerifySerializer
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from ..serializers import UserRegistrationSerializer, CustomTokenObtainPairSerializer
+from ..serializers import UserRegistrationSerializer, CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 import logging
 from rest_framework.views import APIView
 
@@ -35,7 +35,7 @@ class UserRegistrationView(generics.CreateAPIView):
             user = serializer.save()
 
             # Generate JWT tokens for the new user
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
 
@@ -129,7 +129,7 @@ class ConvertSessionView(APIView):
         if name and (created or not user.first_name):
             user.first_name = name
             user.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
         return Response({
             'token': str(refresh.access_token),
             'refreshToken': str(refresh),
@@ -140,6 +140,13 @@ class ConvertSessionView(APIView):
             }
         })
 
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    Token refresh that refuses inactive users and re-issues the user claims
+    from the database.
+    """
+    serializer_class = CustomTokenRefreshSerializer
+
 class CustomTokenVerifySerializer(TokenVerifySerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
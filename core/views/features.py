@@ -2,11 +2,14 @@ from django_filters import rest_framework as filters
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
+from django.conf import settings
+from django.utils.cache import parse_etags
 
 from core.models import Feature, Place
 from core.serializers import FeatureSerializer, PlaceSerializer
 from ..choices import PLACE_TYPE_CHOICES, FEATURE_TYPES
+from ..utils.feature_catalog import count_by_category, get_feature_catalog, group_by_category, with_places_count
+from ..utils.feature_import import associate_features, import_features
 
 
 class FeatureFilter(filters.FilterSet):
@@ -30,6 +33,39 @@ class FeatureFilter(filters.FilterSet):
         fields = ['name', 'feature_type', 'applicable_to', 'created_after', 'created_before']
 
 
+def get_bulk_rows(data):
+    """
+    The list of rows in a bulk request body, or an error Response if it is not
+    a list or has more than FEATURE_IMPORT_MAX_ROWS rows.
+    """
+    if not isinstance(data, list):
+        return None, Response({'error': 'Expected a list'}, status=status.HTTP_400_BAD_REQUEST)
+    max_rows = getattr(settings, 'FEATURE_IMPORT_MAX_ROWS', 10000)
+    if len(data) > max_rows:
+        return None, Response(
+            {'error': f'At most {max_rows} rows per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return data, None
+
+
+def catalog_response(request, catalog, data):
+    """
+    Response for data derived from the feature catalog, or 304 Not Modified if
+    the client's If-None-Match already has the catalog's ETag.
+    """
+    etag = catalog['etag']
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in etags or '*' in etags:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    # Cache, but revalidate with the ETag every time
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
 class FeatureViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing features and their categories.
@@ -52,6 +88,9 @@ class FeatureViewSet(viewsets.ModelViewSet):
         
     destroy:
         Delete a feature. Must be authenticated and have appropriate permissions.
+
+    by_place_type, categories and by_category are served from the cached
+    feature catalog with an ETag (see core/utils/feature_catalog.py).
     """
     queryset = Feature.objects.all()
     serializer_class = FeatureSerializer
@@ -61,6 +100,9 @@ class FeatureViewSet(viewsets.ModelViewSet):
     ordering = ['feature_type', 'name']
     search_fields = ['name']
 
+    def get_queryset(self):
+        return with_places_count(super().get_queryset())
+
     @action(detail=False, methods=['get'])
     def by_place_type(self, request):
         """
@@ -81,39 +123,24 @@ class FeatureViewSet(viewsets.ModelViewSet):
             )
             
         # With the removal of applicable_place_types, all features are applicable to all place types
-        features = self.get_queryset()
-        serializer = self.get_serializer(features, many=True)
-        return Response(serializer.data)
+        catalog = get_feature_catalog()
+        return catalog_response(request, catalog, catalog['features'])
         
     @action(detail=False, methods=['get'])
     def categories(self, request):
         """
         Return all feature categories (types) with counts.
         """
-        categories = []
-        for type_code, type_name in FEATURE_TYPES:
-            count = Feature.objects.filter(feature_type=type_code).count()
-            categories.append({
-                'type': type_code,
-                'name': type_name,
-                'count': count
-            })
-        return Response(categories)
+        catalog = get_feature_catalog()
+        return catalog_response(request, catalog, count_by_category(catalog['features']))
         
     @action(detail=False, methods=['get'])
     def by_category(self, request):
         """
         Return features grouped by category.
         """
-        result = {}
-        for type_code, type_name in FEATURE_TYPES:
-            features = Feature.objects.filter(feature_type=type_code)
-            serializer = self.get_serializer(features, many=True)
-            result[type_code] = {
-                'name': type_name,
-                'features': serializer.data
-            }
-        return Response(result)
+        catalog = get_feature_catalog()
+        return catalog_response(request, catalog, group_by_category(catalog['features']))
         
     @action(detail=True, methods=['get'])
     def places(self, request, pk=None):
@@ -211,4 +238,32 @@ class FeatureViewSet(viewsets.ModelViewSet):
             'success': True,
             'added': [f.id for f in valid_features],
             'invalid': invalid_ids
-        }) 
\ No newline at end of file
+        })
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk_import(self, request):
+        """
+        Create many features at once (admin only).
+
+        Expects a list of feature objects. Features whose name (ignoring case)
+        and type match an existing feature or an earlier row are skipped.
+        Returns {"created", "skipped", "errors": [{"index", "errors"}]}.
+        """
+        rows, error = get_bulk_rows(request.data)
+        if error:
+            return error
+        return Response(import_features(rows))
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk_associate(self, request):
+        """
+        Associate features with many places at once (admin only).
+
+        Expects a list of {"place_id": ..., "feature_ids": [...]}. Existing
+        links are kept; unknown places and features are reported per row.
+        Returns {"linked", "places", "errors": [{"index", "errors"}]}.
+        """
+        rows, error = get_bulk_rows(request.data)
+        if error:
+            return error
+        return Response(associate_features(rows))
@@ -2,7 +2,6 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
@@ -13,6 +12,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests as google_auth_requests
 from django.contrib.auth.models import AbstractBaseUser
 from django.utils.crypto import get_random_string
+from ..serializers import CustomTokenObtainPairSerializer
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -131,7 +131,7 @@ class GoogleOAuthCallbackView(APIView):
             user.save(update_fields=['last_login'])
             
             # Generate JWT tokens for the authenticated user
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
             access_token = str(refresh.access_token)
             refresh_token = str(refresh)
             
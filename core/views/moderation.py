@@ -3,10 +3,11 @@ Views for handling moderation of places, reviews, and photos.
 Provides centralized moderation endpoints with proper status management.
 """
 
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.pagination import CursorPagination
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django.utils import timezone
@@ -14,15 +15,48 @@ from django.utils import timezone
 from ..models import Place, Review, PlacePhoto, Notification
 from ..serializers import (
     PlaceSerializer, ReviewSerializer, PhotoSerializer,
-    ModerationStatusSerializer
+    ModerationStatusSerializer, BulkModerationSerializer
 )
 from ..permissions import IsModeratorPermission
+from ..utils.helpful_votes import with_pending_helpful_counts
+from ..utils.moderation import bulk_moderate
+from ..utils.moderation_queue import (
+    claim_items, claimed_items, get_batch_size, is_claimed_by_other, not_claimed_by_others,
+    priority_expression, release_items
+)
+
+class ModerationQueuePagination(CursorPagination):
+    """Keyset paging in queue priority order; stable while items are moderated."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('priority', 'id')
 
 class BaseModerationViewSet(viewsets.ReadOnlyModelViewSet):
     """Base viewset for moderation views."""
     permission_classes = [IsAuthenticated, IsModeratorPermission]
+    pagination_class = ModerationQueuePagination
+    # The queue has a fixed order (see ModerationQueuePagination)
+    filter_backends = []
     serializer_class = None
     queryset = None
+    # Relations the serializer reads, loaded with the queue page
+    queue_select_related = ()
+    queue_prefetch_related = ()
+    
+    def preload(self, queryset):
+        """Load what the serializer needs for a page of items up front."""
+        return (
+            queryset
+            .select_related('moderator', *self.queue_select_related)
+            .prefetch_related(*self.queue_prefetch_related)
+        )
+    
+    def get_queue_queryset(self, queryset):
+        """Items in queue priority order, with their related objects preloaded."""
+        return self.preload(
+            queryset.annotate(priority=priority_expression(self.queryset.model))
+        ).order_by('priority', 'pk')
     
     def get_queryset(self):
         """
@@ -41,6 +75,11 @@ class BaseModerationViewSet(viewsets.ReadOnlyModelViewSet):
             if status_param == 'PENDING' and hasattr(self.queryset.model, 'draft'):
                 queryset = queryset.filter(draft=False)
 
+            # Items another moderator is working on stay out of the queue
+            queryset = queryset.filter(not_claimed_by_others(self.request.user))
+
+            return self.get_queue_queryset(queryset)
+
         # For detail actions (retrieve, update_status), get_object will filter this by PK.
         # No further status filtering here ensures get_object can find e.g. an APPROVED item to update.
         return queryset.select_related('moderator') 
@@ -49,6 +88,11 @@ class BaseModerationViewSet(viewsets.ReadOnlyModelViewSet):
     def update_status(self, request, pk=None):
         """Update moderation status of an object."""
         obj = self.get_object()
+        if is_claimed_by_other(obj, request.user):
+            return Response(
+                {'detail': 'Another moderator has claimed this item.', 'claimExpiresAt': obj.claim_expires_at},
+                status=status.HTTP_409_CONFLICT
+            )
         serializer = ModerationStatusSerializer(data=request.data)
         
         if serializer.is_valid():
@@ -60,6 +104,7 @@ class BaseModerationViewSet(viewsets.ReadOnlyModelViewSet):
             obj.moderation_comment = comment
             obj.moderated_at = timezone.now()
             obj.moderator = request.user
+            obj.clear_claim()
             obj.save()
             
             # Create notification
@@ -72,18 +117,91 @@ class BaseModerationViewSet(viewsets.ReadOnlyModelViewSet):
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """
+        Update the moderation status of many objects in one request.
+        Body: {"ids": [...], "status": "approved", "comment": "..."}
+        """
+        serializer = BulkModerationSerializer(data=request.data)
+        
+        if serializer.is_valid():
+            new_status = serializer.validated_data['status'].upper()
+            result = bulk_moderate(
+                self.queryset.model,
+                serializer.validated_data['ids'],
+                new_status,
+                moderator=request.user,
+                comment=serializer.validated_data.get('comment', '')
+            )
+            
+            return Response({
+                'status': 'success',
+                'message': f"{result['updated']} {self.queryset.model._meta.verbose_name_plural} have been {new_status.lower()}",
+                **result
+            })
+        
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        """
+        Claim the next batch of pending items for the current moderator.
+        Body (optional): {"limit": 20}
+        Items already claimed by the moderator are renewed and included.
+        """
+        try:
+            limit = int(request.data.get('limit') or get_batch_size())
+        except (TypeError, ValueError):
+            return Response({'limit': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, ModerationQueuePagination.max_page_size))
+        
+        model = self.queryset.model
+        ids = claim_items(model, request.user, limit)
+        items = self.get_queue_queryset(model.objects.filter(pk__in=ids))
+        serializer = self.get_serializer(items, many=True)
+        return Response({'count': len(ids), 'results': serializer.data})
+    
+    @action(detail=False, methods=['get'])
+    def claimed(self, request):
+        """Items the current moderator holds an unexpired claim on."""
+        items = self.preload(claimed_items(self.queryset.model, request.user))
+        serializer = self.get_serializer(items, many=True)
+        return Response({'count': len(serializer.data), 'results': serializer.data})
+    
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """
+        Return claimed items to the queue.
+        Body (optional): {"ids": [...]}; all of the moderator's claims by default.
+        """
+        ids = request.data.get('ids')
+        if ids is not None:
+            ids = serializers.ListField(child=serializers.UUIDField()).run_validation(ids)
+        released = release_items(self.queryset.model, request.user, ids)
+        return Response({'status': 'success', 'released': released})
 
 class PlaceModerationViewSet(BaseModerationViewSet):
     """ViewSet for moderating places."""
     serializer_class = PlaceSerializer
     queryset = Place.objects.all()
+    queue_select_related = ('created_by',)
+    queue_prefetch_related = ('features',)
 
 class ReviewModerationViewSet(BaseModerationViewSet):
     """ViewSet for moderating reviews."""
     serializer_class = ReviewSerializer
     queryset = Review.objects.all()
+    queue_select_related = ('user', 'place')
+    
+    def get_queryset(self):
+        # Helpful counts include votes not rolled up yet, as in ReviewViewSet
+        return with_pending_helpful_counts(super().get_queryset())
 
 class PhotoModerationViewSet(BaseModerationViewSet):
     """ViewSet for moderating photos."""
     serializer_class = PhotoSerializer
-    queryset = PlacePhoto.objects.all() 
\ No newline at end of file
+    queryset = PlacePhoto.objects.all()
+    queue_select_related = ('user', 'place', 'place__created_by', 'place__primary_photo')
+    queue_prefetch_related = ('place__features',) 
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Streaming endpoints that push notifications to clients in real time.
+
+- GET /api/notifications/stream/ (Server-Sent Events, Django async view)
+- ws://<host>/ws/notifications/ (WebSocket, routed in citystory_backend/asgi.py)
+
+Both require the ASGI server and authenticate with a JWT access token passed as
+a Bearer Authorization header or a ``token`` query parameter (EventSource and
+browser WebSockets cannot set headers). After connecting, clients receive an
+``unread_count`` event once, followed by a ``notification`` event for every
+notification created for them.
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from ..utils.notification_broker import get_broker, unread_count_event
+from ..utils.notification_counters import get_unread_count as get_cached_unread_count
+
+logger = logging.getLogger(__name__)
+
+
+def _get_heartbeat():
+    """Seconds between keep-alive messages on idle streams."""
+    return getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+
+
+def authenticate_stream_token(raw_token):
+    """
+    Resolve a JWT access token to an active user.
+
+    Returns:
+        The user, or None if the token is missing, invalid or the user is inactive
+    """
+    if not raw_token:
+        return None
+    authentication = JWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        user = authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return None
+    if not user.is_active:
+        return None
+    return user
+
+
+def get_unread_count(user):
+    """Return the user's current unread notification count."""
+    return get_cached_unread_count(user.id)
+
+
+def _recycle_connections():
+    # Within a transaction (e.g. a test case's) the connection is still in use:
+    # its autocommit differs from the settings, which would otherwise close it
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def _run_db(func, *args):
+    """Run a database call outside the event loop, recycling stale connections."""
+    def wrapper():
+        _recycle_connections()
+        try:
+            return func(*args)
+        finally:
+            _recycle_connections()
+    return sync_to_async(wrapper, thread_sensitive=True)()
+
+
+def format_sse(event):
+    """Format a broker event as a Server-Sent Events message."""
+    data = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+
+def _get_request_token(request):
+    """Extract the access token from the Authorization header or ?token= parameter."""
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):].strip()
+    return request.GET.get('token')
+
+
+async def notification_stream(request):
+    """
+    Stream the authenticated user's notifications as Server-Sent Events.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A never-ending async stream would pin a WSGI worker forever
+        return JsonResponse(
+            {"detail": "Notification streaming requires the ASGI server (citystory_backend.asgi)."},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+
+    user = await _run_db(authenticate_stream_token, _get_request_token(request))
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided or are invalid."},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    heartbeat = _get_heartbeat()
+    broker = get_broker()
+
+    async def event_stream():
+        subscription = broker.subscribe(user.id)
+        try:
+            unread_count = await _run_db(get_unread_count, user)
+            yield format_sse(unread_count_event(unread_count))
+            while True:
+                event = await subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+async def notification_websocket(scope, receive, send):
+    """
+    ASGI application pushing the authenticated user's notifications over a WebSocket.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    raw_token = query.get('token', [None])[0]
+    user = await _run_db(authenticate_stream_token, raw_token)
+    if user is None:
+        await send({'type': 'websocket.close', 'code': 4401})
+        return
+
+    await send({'type': 'websocket.accept'})
+
+    broker = get_broker()
+    subscription = broker.subscribe(user.id)
+    heartbeat = _get_heartbeat()
+    receive_task = asyncio.ensure_future(receive())
+    try:
+        unread_count = await _run_db(get_unread_count, user)
+        await send({
+            'type': 'websocket.send',
+            'text': json.dumps(unread_count_event(unread_count), cls=DjangoJSONEncoder),
+        })
+
+        while True:
+            event_task = asyncio.ensure_future(subscription.get(timeout=heartbeat))
+            done, _ = await asyncio.wait(
+                {receive_task, event_task},
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if event_task in done:
+                event = event_task.result()
+                if event is not None:
+                    await send({
+                        'type': 'websocket.send',
+                        'text': json.dumps(event, cls=DjangoJSONEncoder),
+                    })
+            else:
+                event_task.cancel()
+
+            if receive_task in done:
+                incoming = receive_task.result()
+                if incoming['type'] == 'websocket.disconnect':
+                    break
+                # Clients have nothing to say on this channel; ignore their messages
+                receive_task = asyncio.ensure_future(receive())
+    finally:
+        receive_task.cancel()
+        broker.unsubscribe(subscription)
@@ -13,6 +13,8 @@ from rest_framework.pagination import PageNumberPagination
 from ..models import Notification
 from ..serializers import NotificationSerializer
 from ..filters import NotificationFilter
+from ..utils.notification_broker import publish_unread_count
+from ..utils.notification_counters import get_unread_count, reset_unread_counters
 
 class NotificationPagination(PageNumberPagination):
     """Custom pagination for notifications"""
@@ -69,18 +71,22 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def mark_read(self, request, pk=None):
         """Mark a notification as read"""
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if notification.mark_as_read():
+            publish_unread_count(request.user.id, get_unread_count(request.user.id))
         return Response(self.get_serializer(notification).data)
     
     @action(detail=False, methods=['POST'])
     def mark_all_read(self, request):
         """Mark all notifications as read"""
-        self.get_queryset().update(is_read=True)
+        updated = self.get_queryset().filter(is_read=False).update(
+            is_read=True, updated_at=timezone.now()
+        )
+        if updated:
+            reset_unread_counters(request.user.id)
+            publish_unread_count(request.user.id, 0)
         return Response({'status': 'success'})
     
     @action(detail=False, methods=['GET'])
     def unread_count(self, request):
-        """Get count of unread notifications"""
-        count = self.get_queryset().filter(is_read=False).count()
-        return Response({'unread_count': count}) 
\ No newline at end of file
+        """Get count of unread notifications (served from the cached counters)"""
+        return Response({'unread_count': get_unread_count(request.user.id)})
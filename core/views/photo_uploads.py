@@ -0,0 +1,43 @@
+"""
+Upload target of the filesystem upload backend.
+
+Stands in for object storage when PHOTO_UPLOAD_BACKEND is
+FilesystemUploadBackend: clients PUT the photo body to the URL from their
+upload ticket, exactly as they would to a presigned S3 URL. The signed ticket
+is the only credential, so the endpoint needs no session or token.
+"""
+import logging
+
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework import status
+
+from ..utils.upload_tickets import store_upload
+
+logger = logging.getLogger(__name__)
+
+# ValidationError code -> response status (400 otherwise)
+ERROR_STATUS = {
+    'too_large': status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    'conflict': status.HTTP_409_CONFLICT,
+}
+
+
+@csrf_exempt
+@require_http_methods(['PUT'])
+def photo_upload_target(request, ticket):
+    """Write the request body to the storage key named by the ticket."""
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0) or None
+    except ValueError:
+        content_length = None
+
+    try:
+        store_upload(ticket, request, content_length=content_length)
+    except ValidationError as e:
+        code = ERROR_STATUS.get(e.code, status.HTTP_400_BAD_REQUEST)
+        return JsonResponse({'detail': e.messages[0]}, status=code)
+
+    return JsonResponse({}, status=status.HTTP_200_OK)
@@ -3,16 +3,23 @@ Views for managing place photos.
 Includes endpoints for uploading, listing, retrieving, and deleting photos.
 """
 
-from rest_framework import viewsets, permissions, status
+from rest_framework import viewsets, permissions, serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Max
 from core.models import PlacePhoto, Place, Notification
 from core.serializers import PhotoSerializer
 from core.permissions import IsOwnerOrReadOnly
 from django.db.models import Q
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from core.utils.background import run_in_background
+from core.utils.photo_storage import PhotoUploadHandler
+from core.utils.photo_processing import delete_photo_files, get_photo_file_names
+from core.utils.upload_tickets import complete_upload, issue_upload_ticket
 
 class PhotoViewSet(viewsets.ModelViewSet):
     """
@@ -25,6 +32,11 @@ class PhotoViewSet(viewsets.ModelViewSet):
     serializer_class = PhotoSerializer
     parser_classes = [MultiPartParser, FormParser]
     
+    def initialize_request(self, request, *args, **kwargs):
+        """Stream uploads to a temporary file in chunks, capped at the photo size limit"""
+        request.upload_handlers = [PhotoUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+    
     def get_queryset(self):
         """
         Get photos for a specific place, filtered by moderation status and permissions.
@@ -55,19 +67,34 @@ class PhotoViewSet(viewsets.ModelViewSet):
             
         return queryset
     
+    def get_serializer_context(self):
+        """List views serve card-sized derivatives instead of full-size photos"""
+        context = super().get_serializer_context()
+        if self.action in ('list', 'my_uploads'):
+            context['photo_size'] = 'card'
+        return context
+    
     def perform_create(self, serializer):
         """Create a new photo, associating it with the current user and place"""
         place = get_object_or_404(Place, pk=self.kwargs['place_pk'])
-        serializer.save(user=self.request.user, place=place)
+        photo = serializer.save(user=self.request.user, place=place)
+        if photo.image:
+            from core.tasks import process_photo_derivatives
+            # Resizing is CPU-heavy; keep it off the request worker
+            run_in_background(process_photo_derivatives, photo.id)
     
     def perform_update(self, serializer):
         """Update an existing photo"""
         serializer.save()
     
     def perform_destroy(self, instance):
-        """Delete the photo."""
-        # No need to delete any files since PlacePhoto uses URLs
+        """Delete the photo and, once committed, its uploaded files."""
+        # Collect the names first: the derivative names need the photo id
+        names = get_photo_file_names(instance)
+        storage = instance.image.storage
         instance.delete()
+        if names:
+            transaction.on_commit(lambda: delete_photo_files(storage, names))
     
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
     def moderate(self, request, place_pk=None, pk=None):
@@ -96,4 +123,55 @@ class PhotoViewSet(viewsets.ModelViewSet):
         
         photos = self.get_queryset().filter(user=request.user)
         serializer = self.get_serializer(photos, many=True)
-        return Response(serializer.data) 
\ No newline at end of file
+        return Response(serializer.data) 
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, FormParser])
+    def upload_ticket(self, request, place_pk=None):
+        """
+        Issue a signed ticket for uploading a photo directly to storage.
+        Body: {"filename": "front.jpg", "contentType": "image/jpeg"}
+        """
+        place = get_object_or_404(Place, pk=place_pk)
+        try:
+            ticket = issue_upload_ticket(
+                place,
+                request.user,
+                request.data.get('filename'),
+                request.data.get('contentType'),
+                request=request
+            )
+        except DjangoValidationError as e:
+            raise ValidationError({'detail': e.messages})
+        return Response(ticket, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, FormParser])
+    def complete_upload(self, request, place_pk=None):
+        """
+        Create the photo once its file has been uploaded with a ticket.
+        Body: {"ticket": "...", "caption": "...", "isPrimary": false}
+        """
+        place = get_object_or_404(Place, pk=place_pk)
+        ticket = request.data.get('ticket')
+        if not ticket:
+            raise ValidationError({'ticket': ['This field is required.']})
+        # "false" from a form is not truthy
+        try:
+            is_primary = serializers.BooleanField().to_internal_value(request.data.get('isPrimary', False))
+        except ValidationError as e:
+            raise ValidationError({'isPrimary': e.detail})
+        try:
+            photo, created = complete_upload(
+                ticket,
+                request.user,
+                place,
+                caption=request.data.get('caption'),
+                is_primary=is_primary
+            )
+        except DjangoValidationError as e:
+            raise ValidationError({'detail': e.messages})
+        
+        serializer = self.get_serializer(photo)
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
@@ -0,0 +1,54 @@
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+import logging
+
+from ..utils.place_import import IMPORT_FORMATS, detect_format, import_places, open_rows
+
+logger = logging.getLogger(__name__)
+
+
+class AdminPlaceImportView(APIView):
+    """
+    Bulk import places from an uploaded CSV or JSON Lines file (admin only).
+
+    Multipart fields:
+        file: The CSV or JSON Lines file
+        format: "csv" or "jsonl" (default: from the file name)
+        start: Rows to skip, to resume an import from its "processed" count
+        pending: "true" to leave the places pending moderation
+
+    Returns the import summary: {"processed", "created", "geocoding", "errors"}.
+    Very large files are better imported with the import_places command,
+    which checkpoints its progress.
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'format': [f'Must be one of: {", ".join(IMPORT_FORMATS)}']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start = max(0, int(request.data.get('start') or 0))
+        except (TypeError, ValueError):
+            return Response({'start': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        pending = str(request.data.get('pending', '')).lower() == 'true'
+
+        summary = import_places(
+            open_rows(upload.file, file_format),
+            user=request.user,
+            approve=not pending,
+            start=start,
+        )
+        logger.info(f"{request.user} imported {summary['created']} places from {upload.name}")
+        return Response(summary)
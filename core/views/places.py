@@ -19,6 +19,8 @@ import logging
 import time
 import math
 from ..utils.geocoding import geocode_address, determine_district
+from ..utils.place_facets import count_by
+from ..utils.feature_bits import filter_by_features, parse_feature_ids
 from django.core.cache import cache
 from django.http import Http404
 from django_filters.rest_framework.filters import BaseInFilter, CharFilter
@@ -100,16 +102,19 @@ class PlaceFilter(filters.FilterSet):
     #     choices=FEATURE_TYPES, # Ensure FEATURE_TYPES is defined or imported
     #     help_text='Filter by feature type'
     # )
-    # has_features = filters.ModelMultipleChoiceFilter(
-    #     queryset=Feature.objects.all(),
-    #     method='filter_has_features',
-    #     help_text='Filter places that have ALL specified features'
-    # )
-    # any_features = filters.ModelMultipleChoiceFilter(
-    #     queryset=Feature.objects.all(),
-    #     method='filter_any_features',
-    #     help_text='Filter places that have ANY of the specified features'
-    # )
+    # Feature filters on the precomputed feature bits (see core/utils/feature_bits.py)
+    hasFeatures = CharFilter(
+        method='filter_features',
+        help_text='Filter places that have ALL specified features (comma-separated ids)'
+    )
+    anyFeatures = CharFilter(
+        method='filter_features',
+        help_text='Filter places that have ANY of the specified features (comma-separated ids)'
+    )
+    excludeFeatures = CharFilter(
+        method='filter_features',
+        help_text='Filter places that have NONE of the specified features (comma-separated ids)'
+    )
     
     # Rating filters (Keep commented for now)
     # min_rating = filters.NumberFilter(
@@ -149,7 +154,7 @@ class PlaceFilter(filters.FilterSet):
 
     class Meta:
         model = Place
-        fields = [] # Only 'district' is active and explicitly defined
+        fields = [] # Only 'district' and the feature filters are active and explicitly defined
 
     # Custom filter methods (Keep commented for now)
     # def filter_by_price_level(self, queryset, name, value):
@@ -164,13 +169,9 @@ class PlaceFilter(filters.FilterSet):
     #     # ... existing implementation ...
     #     return queryset # Placeholder
 
-    # def filter_has_features(self, queryset, name, value):
-    #     # ... existing implementation ...
-    #     return queryset.distinct() # Placeholder
-
-    # def filter_any_features(self, queryset, name, value):
-    #     # ... existing implementation ...
-    #     return queryset.distinct() # Placeholder
+    def filter_features(self, queryset, name, value):
+        predicate = {'hasFeatures': 'all_of', 'anyFeatures': 'any_of', 'excludeFeatures': 'none_of'}[name]
+        return filter_by_features(queryset, **{predicate: parse_feature_ids(value)})
 
 class PlaceViewSet(viewsets.ModelViewSet):
     """
@@ -212,6 +213,7 @@ class PlaceViewSet(viewsets.ModelViewSet):
         - featureType: Filter by feature type [maps to features__type model field]
         - hasFeatures: Filter places with ALL specified features
         - anyFeatures: Filter places with ANY specified features
+        - excludeFeatures: Filter places with NONE of the specified features
         - createdAfter/createdBefore: Filter by creation date
         - minRating/maxRating: Filter by average rating (1-5)
         
@@ -464,8 +466,7 @@ class PlaceViewSet(viewsets.ModelViewSet):
         
         features = request.query_params.get('features')
         if features:
-            feature_ids = features.split(',')
-            nearby_places = nearby_places.filter(features__id__in=feature_ids).distinct()
+            nearby_places = filter_by_features(nearby_places, any_of=parse_feature_ids(features))
         
         # Filter by moderation status for non-staff users
         if not request.user.is_staff:
@@ -504,18 +505,16 @@ class PlaceViewSet(viewsets.ModelViewSet):
         - Sorted by district name
         - Example: [{"name": "Da'an", "value": "daan", "count": 15}, ...]
         """
-        # Start with all approved places for counting
-        base_queryset = Place.objects.filter(moderation_status='APPROVED')
-        
-        # Get counts for each district
-        district_counts = {}
-        for district_value, district_name in DISTRICT_CHOICES:
-            count = base_queryset.filter(district=district_value).count()
-            district_counts[district_value] = {
+        # Count approved places per district in one grouped query
+        counts = count_by(Place.objects.filter(moderation_status='APPROVED'), 'district')
+        district_counts = {
+            district_value: {
                 'name': district_name,
                 'value': district_value,
-                'count': count
+                'count': counts.get(district_value, 0)
             }
+            for district_value, district_name in DISTRICT_CHOICES
+        }
         
         # Convert to sorted list
         result = list(district_counts.values())
@@ -4,13 +4,13 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from rest_framework.permissions import IsAuthenticated
-from django.contrib.contenttypes.models import ContentType
 
-from ..models import Review, Place, Notification
+from ..models import Review, Place
 from ..serializers import ReviewSerializer
 from ..filters import ReviewFilter
 from ..permissions import IsOwnerOrReadOnly, IsModeratorOrReadOnly
 from ..models.helpful_vote import HelpfulVote
+from ..utils.helpful_votes import with_pending_helpful_counts
 
 class ReviewViewSet(viewsets.ModelViewSet):
     """
@@ -68,8 +68,10 @@ class ReviewViewSet(viewsets.ModelViewSet):
         place = get_object_or_404(Place, pk=place_id)
         user = self.request.user
         
-        # Start with base queryset
-        queryset = Review.objects.filter(place=place).select_related('user')
+        # Start with base queryset; helpful counts include votes not rolled up yet
+        queryset = with_pending_helpful_counts(
+            Review.objects.filter(place=place).select_related('user')
+        )
         
         # Filter by permission level and moderation status
         if not user.is_authenticated:
@@ -129,20 +131,10 @@ class ReviewViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
             
-        # Toggle the helpful vote
+        # Toggle the helpful vote; the author's points and notification
+        # are handled in the background
         vote_added, helpful_count = HelpfulVote.toggle_vote(review, user)
         
-        # Notify the review author if a vote was added
-        if vote_added:
-            Notification.objects.create(
-                user=review.user,
-                notification_type='review_helpful',
-                title='Someone found your review helpful!',
-                message=f'Your review of {review.place.name} was marked as helpful.',
-                content_type=ContentType.objects.get_for_model(review),
-                object_id=review.id
-            )
-        
         return Response({
             'status': 'success',
             'action': 'added' if vote_added else 'removed',
@@ -14,7 +14,7 @@ import logging
 
 from ..models import Place
 from ..serializers import PlaceSerializer
-from ..choices import DISTRICT_CHOICES
+from ..utils.place_facets import apply_search_filters, get_place_facets, parse_search_filters, search_text, searchable_places
 
 logger = logging.getLogger(__name__)
 
@@ -239,70 +239,24 @@ class CombinedSearchView(APIView):
     pagination_class = SearchPagination
     
     def get(self, request):
-        query = request.query_params.get('q', '').strip()
-        place_type = request.query_params.get('type')
-        districts_param = request.query_params.get('district')
-        price_min = request.query_params.get('minPrice')
-        price_max = request.query_params.get('maxPrice')
-        features = request.query_params.get('features')
+        filters = parse_search_filters(request.query_params)
+        query = filters['q']
         sort = request.query_params.get('sort', 'relevance')
         
-        logger.info(f"Combined search: q='{query}', type={place_type}, districts={districts_param}")
+        logger.info(f"Combined search: q='{query}', type={filters['type']}, districts={filters['district']}")
         
         try:
             # Base queryset
-            queryset = Place.objects.filter(
-                moderation_status='APPROVED',
-                draft=False
-            )
+            queryset = searchable_places()
             
             # Text search if query provided
             if query:
-                search_vector = (
-                    SearchVector('name', weight='A', config='english') +
-                    SearchVector('description', weight='B', config='english') +
-                    SearchVector('address', weight='C', config='english')
-                )
-                search_query = SearchQuery(query, search_type='plain', config='english')
-                
-                queryset = queryset.annotate(
-                    rank=SearchRank(search_vector, search_query)
-                ).filter(rank__gt=0.1)
-                
-                # Fallback to icontains if no results
-                if queryset.count() == 0:
-                    logger.info("No full-text results, falling back to icontains")
-                    queryset = Place.objects.filter(
-                        moderation_status='APPROVED',
-                        draft=False
-                    ).filter(
-                        Q(name__icontains=query) |
-                        Q(description__icontains=query) |
-                        Q(address__icontains=query)
-                    ).annotate(rank=Value(0.1, output_field=FloatField()))
+                queryset = search_text(queryset, query)
             else:
                 queryset = queryset.annotate(rank=Value(0.0, output_field=FloatField()))
             
-            # Apply filters
-            if place_type:
-                queryset = queryset.filter(place_type=place_type)
-                
-            if districts_param:
-                district_values = [d.strip() for d in districts_param.split(',')]
-                valid_districts = [d[0] for d in DISTRICT_CHOICES]
-                filtered_districts = [d for d in district_values if d in valid_districts]
-                if filtered_districts:
-                    queryset = queryset.filter(district__in=filtered_districts)
-                    
-            if price_min:
-                queryset = queryset.filter(price_level__gte=int(price_min))
-            if price_max:
-                queryset = queryset.filter(price_level__lte=int(price_max))
-                
-            if features:
-                feature_ids = [int(f) for f in features.split(',') if f.isdigit()]
-                if feature_ids:
-                    queryset = queryset.filter(features__id__in=feature_ids).distinct()
+            # Apply filters (shared with the facet counts)
+            queryset = apply_search_filters(queryset, filters)
             
             # Apply sorting
             if sort == 'rating':
@@ -331,4 +285,15 @@ class CombinedSearchView(APIView):
             return Response(
                 {'error': 'Search temporarily unavailable'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+class PlaceFacetsView(APIView):
+    """
+    Counts of matching places per district, place type, price level and top
+    features for the combined search filters (see core/utils/place_facets.py).
+    Takes the same query parameters as CombinedSearchView.
+    """
+    permission_classes = []
+    
+    def get(self, request):
+        return Response(get_place_facets(request.query_params))
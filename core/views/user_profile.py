@@ -2,9 +2,9 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
-from ..models import UserLevel, UserBadge, Notification
+from ..models import UserLevel, UserBadge
 from ..serializers import UserProfileSerializer
-from django.db.models import Count
+from ..utils.notification_counters import get_unread_counts
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,29 +56,5 @@ class UserProfileViewSet(viewsets.ReadOnlyModelViewSet):
                 }
             }
         """
-        user = request.user
-        
-        # Get total unread count
-        unread_count = Notification.objects.filter(
-            user=user,
-            is_read=False
-        ).count()
-        
-        # Get counts by notification type
-        type_counts = Notification.objects.filter(
-            user=user,
-            is_read=False
-        ).values('notification_type').annotate(
-            count=Count('notification_type')
-        )
-        
-        # Convert to dictionary
-        notification_types = {
-            item['notification_type']: item['count'] 
-            for item in type_counts
-        }
-        
-        return Response({
-            'unread_count': unread_count,
-            'notification_types': notification_types
-        }) 
\ No newline at end of file
+        # Served from the cached per-user counters (see core/utils/notification_counters.py)
+        return Response(get_unread_counts(request.user.id))